@@ -50,6 +50,8 @@ GRANT CREATE ANY TABLE TO "C##MEDTECHDBA" ;
 GRANT CREATE ANY TYPE TO "C##MEDTECHDBA" ;
 GRANT CREATE PROCEDURE TO "C##MEDTECHDBA" ;
 GRANT ALTER ANY OPERATOR TO "C##MEDTECHDBA" ;
+GRANT SELECT ANY DICTIONARY TO "C##MEDTECHDBA" ;
+GRANT CREATE JOB TO "C##MEDTECHDBA" ;
 
 -- -- LOGISTIC TEAM USER
 -- CREATE USER "C##LOGISTICTEAM_USER" IDENTIFIED BY "logisticteam"
@@ -50,5 +50,7 @@ GRANT CREATE ANY TABLE TO "C##MEDTECHDBA" ;
 GRANT CREATE ANY TYPE TO "C##MEDTECHDBA" ;
 GRANT CREATE PROCEDURE TO "C##MEDTECHDBA" ;
 GRANT ALTER ANY OPERATOR TO "C##MEDTECHDBA" ;
+GRANT SELECT ANY DICTIONARY TO "C##MEDTECHDBA" ;
+GRANT CREATE JOB TO "C##MEDTECHDBA" ;
 
 COMMIT;
\ No newline at end of file
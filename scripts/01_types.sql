@@ -27,6 +27,7 @@ DROP TYPE Department_t FORCE;
 DROP TYPE LogisticTeam_t FORCE;
 DROP TYPE ChiefOfficier_t FORCE;
 DROP TYPE TeamMember_t FORCE;
+DROP TYPE TeamRefList FORCE;
 DROP TYPE Complaint_t FORCE;
 /
 
@@ -109,6 +110,10 @@ CREATE OR REPLACE TYPE LogisticTeam_t AS OBJECT
 );
 /
 
+-- Collection of team REFs used by TrgUpdateTeamDeliveries to aggregate increments
+CREATE OR REPLACE TYPE TeamRefList AS TABLE OF REF LogisticTeam_t;
+/
+
 CREATE OR REPLACE TYPE ProductList AS TABLE OF REF Product_t;
 /
 
@@ -1,11 +1,14 @@
 -- Indexes on REF columns for joins/relationships
 CREATE INDEX IdxProdBatchProduct ON ProductBatch(BatchProduct);
+CREATE INDEX IdxProdBatchDistCenter ON ProductBatch(ByDistCenter);
 CREATE INDEX IdxLogTeamChief ON LogisticTeam(TeamChief);
 CREATE INDEX IdxDistCenterByTeam ON DistributionCenter(ByTeam);
 CREATE INDEX IdxBatchOrderByCustomer ON BatchOrder(ByCustomer);
 CREATE INDEX IdxBatchOrderByLogTeam ON BatchOrder(ByLogisticTeam);
 CREATE INDEX IdxComplaintByCustomer ON Complaint(ByCustomer);
 CREATE INDEX IdxComplaintOnBatchOrder ON Complaint(OnBatchOrder);
+-- Team deliveries: per-status counts and date filters are answered from the index
+CREATE INDEX IdxBatchOrderLogTeamStatus ON BatchOrder(ByLogisticTeam, DeliveryStatus, ExpectedDeliveryDate);
 
 -- Indexes for frequently queried columns
 CREATE INDEX IdxProductCategory ON Product(ProductCategory);
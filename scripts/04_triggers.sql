@@ -54,20 +54,35 @@ END;
 /
 
 -- Data consistencing triggers for deliveries
+-- Rows turning 'Delivered' are only collected per row; after the statement a
+-- single aggregated UPDATE adds each team's count once. Closing a route of 50
+-- orders therefore locks the team row once instead of updating it 50 times.
 CREATE OR REPLACE TRIGGER TrgUpdateTeamDeliveries
-AFTER UPDATE OF DeliveryStatus ON BatchOrder
-FOR EACH ROW
-BEGIN
-    IF :OLD.DeliveryStatus <> 'Delivered' AND :NEW.DeliveryStatus = 'Delivered' THEN
-        -- DEREF the ByLogisticTeam REF to get the actual LogisticTeam_t object
-        -- Then access its TeamCode attribute (which is the PK of LogisticTeam table)
-        UPDATE LogisticTeam
-        SET CompletedDeliveries = CompletedDeliveries + 1
-        WHERE TeamCode = DEREF(:NEW.ByLogisticTeam).TeamCode;
-        -- The WHERE clause now compares the TeamCode attribute from the DEREFenced object
-        -- with the TeamCode (PK) of the LogisticTeam table.
-    END IF;
-END;
+FOR UPDATE OF DeliveryStatus ON BatchOrder
+COMPOUND TRIGGER
+    g_delivered_by TeamRefList := TeamRefList();
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF :OLD.DeliveryStatus <> 'Delivered' AND :NEW.DeliveryStatus = 'Delivered'
+           AND :NEW.ByLogisticTeam IS NOT NULL THEN
+            g_delivered_by.EXTEND;
+            g_delivered_by(g_delivered_by.LAST) := :NEW.ByLogisticTeam;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        IF g_delivered_by.COUNT > 0 THEN
+            UPDATE LogisticTeam lt
+            SET lt.CompletedDeliveries = lt.CompletedDeliveries + (
+                SELECT COUNT(*) FROM TABLE(g_delivered_by) d
+                WHERE d.COLUMN_VALUE = REF(lt)
+            )
+            WHERE REF(lt) IN (SELECT d.COLUMN_VALUE FROM TABLE(g_delivered_by) d);
+        END IF;
+    END AFTER STATEMENT;
+END TrgUpdateTeamDeliveries;
 /
 
 -- Reassign a chief to a team if deleted
@@ -99,31 +114,62 @@ EXCEPTION
 END;
 /
 
--- Forbid inserting expired products in batches
-CREATE OR REPLACE TRIGGER TrgNoExpiredProductBatch
-BEFORE INSERT OR UPDATE OF BatchProduct ON ProductBatch
-FOR EACH ROW
-DECLARE
-    v_expiry_date DATE;
-BEGIN
-    -- Get the expiry date of the product referenced by BatchProduct
-    SELECT p.ExpiryDate INTO v_expiry_date
-    FROM Product p
-    WHERE REF(p) = :NEW.BatchProduct;
+-- Batch validation: forbid expired products and arrival dates in the past.
+-- One compound trigger validates a whole (array) DML statement. Every row is
+-- still checked in BEFORE EACH ROW, so array inserts with batch errors report
+-- exactly which rows failed. A product's expiry date is read once per statement,
+-- on the first row that uses it (a unique probe on Product's object identifier
+-- index), and kept for the rest of the statement: an array insert queries
+-- Product once per distinct product, not once per row, and never reads the
+-- expired products it does not use.
+CREATE OR REPLACE TRIGGER TrgProductBatchChecks
+FOR INSERT OR UPDATE OF BatchProduct, ArrivalDate ON ProductBatch
+COMPOUND TRIGGER
+    TYPE date_list IS TABLE OF DATE INDEX BY PLS_INTEGER;
+    g_today    DATE;
+    g_products ProductList := ProductList(); -- products met in this statement
+    g_expiry   date_list;                    -- their expiry dates, by position in g_products
 
-    IF v_expiry_date < TRUNC(SYSDATE) THEN
-        RAISE_APPLICATION_ERROR(-20008, 'Cannot assign expired product to a batch.');
-    END IF;
-END;
-/
+    FUNCTION expiry_of(p_product IN REF Product_t) RETURN DATE IS
+        v_expiry DATE;
+    BEGIN
+        FOR i IN REVERSE 1 .. g_products.COUNT LOOP
+            IF g_products(i) = p_product THEN
+                RETURN g_expiry(i);
+            END IF;
+        END LOOP;
 
--- Forbid arrival date of batches in the past
-CREATE OR REPLACE TRIGGER TrgBatchArrivalDate
-BEFORE INSERT OR UPDATE OF ArrivalDate ON ProductBatch
-FOR EACH ROW
-BEGIN
-    IF :NEW.ArrivalDate < TRUNC(SYSDATE) THEN
-        RAISE_APPLICATION_ERROR(-20009, 'Batch arrival date cannot be in the past.');
-    END IF;
-END;
+        BEGIN
+            SELECT p.ExpiryDate INTO v_expiry
+            FROM Product p
+            WHERE REF(p) = p_product;
+        EXCEPTION
+            WHEN NO_DATA_FOUND THEN
+                v_expiry := NULL; -- dangling REF: left to the constraints
+        END;
+        g_products.EXTEND;
+        g_products(g_products.LAST) := p_product;
+        g_expiry(g_products.LAST) := v_expiry;
+        RETURN v_expiry;
+    END expiry_of;
+
+    BEFORE STATEMENT IS
+    BEGIN
+        g_today := TRUNC(SYSDATE);
+    END BEFORE STATEMENT;
+
+    BEFORE EACH ROW IS
+    BEGIN
+        IF (INSERTING OR UPDATING('BatchProduct'))
+           AND :NEW.BatchProduct IS NOT NULL
+           AND expiry_of(:NEW.BatchProduct) < g_today THEN
+            RAISE_APPLICATION_ERROR(-20008, 'Cannot assign expired product to a batch.');
+        END IF;
+
+        IF (INSERTING OR UPDATING('ArrivalDate'))
+           AND :NEW.ArrivalDate < g_today THEN
+            RAISE_APPLICATION_ERROR(-20009, 'Batch arrival date cannot be in the past.');
+        END IF;
+    END BEFORE EACH ROW;
+END TrgProductBatchChecks;
 /
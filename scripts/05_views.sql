@@ -49,30 +49,5 @@ FROM
     TABLE(dc.ListOfProducts) prod_list;
 /
 
-CREATE OR REPLACE VIEW ViewBatchOrderDetails AS
-SELECT
-    bo.OrderID,
-    bo.OrderDate,
-    bo.ExpectedDeliveryDate,
-    bo.DeliveryStatus,
-    DEREF(batch_list.COLUMN_VALUE).BatchID AS IncludedBatchID,
-    DEREF(batch_list.COLUMN_VALUE).Quantity AS IncludedBatchQuantity,
-    DEREF(batch_list.COLUMN_VALUE).ArrivalDate AS IncludedBatchArrivalDate,
-    DEREF(DEREF(batch_list.COLUMN_VALUE).BatchProduct).SerialNo AS ProductSerialNoInBatch,
-    DEREF(DEREF(batch_list.COLUMN_VALUE).BatchProduct).ProductCategory AS ProductCategoryInBatch
-FROM
-    BatchOrder bo,
-    TABLE(bo.OrderBatches) batch_list;
-/
-
-CREATE OR REPLACE VIEW ViewComplaintDetails AS
-SELECT
-    c.TicketID,
-    c.ComplaintType,
-    c.StartDate,
-    c.EndDate,
-    c.ByCustomer.CustomerCode AS CustomerCode,
-    c.OnBatchOrder.OrderID AS OrderID
-FROM
-    Complaint c;
-/
\ No newline at end of file
+-- ViewBatchOrderDetails and ViewComplaintDetails read the reporting tables
+-- and are created in 09_reporting.sql.
@@ -12,9 +12,11 @@ CREATE SEQUENCE person_tax_code_seq START WITH 1 INCREMENT BY 1 NOCACHE;
 CREATE SEQUENCE customer_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
 CREATE SEQUENCE department_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
 CREATE SEQUENCE product_serial_seq START WITH 1 INCREMENT BY 1 NOCACHE;
-CREATE SEQUENCE product_batch_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
+-- Batch and order IDs are also allocated by the web app at insert time,
+-- so these two sequences are cached to avoid a dictionary update per NEXTVAL
+CREATE SEQUENCE product_batch_id_seq START WITH 1 INCREMENT BY 1 CACHE 100;
 CREATE SEQUENCE logistic_team_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
-CREATE SEQUENCE batch_order_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
+CREATE SEQUENCE batch_order_id_seq START WITH 1 INCREMENT BY 1 CACHE 100;
 CREATE SEQUENCE complaint_ticket_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
 CREATE SEQUENCE distribution_center_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
 
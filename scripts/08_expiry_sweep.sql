@@ -0,0 +1,117 @@
+-- Incremental expired-batch sweep
+-- Batches of expired products are quarantined by a daily job instead of being
+-- recomputed on every view of the expired batches page. Each run only reads
+-- the products whose ExpiryDate crossed the threshold since the previous run
+-- (a range scan on IdxProductExpiryDate) and their batches (IdxProdBatchProduct),
+-- so its cost follows the number of newly expired products, not the batch history.
+
+CREATE TABLE BatchQuarantine
+(
+    BatchID NUMBER PRIMARY KEY REFERENCES ProductBatch(BatchID) ON DELETE CASCADE,
+    SerialNo NUMBER NOT NULL,
+    ExpiryDate DATE NOT NULL,
+    QuarantinedAt DATE DEFAULT SYSDATE NOT NULL
+) ROWDEPENDENCIES;
+/
+
+CREATE INDEX IdxBatchQuarantineSerialNo ON BatchQuarantine(SerialNo);
+
+CREATE TABLE ExpirySweepState
+(
+    SweepName VARCHAR2(30) PRIMARY KEY,
+    SweptThrough DATE NOT NULL,
+    LastRunAt DATE,
+    LastQuarantined NUMBER DEFAULT 0 NOT NULL
+);
+/
+
+-- Nothing swept yet: the first run quarantines every expired product's batches
+INSERT INTO ExpirySweepState (SweepName, SweptThrough) VALUES ('EXPIRED_BATCHES', DATE '1900-01-01');
+
+-- Quarantines the batches of products that expired in [SweptThrough, today).
+-- p_rebuild = 1 re-checks every expired product, e.g. after a bulk load that
+-- bypassed the batch triggers. The caller commits.
+CREATE OR REPLACE PROCEDURE SweepExpiredBatches(p_rebuild IN NUMBER DEFAULT 0) AS
+    v_from  DATE;
+    v_today DATE := TRUNC(SYSDATE);
+    v_count NUMBER;
+BEGIN
+    SELECT SweptThrough INTO v_from
+    FROM ExpirySweepState
+    WHERE SweepName = 'EXPIRED_BATCHES'
+    FOR UPDATE;
+
+    IF p_rebuild = 1 THEN
+        v_from := DATE '1900-01-01';
+    END IF;
+
+    INSERT INTO BatchQuarantine (BatchID, SerialNo, ExpiryDate)
+    SELECT pb.BatchID, p.SerialNo, p.ExpiryDate
+    FROM Product p
+    JOIN ProductBatch pb ON pb.BatchProduct = REF(p)
+    WHERE p.ExpiryDate >= v_from AND p.ExpiryDate < v_today
+      AND NOT EXISTS (SELECT 1 FROM BatchQuarantine q WHERE q.BatchID = pb.BatchID);
+    v_count := SQL%ROWCOUNT;
+
+    UPDATE ExpirySweepState
+    SET SweptThrough = GREATEST(SweptThrough, v_today),
+        LastRunAt = SYSDATE,
+        LastQuarantined = v_count
+    WHERE SweepName = 'EXPIRED_BATCHES';
+END SweepExpiredBatches;
+/
+
+-- Keep the quarantine in line when an expiry date is corrected: the product's
+-- batches are released, and quarantined again straight away if the new date is
+-- already past (the sweep would not revisit a date before SweptThrough).
+CREATE OR REPLACE TRIGGER TrgProductExpiryQuarantine
+FOR UPDATE OF ExpiryDate ON Product
+COMPOUND TRIGGER
+    TYPE serial_list IS TABLE OF NUMBER;
+    g_serials serial_list := serial_list();
+
+    AFTER EACH ROW IS
+    BEGIN
+        -- NULL-safe: setting or clearing an expiry date counts as a change
+        IF (:OLD.ExpiryDate <> :NEW.ExpiryDate)
+           OR (:OLD.ExpiryDate IS NULL AND :NEW.ExpiryDate IS NOT NULL)
+           OR (:OLD.ExpiryDate IS NOT NULL AND :NEW.ExpiryDate IS NULL) THEN
+            g_serials.EXTEND;
+            g_serials(g_serials.LAST) := :NEW.SerialNo;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        FORALL i IN 1 .. g_serials.COUNT
+            DELETE FROM BatchQuarantine WHERE SerialNo = g_serials(i);
+
+        FORALL i IN 1 .. g_serials.COUNT
+            INSERT INTO BatchQuarantine (BatchID, SerialNo, ExpiryDate)
+            SELECT pb.BatchID, p.SerialNo, p.ExpiryDate
+            FROM Product p
+            JOIN ProductBatch pb ON pb.BatchProduct = REF(p)
+            WHERE p.SerialNo = g_serials(i) AND p.ExpiryDate < TRUNC(SYSDATE);
+    END AFTER STATEMENT;
+END TrgProductExpiryQuarantine;
+/
+
+BEGIN
+    SweepExpiredBatches;
+    COMMIT;
+END;
+/
+
+-- Daily sweep shortly after midnight
+BEGIN
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name        => 'SWEEP_EXPIRED_BATCHES',
+        job_type        => 'PLSQL_BLOCK',
+        job_action      => 'BEGIN SweepExpiredBatches; COMMIT; END;',
+        start_date      => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=DAILY;BYHOUR=0;BYMINUTE=5',
+        enabled         => TRUE,
+        comments        => 'Quarantines the batches of newly expired products'
+    );
+END;
+/
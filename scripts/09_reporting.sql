@@ -0,0 +1,390 @@
+-- Reporting layer
+-- Flat, relational copies of order lines, batches and complaints for the
+-- read-only pages and views. The object tables answer them only by walking
+-- REFs row by row (DEREF(DEREF(...)) per order line); here every attribute a
+-- report needs is stored in the row. The tables are kept current by compound
+-- triggers that collect the keys touched by a statement and re-derive only
+-- those rows after it, in the same transaction as the change.
+--
+-- Rows are deleted with their source row (ON DELETE CASCADE). DML straight on
+-- a nested table (INSERT INTO TABLE(SELECT bo.OrderBatches ...)) does not fire
+-- the BatchOrder triggers: call RefreshOrderLines for those orders, or
+-- RebuildReporting after a bulk load.
+--
+-- The tables keep a per-row ORA_ROWSCN (ROWDEPENDENCIES) so the local
+-- analytics snapshot (webapp/snapshot.py) can copy only the rows changed
+-- since its last refresh.
+
+CREATE OR REPLACE TYPE IdList AS TABLE OF NUMBER;
+/
+
+CREATE OR REPLACE TYPE CodeList AS TABLE OF VARCHAR2(10);
+/
+
+CREATE TABLE BatchFact
+(
+    BatchID NUMBER PRIMARY KEY REFERENCES ProductBatch(BatchID) ON DELETE CASCADE,
+    Quantity NUMBER NOT NULL,
+    ArrivalDate DATE NOT NULL,
+    SerialNo NUMBER NOT NULL,
+    ProductCategory VARCHAR2(30) NOT NULL,
+    ExpiryDate DATE,
+    CenterName VARCHAR2(30) NOT NULL
+) ROWDEPENDENCIES;
+/
+
+CREATE TABLE OrderLine
+(
+    OrderID NUMBER NOT NULL REFERENCES BatchOrder(OrderID) ON DELETE CASCADE,
+    BatchID NUMBER NOT NULL REFERENCES ProductBatch(BatchID) ON DELETE CASCADE,
+    OrderDate DATE NOT NULL,
+    ExpectedDeliveryDate DATE NOT NULL,
+    DeliveryStatus VARCHAR2(20) NOT NULL,
+    CustomerCode VARCHAR2(10) NOT NULL,
+    CustomerCity VARCHAR2(30),
+    CustomerStreet VARCHAR2(30),
+    CustomerZipCode NUMBER(5),
+    TeamCode NUMBER,
+    TeamName VARCHAR2(20),
+    Quantity NUMBER NOT NULL,
+    ArrivalDate DATE NOT NULL,
+    SerialNo NUMBER NOT NULL,
+    ProductCategory VARCHAR2(30) NOT NULL,
+    CenterName VARCHAR2(30) NOT NULL,
+    PRIMARY KEY (OrderID, BatchID)
+) ROWDEPENDENCIES;
+/
+
+CREATE TABLE ComplaintFact
+(
+    TicketID NUMBER PRIMARY KEY REFERENCES Complaint(TicketID) ON DELETE CASCADE,
+    ComplaintType VARCHAR2(20) NOT NULL,
+    StartDate DATE NOT NULL,
+    EndDate DATE,
+    CustomerCode VARCHAR2(10) NOT NULL,
+    CustomerCity VARCHAR2(30),
+    CustomerStreet VARCHAR2(30),
+    OrderID NUMBER NOT NULL,
+    OrderDeliveryStatus VARCHAR2(20) NOT NULL,
+    OrderDate DATE NOT NULL
+) ROWDEPENDENCIES;
+/
+
+-- Refresh paths: batch changes reach their order lines, order changes their complaints
+CREATE INDEX IdxOrderLineBatchID ON OrderLine(BatchID);
+CREATE INDEX IdxComplaintFactOrderID ON ComplaintFact(OrderID);
+-- Expiring-soon forecast range scans
+CREATE INDEX IdxBatchFactExpiryDate ON BatchFact(ExpiryDate);
+
+-- --- Source queries: one row per reporting row, derived from the object tables ---
+
+CREATE OR REPLACE VIEW BatchFactSource AS
+SELECT
+    pb.BatchID,
+    pb.Quantity,
+    pb.ArrivalDate,
+    p.SerialNo,
+    p.ProductCategory,
+    p.ExpiryDate,
+    dc.CenterName
+FROM ProductBatch pb
+JOIN Product p ON pb.BatchProduct = REF(p)
+JOIN DistributionCenter dc ON pb.ByDistCenter = REF(dc);
+/
+
+CREATE OR REPLACE VIEW OrderLineSource AS
+SELECT
+    l.OrderID,
+    f.BatchID,
+    l.OrderDate,
+    l.ExpectedDeliveryDate,
+    l.DeliveryStatus,
+    c.CustomerCode,
+    c.CustomerLocation.City AS CustomerCity,
+    c.CustomerLocation.Street AS CustomerStreet,
+    c.CustomerLocation.ZipCode AS CustomerZipCode,
+    lt.TeamCode,
+    lt.TeamName,
+    f.Quantity,
+    f.ArrivalDate,
+    f.SerialNo,
+    f.ProductCategory,
+    f.CenterName
+FROM (
+    SELECT bo.OrderID, bo.OrderDate, bo.ExpectedDeliveryDate, bo.DeliveryStatus,
+           bo.ByCustomer, bo.ByLogisticTeam, ob.COLUMN_VALUE AS BatchRef
+    FROM BatchOrder bo, TABLE(bo.OrderBatches) ob
+) l
+JOIN ProductBatch pb ON l.BatchRef = REF(pb)
+JOIN BatchFact f ON f.BatchID = pb.BatchID
+JOIN Customer c ON l.ByCustomer = REF(c)
+LEFT JOIN LogisticTeam lt ON l.ByLogisticTeam = REF(lt);
+/
+
+CREATE OR REPLACE VIEW ComplaintFactSource AS
+SELECT
+    cm.TicketID,
+    cm.ComplaintType,
+    cm.StartDate,
+    cm.EndDate,
+    c.CustomerCode,
+    c.CustomerLocation.City AS CustomerCity,
+    c.CustomerLocation.Street AS CustomerStreet,
+    bo.OrderID,
+    bo.DeliveryStatus AS OrderDeliveryStatus,
+    bo.OrderDate
+FROM Complaint cm
+JOIN Customer c ON cm.ByCustomer = REF(c)
+JOIN BatchOrder bo ON cm.OnBatchOrder = REF(bo);
+/
+
+-- --- Incremental refresh: re-derive the rows of the given keys ---
+
+CREATE OR REPLACE PROCEDURE RefreshComplaintFacts(p_ticket_ids IN IdList) AS
+BEGIN
+    DELETE FROM ComplaintFact
+    WHERE TicketID IN (SELECT COLUMN_VALUE FROM TABLE(p_ticket_ids));
+
+    INSERT INTO ComplaintFact
+    SELECT * FROM ComplaintFactSource
+    WHERE TicketID IN (SELECT COLUMN_VALUE FROM TABLE(p_ticket_ids));
+END RefreshComplaintFacts;
+/
+
+CREATE OR REPLACE PROCEDURE RefreshOrderLines(p_order_ids IN IdList) AS
+    v_tickets IdList;
+BEGIN
+    DELETE FROM OrderLine
+    WHERE OrderID IN (SELECT COLUMN_VALUE FROM TABLE(p_order_ids));
+
+    INSERT INTO OrderLine
+    SELECT * FROM OrderLineSource
+    WHERE OrderID IN (SELECT COLUMN_VALUE FROM TABLE(p_order_ids));
+
+    -- Complaints carry the order's status and date
+    SELECT TicketID BULK COLLECT INTO v_tickets
+    FROM ComplaintFact
+    WHERE OrderID IN (SELECT COLUMN_VALUE FROM TABLE(p_order_ids));
+    IF v_tickets.COUNT > 0 THEN
+        RefreshComplaintFacts(v_tickets);
+    END IF;
+END RefreshOrderLines;
+/
+
+CREATE OR REPLACE PROCEDURE RefreshBatchFacts(p_batch_ids IN IdList) AS
+BEGIN
+    DELETE FROM BatchFact
+    WHERE BatchID IN (SELECT COLUMN_VALUE FROM TABLE(p_batch_ids));
+
+    INSERT INTO BatchFact
+    SELECT * FROM BatchFactSource
+    WHERE BatchID IN (SELECT COLUMN_VALUE FROM TABLE(p_batch_ids));
+
+    -- Order lines of these batches (none for a new batch, found through IdxOrderLineBatchID)
+    UPDATE OrderLine ol
+    SET (Quantity, ArrivalDate, SerialNo, ProductCategory, CenterName) = (
+        SELECT f.Quantity, f.ArrivalDate, f.SerialNo, f.ProductCategory, f.CenterName
+        FROM BatchFact f
+        WHERE f.BatchID = ol.BatchID
+    )
+    WHERE ol.BatchID IN (SELECT COLUMN_VALUE FROM TABLE(p_batch_ids));
+END RefreshBatchFacts;
+/
+
+-- Reloads the whole reporting layer, e.g. after a bulk load with the sync
+-- triggers disabled. TRUNCATE commits, so run it outside other work.
+CREATE OR REPLACE PROCEDURE RebuildReporting AS
+BEGIN
+    EXECUTE IMMEDIATE 'TRUNCATE TABLE ComplaintFact';
+    EXECUTE IMMEDIATE 'TRUNCATE TABLE OrderLine';
+    EXECUTE IMMEDIATE 'TRUNCATE TABLE BatchFact';
+    INSERT /*+ APPEND */ INTO BatchFact SELECT * FROM BatchFactSource;
+    COMMIT;
+    INSERT /*+ APPEND */ INTO OrderLine SELECT * FROM OrderLineSource;
+    INSERT /*+ APPEND */ INTO ComplaintFact SELECT * FROM ComplaintFactSource;
+    COMMIT;
+END RebuildReporting;
+/
+
+-- --- Sync triggers ---
+-- Each collects the keys of the rows changed by a statement and refreshes them
+-- once after it, so an array insert of 500 batches runs one set-based refresh.
+
+CREATE OR REPLACE TRIGGER TrgBatchFactSync
+FOR INSERT OR UPDATE ON ProductBatch
+COMPOUND TRIGGER
+    g_ids IdList := IdList();
+
+    AFTER EACH ROW IS
+    BEGIN
+        g_ids.EXTEND;
+        g_ids(g_ids.LAST) := :NEW.BatchID;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        IF g_ids.COUNT > 0 THEN
+            RefreshBatchFacts(g_ids);
+        END IF;
+    END AFTER STATEMENT;
+END TrgBatchFactSync;
+/
+
+CREATE OR REPLACE TRIGGER TrgOrderLineSync
+FOR INSERT OR UPDATE ON BatchOrder
+COMPOUND TRIGGER
+    g_ids IdList := IdList();
+
+    AFTER EACH ROW IS
+    BEGIN
+        g_ids.EXTEND;
+        g_ids(g_ids.LAST) := :NEW.OrderID;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        IF g_ids.COUNT > 0 THEN
+            RefreshOrderLines(g_ids);
+        END IF;
+    END AFTER STATEMENT;
+END TrgOrderLineSync;
+/
+
+CREATE OR REPLACE TRIGGER TrgComplaintFactSync
+FOR INSERT OR UPDATE ON Complaint
+COMPOUND TRIGGER
+    g_ids IdList := IdList();
+
+    AFTER EACH ROW IS
+    BEGIN
+        g_ids.EXTEND;
+        g_ids(g_ids.LAST) := :NEW.TicketID;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        IF g_ids.COUNT > 0 THEN
+            RefreshComplaintFacts(g_ids);
+        END IF;
+    END AFTER STATEMENT;
+END TrgComplaintFactSync;
+/
+
+-- Reference data copied into the reporting rows: products, customers, team names
+CREATE OR REPLACE TRIGGER TrgProductReportingSync
+FOR UPDATE OF ProductCategory, ExpiryDate ON Product
+COMPOUND TRIGGER
+    g_serials IdList := IdList();
+
+    AFTER EACH ROW IS
+    BEGIN
+        g_serials.EXTEND;
+        g_serials(g_serials.LAST) := :NEW.SerialNo;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_batches IdList;
+    BEGIN
+        SELECT pb.BatchID BULK COLLECT INTO v_batches
+        FROM Product p
+        JOIN ProductBatch pb ON pb.BatchProduct = REF(p)
+        WHERE p.SerialNo IN (SELECT COLUMN_VALUE FROM TABLE(g_serials));
+        IF v_batches.COUNT > 0 THEN
+            RefreshBatchFacts(v_batches);
+        END IF;
+    END AFTER STATEMENT;
+END TrgProductReportingSync;
+/
+
+CREATE OR REPLACE TRIGGER TrgCustomerReportingSync
+FOR UPDATE OF CustomerLocation ON Customer
+COMPOUND TRIGGER
+    g_codes CodeList := CodeList();
+
+    AFTER EACH ROW IS
+    BEGIN
+        g_codes.EXTEND;
+        g_codes(g_codes.LAST) := :NEW.CustomerCode;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_orders  IdList;
+        v_tickets IdList;
+    BEGIN
+        SELECT bo.OrderID BULK COLLECT INTO v_orders
+        FROM Customer c
+        JOIN BatchOrder bo ON bo.ByCustomer = REF(c)
+        WHERE c.CustomerCode IN (SELECT COLUMN_VALUE FROM TABLE(g_codes));
+        IF v_orders.COUNT > 0 THEN
+            RefreshOrderLines(v_orders);
+        END IF;
+
+        SELECT cm.TicketID BULK COLLECT INTO v_tickets
+        FROM Customer c
+        JOIN Complaint cm ON cm.ByCustomer = REF(c)
+        WHERE c.CustomerCode IN (SELECT COLUMN_VALUE FROM TABLE(g_codes));
+        IF v_tickets.COUNT > 0 THEN
+            RefreshComplaintFacts(v_tickets);
+        END IF;
+    END AFTER STATEMENT;
+END TrgCustomerReportingSync;
+/
+
+CREATE OR REPLACE TRIGGER TrgTeamReportingSync
+FOR UPDATE OF TeamName ON LogisticTeam
+COMPOUND TRIGGER
+    g_teams IdList := IdList();
+
+    AFTER EACH ROW IS
+    BEGIN
+        g_teams.EXTEND;
+        g_teams(g_teams.LAST) := :NEW.TeamCode;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_orders IdList;
+    BEGIN
+        SELECT bo.OrderID BULK COLLECT INTO v_orders
+        FROM LogisticTeam lt
+        JOIN BatchOrder bo ON bo.ByLogisticTeam = REF(lt)
+        WHERE lt.TeamCode IN (SELECT COLUMN_VALUE FROM TABLE(g_teams));
+        IF v_orders.COUNT > 0 THEN
+            RefreshOrderLines(v_orders);
+        END IF;
+    END AFTER STATEMENT;
+END TrgTeamReportingSync;
+/
+
+-- --- Reporting views, read from the flat tables ---
+
+CREATE OR REPLACE VIEW ViewBatchOrderDetails AS
+SELECT
+    ol.OrderID,
+    ol.OrderDate,
+    ol.ExpectedDeliveryDate,
+    ol.DeliveryStatus,
+    ol.BatchID AS IncludedBatchID,
+    ol.Quantity AS IncludedBatchQuantity,
+    ol.ArrivalDate AS IncludedBatchArrivalDate,
+    ol.SerialNo AS ProductSerialNoInBatch,
+    ol.ProductCategory AS ProductCategoryInBatch
+FROM
+    OrderLine ol;
+/
+
+CREATE OR REPLACE VIEW ViewComplaintDetails AS
+SELECT
+    cf.TicketID,
+    cf.ComplaintType,
+    cf.StartDate,
+    cf.EndDate,
+    cf.CustomerCode,
+    cf.OrderID
+FROM
+    ComplaintFact cf;
+/
+
+BEGIN
+    RebuildReporting;
+END;
+/
@@ -1,6 +1,7 @@
 # webapp/app.py
 import streamlit as st
 import db_utils # Import your database utility functions
+import query_cache
 
 
 st.title("📦 MedTech Supply Chain Management")
@@ -19,3 +20,13 @@ if db_utils.st.session_state.db_connected:
     st.info("Database connection pool is active.")
 else:
     st.info("Database connection pool is inactive.")
+
+# Shared reference-data cache effectiveness (process-wide, all sessions)
+with st.expander("Reference data cache"):
+    cache_stats = query_cache.reference_cache.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Entries", cache_stats["entries"])
+    col2.metric("Hits", cache_stats["hits"])
+    col3.metric("Misses", cache_stats["misses"])
+    col4.metric("Hit ratio", f"{cache_stats['hit_ratio']:.0%}")
+    st.caption(f"Evictions: {cache_stats['evictions']} | Invalidations: {cache_stats['invalidations']}")
@@ -0,0 +1,448 @@
+# webapp/api_service.py
+import hmac
+import json
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+import oracledb
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+import db_config
+import query_cache
+import sql_catalogue
+import bulk_ingest
+import lookups
+import auto_assign
+import team_deliveries
+import expiry_sweep
+
+# --- Headless REST/JSON service ---
+# Exposes the operations of the Streamlit pages to other systems (WMS, driver
+# apps) as JSON endpoints, with the same SQL (sql_catalogue and the modules that
+# own their statements). Handlers are async and share one async connection pool
+# authenticated as the schema owner; reference data is cached with query_cache like
+# on the pages, but the cache lives in each process: the service's cache and its
+# invalidations are not shared with the Streamlit app, and the other way round.
+# Every endpoint except /health requires the MEDTECH_API_TOKEN bearer token, and
+# the service refuses to start without one.
+#
+# Run from the webapp directory:
+#     MEDTECH_API_TOKEN=... uvicorn api_service:app --host 0.0.0.0 --port 8000
+
+MAX_PAGE_SIZE = 500
+
+# Existence checks run before writes whose REF subqueries would otherwise turn an
+# unknown name or code into a NULL reference
+CENTER_EXISTS = "SELECT COUNT(*) FROM DistributionCenter WHERE CenterName = :center"
+TEAM_EXISTS = "SELECT COUNT(*) FROM LogisticTeam WHERE TeamCode = :team_code"
+ORDER_EXISTS = "SELECT COUNT(*) FROM BatchOrder WHERE OrderID = :order_id"
+
+
+# --- JSON helpers ---
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, "item"): # NumPy scalars
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class ApiResponse(JSONResponse):
+    """JSONResponse that also encodes dates and NumPy scalars."""
+
+    def render(self, content):
+        return json.dumps(content, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def error(status_code, message):
+    return ApiResponse({"error": message}, status_code=status_code)
+
+
+def frame_records(df):
+    """DataFrame rows as dicts with missing values as null."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def parse_date(value, field):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{field}' must be an ISO date (YYYY-MM-DD).")
+
+
+# --- Database helpers ---
+
+async def fetch_rows(connection, sql, params=None):
+    """Runs a query and returns its rows as dicts keyed by lower-case column name."""
+    with connection.cursor() as cursor:
+        await cursor.execute(sql, params or {})
+        columns = [col[0].lower() for col in cursor.description]
+        cursor.rowfactory = lambda *row: dict(zip(columns, row))
+        return await cursor.fetchall()
+
+
+async def exists(connection, sql, params):
+    """True when a COUNT(*) query finds at least one row."""
+    with connection.cursor() as cursor:
+        await cursor.execute(sql, params)
+        count, = await cursor.fetchone()
+    return count > 0
+
+
+async def cached_rows(connection, sql, params=None, tables=()):
+    """fetch_rows() through the shared reference-data cache (see query_cache.cached_query)."""
+    key = query_cache.QueryCache.make_key(connection.username, sql, params)
+    rows = query_cache.reference_cache.get(key)
+    if rows is None:
+        rows = await fetch_rows(connection, sql, params)
+        query_cache.reference_cache.put(key, tables, rows)
+    return rows
+
+
+def authorized(request):
+    """True when the request carries the configured bearer token (constant-time comparison)."""
+    expected = f"Bearer {db_config.API_TOKEN}".encode("utf-8")
+    supplied = request.headers.get("authorization", "").encode("utf-8")
+    return hmac.compare_digest(supplied, expected)
+
+
+def endpoint(handler):
+    """
+    Wraps a handler(request, connection): checks the bearer token, acquires a
+    pooled connection and turns database and validation errors into JSON errors.
+    """
+    async def wrapper(request):
+        if not authorized(request):
+            return error(401, "Missing or invalid bearer token.")
+        try:
+            async with request.app.state.pool.acquire() as connection:
+                return await handler(request, connection)
+        except oracledb.Error as e:
+            error_obj, = e.args
+            if error_obj.full_code == "DPY-4005": # timed out waiting for a pooled connection
+                return error(503, "The service is busy, retry later.")
+            # ORA-20000..20999 are the business rules enforced by the schema triggers
+            status = 422 if 20000 <= error_obj.code <= 20999 else 500
+            return error(status, error_obj.message)
+        except (KeyError, TypeError, ValueError) as e:
+            return error(400, f"Invalid request: {e}")
+    return wrapper
+
+
+async def json_body(request):
+    body = await request.json()
+    if not isinstance(body, dict):
+        raise ValueError("the request body must be a JSON object.")
+    return body
+
+
+# --- Reference data ---
+
+async def health(request):
+    pool = request.app.state.pool
+    return ApiResponse({"status": "ok", "pool": {"opened": pool.opened, "busy": pool.busy, "max": pool.max}})
+
+
+@endpoint
+async def list_centers(request, connection):
+    rows = await cached_rows(connection, sql_catalogue.CENTER_NAMES, tables=("DistributionCenter",))
+    return ApiResponse([row["centername"] for row in rows])
+
+
+@endpoint
+async def list_center_products(request, connection):
+    rows = await cached_rows(
+        connection, sql_catalogue.CENTER_PRODUCTS, {'center': request.path_params["center"]},
+        tables=("DistributionCenter", "Product")
+    )
+    return ApiResponse(rows)
+
+
+@endpoint
+async def list_customers(request, connection):
+    rows = await cached_rows(connection, sql_catalogue.CUSTOMER_CODES, tables=("Customer",))
+    return ApiResponse([row["customercode"] for row in rows])
+
+
+@endpoint
+async def list_batches(request, connection):
+    sql, params = lookups._batch_lookup_query()
+    return ApiResponse(await fetch_rows(connection, sql, params))
+
+
+# --- Operation 1: Register product batches ---
+
+@endpoint
+async def register_batch(request, connection):
+    body = await json_body(request)
+    quantity = int(body["quantity"])
+    if quantity < 1:
+        raise ValueError("'quantity' must be a positive whole number.")
+    if not await exists(connection, CENTER_EXISTS, {'center': body["center"]}):
+        return error(404, f"Distribution center {body['center']} not found.")
+    with connection.cursor() as cursor:
+        batch_id = cursor.var(oracledb.NUMBER)
+        await cursor.execute(sql_catalogue.INSERT_BATCH_RETURNING, {
+            'serial_no': int(body["serial_no"]),
+            'quantity': quantity,
+            'arrival_date': parse_date(body["arrival_date"], "arrival_date"),
+            'center': body["center"],
+            'batch_id': batch_id,
+        })
+    await connection.commit()
+    query_cache.invalidate("ProductBatch")
+    return ApiResponse({"batch_id": int(batch_id.getvalue()[0])}, status_code=201)
+
+
+@endpoint
+async def register_batches(request, connection):
+    """Validates like the bulk upload page, then inserts with array DML and batch errors."""
+    body = await json_body(request)
+    center = body["center"]
+    rows = pd.DataFrame(body["batches"], columns=["serial_no", "quantity", "arrival_date"])
+    rows.columns = bulk_ingest.REQUIRED_COLUMNS
+    if not await exists(connection, CENTER_EXISTS, {'center': center}):
+        return error(404, f"Distribution center {center} not found.")
+    center_products = await cached_rows(
+        connection, sql_catalogue.CENTER_PRODUCTS, {'center': center},
+        tables=("DistributionCenter", "Product")
+    )
+    valid, row_errors = bulk_ingest.validate_rows(rows, [tuple(row.values()) for row in center_products])
+    errors = [{"index": e.row - 1, "error": e.message} for e in row_errors]
+
+    records = valid.to_dict("records")
+    inserted = 0
+    with connection.cursor() as cursor:
+        for offset in range(0, len(records), bulk_ingest.DEFAULT_CHUNK_SIZE):
+            chunk = records[offset:offset + bulk_ingest.DEFAULT_CHUNK_SIZE]
+            await cursor.executemany(
+                bulk_ingest.INSERT_BATCH_SQL,
+                [
+                    {
+                        'serial_no': int(r["serial_no"]),
+                        'quantity': int(r["quantity"]),
+                        'arrival_date': r["arrival_date"],
+                        'center': center,
+                    }
+                    for r in chunk
+                ],
+                batcherrors=True,
+            )
+            failed = cursor.getbatcherrors()
+            for batch_error in failed:
+                errors.append({"index": chunk[batch_error.offset]["row"] - 1, "error": batch_error.message})
+            inserted += len(chunk) - len(failed)
+            await connection.commit()
+    if inserted:
+        query_cache.invalidate("ProductBatch")
+    errors.sort(key=lambda e: e["index"])
+    return ApiResponse({"inserted": inserted, "errors": errors}, status_code=201 if inserted else 422)
+
+
+# --- Operation 2: Place orders ---
+
+def _order_binds(order):
+    """Validates one order and returns (insert SQL, binds without the order_id out bind)."""
+    batch_ids = [int(batch_id) for batch_id in order["batch_ids"]]
+    if not batch_ids:
+        raise ValueError("'batch_ids' must list at least one batch.")
+    order_date = parse_date(order["order_date"], "order_date") if order.get("order_date") else date.today()
+    expected = parse_date(order["expected_delivery"], "expected_delivery")
+    if expected < order_date:
+        raise ValueError("'expected_delivery' cannot be before 'order_date'.")
+    sql, batch_binds = sql_catalogue.with_in_list(sql_catalogue.INSERT_ORDER, batch_ids, prefix="batch")
+    return sql, {
+        'order_date': order_date,
+        'expected_delivery': expected,
+        'status': 'Pending',
+        'customer': order["customer"],
+        **batch_binds,
+    }
+
+
+@endpoint
+async def place_order(request, connection):
+    sql, binds = _order_binds(await json_body(request))
+    with connection.cursor() as cursor:
+        order_id = cursor.var(oracledb.NUMBER)
+        await cursor.execute(sql, {**binds, 'order_id': order_id})
+    await connection.commit()
+    query_cache.invalidate("BatchOrder")
+    return ApiResponse({"order_id": int(order_id.getvalue()[0])}, status_code=201)
+
+
+@endpoint
+async def place_orders(request, connection):
+    """
+    Places many orders in one transaction. Orders are grouped by IN-list bucket
+    so each group is one executemany() with RETURNING ... INTO and batch errors.
+    """
+    orders = (await json_body(request))["orders"]
+    results = [None] * len(orders)
+    groups = {}
+    for index, order in enumerate(orders):
+        try:
+            sql, binds = _order_binds(order)
+        except (KeyError, TypeError, ValueError) as e:
+            results[index] = {"index": index, "error": str(e)}
+            continue
+        groups.setdefault(sql, []).append((index, binds))
+
+    with connection.cursor() as cursor:
+        for sql, members in groups.items():
+            order_ids = cursor.var(oracledb.NUMBER, arraysize=len(members))
+            cursor.setinputsizes(order_id=order_ids)
+            await cursor.executemany(sql, [binds for _, binds in members], batcherrors=True)
+            failed = {batch_error.offset: batch_error.message for batch_error in cursor.getbatcherrors()}
+            for offset, (index, _) in enumerate(members):
+                if offset in failed:
+                    results[index] = {"index": index, "error": failed[offset]}
+                else:
+                    results[index] = {"index": index, "order_id": int(order_ids.getvalue(offset)[0])}
+    await connection.commit()
+    placed = sum(1 for result in results if "order_id" in result)
+    if placed:
+        query_cache.invalidate("BatchOrder")
+    return ApiResponse({"placed": placed, "results": results}, status_code=201 if placed else 422)
+
+
+# --- Operation 3: Assign deliveries ---
+
+@endpoint
+async def list_pending_orders(request, connection):
+    return ApiResponse(await fetch_rows(connection, sql_catalogue.PENDING_ORDERS))
+
+
+@endpoint
+async def assign_delivery(request, connection):
+    body = await json_body(request)
+    team_code, order_id = int(body["team_code"]), int(body["order_id"])
+    if not await exists(connection, TEAM_EXISTS, {'team_code': team_code}):
+        return error(404, f"Logistic team {team_code} not found.")
+    with connection.cursor() as cursor:
+        await cursor.execute(sql_catalogue.ASSIGN_TEAM, {'team_code': team_code, 'order_id': order_id})
+        updated = cursor.rowcount
+    if not updated:
+        # ASSIGN_TEAM only updates pending, unassigned orders: tell a missing order from a taken one
+        if not await exists(connection, ORDER_EXISTS, {'order_id': order_id}):
+            return error(404, f"Order {order_id} not found.")
+        return error(409, f"Order {order_id} is already assigned or no longer pending.")
+    await connection.commit()
+    query_cache.invalidate("BatchOrder")
+    return ApiResponse({"order_id": order_id, "team_code": team_code})
+
+
+@endpoint
+async def auto_assign_deliveries(request, connection):
+    """Plans (and unless dry_run, applies) the assignment of every pending order, like the page's bulk mode."""
+    body = await json_body(request) if await request.body() else {}
+    with connection.cursor() as cursor:
+        await cursor.execute(auto_assign.CANDIDATES_SQL)
+        candidates = [auto_assign.Candidate(*row) for row in await cursor.fetchall()]
+    assignments, _ = auto_assign.plan_assignments(candidates, balance=body.get("balance", True))
+    skipped = []
+    if assignments and not body.get("dry_run", False):
+        with connection.cursor() as cursor:
+            await cursor.executemany(
+                auto_assign.ASSIGN_PENDING_SQL,
+                [{'team_code': a.team_code, 'order_id': a.order_id} for a in assignments],
+                arraydmlrowcounts=True,
+            )
+            counts = cursor.getarraydmlrowcounts()
+        await connection.commit()
+        query_cache.invalidate("BatchOrder")
+        skipped = [a.order_id for a, count in zip(assignments, counts) if count == 0]
+    return ApiResponse({
+        "planned": len(assignments),
+        "assigned": 0 if body.get("dry_run", False) else len(assignments) - len(skipped),
+        "skipped": skipped,
+        "assignments": [
+            {"order_id": a.order_id, "team_code": a.team_code, "center": a.center_name}
+            for a in assignments
+        ],
+    })
+
+
+# --- Operation 4: Team deliveries ---
+
+@endpoint
+async def list_team_deliveries(request, connection):
+    query = request.query_params
+    page_size = min(int(query.get("limit", db_config.TABLE_PAGE_SIZE)), MAX_PAGE_SIZE)
+    date_to = parse_date(query["to"], "to") if "to" in query else None
+    binds = team_deliveries.deliveries_binds(
+        int(request.path_params["taxcode"]),
+        status=query.get("status"),
+        date_from=parse_date(query["from"], "from") if "from" in query else None,
+        date_to=date_to and date.fromordinal(date_to.toordinal() + 1),
+        after=int(query.get("after", 0)),
+        page_size=page_size,
+    )
+    rows = await fetch_rows(connection, team_deliveries.DELIVERIES_PAGE_SQL, binds)
+    frame = pd.DataFrame(rows, columns=[
+        "rowkind", "teamcode", "teamname", "deliverystatus", "orders",
+        "orderid", "orderdate", "expecteddeliverydate", "customercode",
+    ])
+    frame.columns = frame.columns.str.upper()
+    page = team_deliveries.page_from_frame(frame, page_size)
+    if not page.teams:
+        return error(404, "No teams found for this chief officer.")
+    return ApiResponse({
+        "teams": [{"team_code": code, "team_name": name} for code, name in page.teams.items()],
+        "counts": {status: int(count) for status, count in page.counts.items()},
+        "orders": frame_records(page.frame),
+        "next_after": page.last_key if page.has_next else None,
+    })
+
+
+# --- Operation 5: Expired batches ---
+
+@endpoint
+async def list_expired_batches(request, connection):
+    return ApiResponse(await fetch_rows(connection, expiry_sweep.QUARANTINE_SQL))
+
+
+# --- Application ---
+
+@asynccontextmanager
+async def lifespan(app):
+    # The pool writes as the schema owner: never serve it unauthenticated.
+    if not db_config.API_TOKEN:
+        raise RuntimeError("MEDTECH_API_TOKEN is not set: refusing to start the REST service without a bearer token.")
+    app.state.pool = oracledb.create_pool_async(
+        user=db_config.DB_USER,
+        password=db_config.DB_PASSWORD,
+        min=db_config.POOL_MIN,
+        max=db_config.API_POOL_MAX,
+        increment=db_config.POOL_INCREMENT,
+        stmtcachesize=db_config.POOL_STMT_CACHE_SIZE,
+        getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+        wait_timeout=db_config.POOL_WAIT_TIMEOUT_MS,
+        **db_config.connect_params(),
+    )
+    try:
+        yield
+    finally:
+        await app.state.pool.close(force=True)
+
+
+routes = [
+    Route("/health", health),
+    Route("/centers", list_centers),
+    Route("/centers/{center}/products", list_center_products),
+    Route("/customers", list_customers),
+    Route("/batches", list_batches),
+    Route("/batches", register_batch, methods=["POST"]),
+    Route("/batches/bulk", register_batches, methods=["POST"]),
+    Route("/batches/expired", list_expired_batches),
+    Route("/orders", place_order, methods=["POST"]),
+    Route("/orders/bulk", place_orders, methods=["POST"]),
+    Route("/orders/pending", list_pending_orders),
+    Route("/deliveries/assign", assign_delivery, methods=["POST"]),
+    Route("/deliveries/auto-assign", auto_assign_deliveries, methods=["POST"]),
+    Route("/chiefs/{taxcode}/deliveries", list_team_deliveries),
+]
+
+app = Starlette(routes=routes, lifespan=lifespan)
@@ -0,0 +1,113 @@
+# webapp/auto_assign.py
+import time
+from collections import namedtuple
+import query_cache
+
+# --- Bulk assignment of pending orders to logistics teams ---
+# One set-based query resolves, for every pending unassigned order, the teams
+# serving the centers that hold its batches, together with each team's current
+# open orders. Teams are then chosen in memory, balancing load greedily, and all
+# assignments are applied with a single array UPDATE.
+
+Candidate = namedtuple(
+    "Candidate",
+    ["order_id", "first_batch", "center_name", "team_code", "team_name", "open_orders"],
+)
+Assignment = namedtuple(
+    "Assignment",
+    ["order_id", "center_name", "team_code", "team_name", "candidates"],
+)
+AssignResult = namedtuple("AssignResult", ["assigned", "skipped", "elapsed"])
+
+# Rows come per (order, team), ordered by the order's first batch at that team's
+# center, so the first candidate is the team the single-order form would show.
+CANDIDATES_SQL = """
+    SELECT c.OrderID, c.FirstBatch, c.CenterName, c.TeamCode, c.TeamName,
+           NVL(lo.OpenOrders, 0) AS OpenOrders
+    FROM (
+        SELECT bo.OrderID, MIN(pb.BatchID) AS FirstBatch,
+               MIN(dc.CenterName) KEEP (DENSE_RANK FIRST ORDER BY pb.BatchID) AS CenterName,
+               lt.TeamCode, lt.TeamName
+        FROM BatchOrder bo, TABLE(bo.OrderBatches) ob, ProductBatch pb,
+             DistributionCenter dc, LogisticTeam lt
+        WHERE bo.DeliveryStatus = 'Pending' AND bo.ByLogisticTeam IS NULL
+          AND ob.COLUMN_VALUE = REF(pb)
+          AND pb.ByDistCenter = REF(dc)
+          AND dc.ByTeam = REF(lt)
+        GROUP BY bo.OrderID, lt.TeamCode, lt.TeamName
+    ) c
+    LEFT JOIN (
+        -- Open orders counted once per team, not once per candidate row
+        SELECT t.TeamCode, COUNT(*) AS OpenOrders
+        FROM BatchOrder o, LogisticTeam t
+        WHERE o.ByLogisticTeam = REF(t)
+          AND o.DeliveryStatus IN ('Pending', 'In Transit')
+        GROUP BY t.TeamCode
+    ) lo ON lo.TeamCode = c.TeamCode
+    ORDER BY c.OrderID, c.FirstBatch
+"""
+
+# Only orders that are still pending and unassigned are updated, so orders
+# assigned by someone else since the preview are skipped, not reassigned.
+ASSIGN_PENDING_SQL = """
+    UPDATE BatchOrder
+    SET ByLogisticTeam = (
+        SELECT REF(t)
+        FROM LogisticTeam t
+        WHERE t.TeamCode = :team_code
+    )
+    WHERE OrderID = :order_id
+      AND DeliveryStatus = 'Pending'
+      AND ByLogisticTeam IS NULL
+"""
+
+
+def load_candidates(connection):
+    """Returns the Candidate rows of every pending unassigned order, in one round trip."""
+    with connection.cursor() as cursor:
+        cursor.execute(CANDIDATES_SQL)
+        return [Candidate(*row) for row in cursor.fetchall()]
+
+
+def plan_assignments(candidates, balance=True):
+    """
+    Chooses one team per order. With balance=True each order goes to the
+    candidate team with the fewest open orders, counting the orders planned so
+    far, ties going to the team of the order's first batch; otherwise the team
+    of the first batch is always used. Returns (assignments, {team_code: load}).
+    """
+    load = {c.team_code: c.open_orders for c in candidates}
+    by_order = {}
+    for candidate in candidates:
+        by_order.setdefault(candidate.order_id, []).append(candidate)
+
+    assignments = []
+    for order_id, options in by_order.items():
+        if balance:
+            chosen = min(options, key=lambda c: load[c.team_code])
+        else:
+            chosen = options[0]
+        load[chosen.team_code] += 1
+        assignments.append(Assignment(
+            order_id, chosen.center_name, chosen.team_code, chosen.team_name, len(options)
+        ))
+    return assignments, load
+
+
+def apply_assignments(connection, assignments):
+    """
+    Applies the assignments with one array UPDATE and commits.
+    Returns an AssignResult; `skipped` lists orders no longer pending and unassigned.
+    """
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            ASSIGN_PENDING_SQL,
+            [{'team_code': a.team_code, 'order_id': a.order_id} for a in assignments],
+            arraydmlrowcounts=True,
+        )
+        counts = cursor.getarraydmlrowcounts()
+    connection.commit()
+    query_cache.invalidate("BatchOrder")
+    skipped = [a.order_id for a, count in zip(assignments, counts) if count == 0]
+    return AssignResult(len(assignments) - len(skipped), skipped, time.perf_counter() - start)
@@ -0,0 +1,132 @@
+# webapp/bulk_ingest.py
+import time
+from collections import namedtuple
+from datetime import date
+import pandas as pd
+
+# --- Bulk ProductBatch registration ---
+# Uploaded rows are validated in memory against the center's ListOfProducts,
+# then inserted with array DML in chunked transactions. Rows rejected by the
+# database (e.g. by TrgProductBatchChecks) are reported individually through
+# batch errors instead of aborting the whole load.
+
+REQUIRED_COLUMNS = ["SerialNo", "Quantity", "ArrivalDate"]
+DEFAULT_CHUNK_SIZE = 500
+
+RowError = namedtuple("RowError", ["row", "serial_no", "message"])
+IngestResult = namedtuple("IngestResult", ["inserted", "errors", "elapsed"])
+
+INSERT_BATCH_SQL = """
+    INSERT INTO ProductBatch
+    (BatchID, BatchProduct, Quantity, ArrivalDate, ByDistCenter)
+    VALUES (
+        product_batch_id_seq.NEXTVAL,
+        (SELECT REF(p) FROM Product p WHERE p.SerialNo = :serial_no),
+        :quantity,
+        :arrival_date,
+        (SELECT REF(dc) FROM DistributionCenter dc WHERE dc.CenterName = :center)
+    )
+"""
+
+
+def read_batch_file(uploaded_file):
+    """
+    Reads an uploaded CSV or Excel file into a DataFrame with the REQUIRED_COLUMNS.
+    Raises ValueError when the file type is unsupported or a column is missing.
+    """
+    name = uploaded_file.name.lower()
+    if name.endswith(".csv"):
+        df = pd.read_csv(uploaded_file)
+    elif name.endswith((".xlsx", ".xls")):
+        try:
+            df = pd.read_excel(uploaded_file)
+        except ImportError:
+            raise ValueError("Reading Excel files requires the 'openpyxl' package.")
+    else:
+        raise ValueError("Upload a .csv or .xlsx file.")
+
+    # Column names are matched case-insensitively
+    by_lower = {str(c).strip().lower(): c for c in df.columns}
+    missing = [c for c in REQUIRED_COLUMNS if c.lower() not in by_lower]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    df = df[[by_lower[c.lower()] for c in REQUIRED_COLUMNS]]
+    df.columns = REQUIRED_COLUMNS
+    return df
+
+
+def validate_rows(df, center_products, today=None):
+    """
+    Validates upload rows against the products stocked at the center.
+    center_products holds (SerialNo, ProductCategory, ExpiryDate) rows.
+    Returns (valid DataFrame, list of RowError). Row numbers are 1-based file rows.
+    """
+    today = pd.Timestamp(today or date.today())
+    expiry_by_serial = {row[0]: row[2] for row in center_products}
+
+    serial = pd.to_numeric(df["SerialNo"], errors="coerce")
+    quantity = pd.to_numeric(df["Quantity"], errors="coerce")
+    arrival = pd.to_datetime(df["ArrivalDate"], errors="coerce")
+    expiry = pd.to_datetime(serial.map(expiry_by_serial), errors="coerce")
+
+    checks = [
+        (serial.isna(), "SerialNo is not a number"),
+        (serial.notna() & ~serial.isin(list(expiry_by_serial)), "Product is not stocked at this center"),
+        (quantity.isna() | (quantity < 1) | (quantity % 1 != 0), "Quantity must be a positive whole number"),
+        (arrival.isna(), "ArrivalDate is not a valid date"),
+        (arrival < today, "Batch arrival date cannot be in the past"),
+        (expiry < today, "Cannot assign expired product to a batch"),
+    ]
+    errors = []
+    invalid = pd.Series(False, index=df.index)
+    for mask, message in checks:
+        mask = mask.fillna(False)
+        for position in mask[mask & ~invalid].index:
+            errors.append(RowError(df.index.get_loc(position) + 1, df.at[position, "SerialNo"], message))
+        invalid |= mask
+
+    valid = pd.DataFrame({
+        "row": [df.index.get_loc(i) + 1 for i in df.index[~invalid]],
+        "serial_no": serial[~invalid].astype("int64"),
+        "quantity": quantity[~invalid].astype("int64"),
+        "arrival_date": arrival[~invalid].dt.date,
+    })
+    errors.sort(key=lambda e: e.row)
+    return valid, errors
+
+
+def insert_batches(connection, center, valid, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Inserts validated rows with executemany(batcherrors=True), committing each chunk.
+    `progress`, if given, is called with the fraction of rows processed.
+    Returns an IngestResult with per-row database errors.
+    """
+    start = time.perf_counter()
+    inserted = 0
+    errors = []
+    records = valid.to_dict("records")
+    with connection.cursor() as cursor:
+        for offset in range(0, len(records), chunk_size):
+            chunk = records[offset:offset + chunk_size]
+            cursor.executemany(
+                INSERT_BATCH_SQL,
+                [
+                    {
+                        'serial_no': r["serial_no"],
+                        'quantity': r["quantity"],
+                        'arrival_date': r["arrival_date"],
+                        'center': center,
+                    }
+                    for r in chunk
+                ],
+                batcherrors=True,
+            )
+            chunk_errors = cursor.getbatcherrors()
+            for error in chunk_errors:
+                record = chunk[error.offset]
+                errors.append(RowError(record["row"], record["serial_no"], error.message))
+            connection.commit()
+            inserted += len(chunk) - len(chunk_errors)
+            if progress:
+                progress(min(offset + chunk_size, len(records)) / len(records))
+    return IngestResult(inserted, errors, time.perf_counter() - start)
@@ -0,0 +1,90 @@
+# webapp/data_access.py
+import pandas as pd
+import pyarrow
+
+# --- Columnar fetch helpers ---
+# Query results are fetched straight into Arrow buffers with python-oracledb's
+# data frame support, then handed to pandas. No per-row Python tuples are built.
+
+DEFAULT_ARRAYSIZE = 1000
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def _to_pandas(oracle_df):
+    """Converts an oracledb DataFrame to pandas, keeping whole numbers as integers."""
+    df = pyarrow.table(oracle_df).to_pandas()
+    # Unconstrained NUMBER columns arrive as float64: turn integral ones back into
+    # (nullable) integers so IDs do not render as 1.0, 2.0, ...
+    for column in df.columns[df.dtypes == "float64"]:
+        values = df[column]
+        if ((values % 1 == 0) | values.isna()).all():
+            df[column] = values.astype("Int64")
+    return df
+
+
+def fetch_dataframe(connection, sql, params=None, arraysize=DEFAULT_ARRAYSIZE):
+    """Runs a query and returns all its rows as a pandas DataFrame."""
+    oracle_df = connection.fetch_df_all(sql, params, arraysize=arraysize)
+    return _to_pandas(oracle_df)
+
+
+def iter_dataframes(connection, sql, params=None, size=DEFAULT_ARRAYSIZE):
+    """Runs a query and yields its rows as pandas DataFrames of at most `size` rows."""
+    for oracle_df in connection.fetch_df_batches(sql, params, size=size):
+        yield _to_pandas(oracle_df)
+
+
+def format_dates(df, columns=None, fmt=DATE_FORMAT):
+    """
+    Formats date columns as strings in one vectorised pass per column.
+    Defaults to every datetime column; missing dates become empty strings.
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=["datetime", "datetimetz"]).columns
+    for column in columns:
+        df[column] = pd.to_datetime(df[column]).dt.strftime(fmt).fillna('')
+    return df
+
+
+# --- Variable-length IN lists ---
+# Each distinct list length would otherwise produce a new SQL text that Oracle
+# hard-parses and the client statement cache never reuses. Lists are padded to
+# a fixed set of bucket sizes, so at most len(IN_LIST_BUCKETS) texts exist per query.
+
+IN_LIST_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1000) # Oracle allows at most 1000
+
+
+def in_list_binds(values, prefix="id"):
+    """
+    Returns (placeholders, binds) for `col IN (<placeholders>)`.
+    The values are padded by repeating the last one up to the next bucket size,
+    which does not change the result of the IN predicate.
+    """
+    values = list(values)
+    if not values:
+        raise ValueError("An IN list needs at least one value")
+    size = next((b for b in IN_LIST_BUCKETS if b >= len(values)), None)
+    if size is None:
+        raise ValueError(f"An IN list accepts at most {IN_LIST_BUCKETS[-1]} values")
+    padded = values + [values[-1]] * (size - len(values))
+    binds = {f"{prefix}{i}": value for i, value in enumerate(padded)}
+    placeholders = ", ".join(f":{name}" for name in binds)
+    return placeholders, binds
+
+
+def parse_counts(connection):
+    """
+    Returns this session's {'total': ..., 'hard': ...} parse counts from V$MYSTAT.
+    Requires SELECT ANY DICTIONARY (granted to the schema owner).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT sn.NAME, ms.VALUE
+            FROM V$MYSTAT ms
+            JOIN V$STATNAME sn ON sn.STATISTIC# = ms.STATISTIC#
+            WHERE sn.NAME IN ('parse count (total)', 'parse count (hard)')
+            """
+        )
+        counts = dict(cursor.fetchall())
+    return {'total': counts['parse count (total)'], 'hard': counts['parse count (hard)']}
@@ -0,0 +1,91 @@
+# webapp/db_config.py
+import os
+import tempfile
+
+# --- Database Connection Details ---
+# Shared by the Streamlit pages and the command-line tools.
+# Every value can be overridden with an environment variable.
+DB_HOST = os.environ.get("MEDTECH_DB_HOST", "localhost")
+DB_PORT = os.environ.get("MEDTECH_DB_PORT", "1521")
+DB_SERVICE_NAME = os.environ.get("MEDTECH_DB_SERVICE", "XE")
+
+# Schema owner: default identity of the shared pool and of the CLI tools
+DB_USER = os.environ.get("MEDTECH_DB_USER", "C##MEDTECHDBA")
+DB_PASSWORD = os.environ.get("MEDTECH_DB_PASSWORD", "medtechdba")
+
+# When fetching the user list, we connect as SYSTEM as it has privileges on ALL_USERS.
+# This password is the ORACLE_PWD from docker-compose.yaml.
+SYS_DB_USER = os.environ.get("MEDTECH_SYS_USER", "SYSTEM")
+SYS_DB_PASSWORD = os.environ.get("MEDTECH_SYS_PASSWORD", "password123")
+
+# --- Shared connection pool sizing ---
+# One pool is created per process and shared by every Streamlit session.
+POOL_MIN = int(os.environ.get("MEDTECH_POOL_MIN", "2"))
+POOL_MAX = int(os.environ.get("MEDTECH_POOL_MAX", "10"))
+POOL_INCREMENT = int(os.environ.get("MEDTECH_POOL_INCREMENT", "1"))
+POOL_STMT_CACHE_SIZE = int(os.environ.get("MEDTECH_POOL_STMT_CACHE", "40"))
+POOL_WAIT_TIMEOUT_MS = int(os.environ.get("MEDTECH_POOL_WAIT_TIMEOUT_MS", "5000"))
+
+# --- Tables Overview paging ---
+# Rows per page; also used as the cursor arraysize/prefetchrows for page fetches.
+TABLE_PAGE_SIZE = int(os.environ.get("MEDTECH_TABLE_PAGE_SIZE", "50"))
+# Table queries run in parallel per page view, each on its own pooled connection
+TABLE_FETCH_CONCURRENCY = int(os.environ.get("MEDTECH_TABLE_FETCH_CONCURRENCY", "4"))
+
+# --- Reference data cache ---
+# Shared by every session; the app invalidates entries itself when it writes.
+CACHE_TTL_SECONDS = int(os.environ.get("MEDTECH_CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_ENTRIES = int(os.environ.get("MEDTECH_CACHE_MAX_ENTRIES", "256"))
+
+# --- Expiring-soon forecast ---
+# Days ahead covered by the forecast, and how often the incrementally refreshed
+# aggregate is reloaded in full to pick up edited or deleted batches.
+FORECAST_HORIZON_DAYS = int(os.environ.get("MEDTECH_FORECAST_HORIZON_DAYS", "90"))
+FORECAST_FULL_REFRESH_SECONDS = int(os.environ.get("MEDTECH_FORECAST_FULL_REFRESH_SECONDS", "3600"))
+
+# --- Query instrumentation ---
+# Recent statement/acquire samples kept for percentiles, and an optional port for
+# the Prometheus scrape endpoint (0 disables it). The endpoint has no
+# authentication and exposes SQL text, so it binds to localhost by default.
+METRICS_BUFFER_SIZE = int(os.environ.get("MEDTECH_METRICS_BUFFER_SIZE", "5000"))
+METRICS_PORT = int(os.environ.get("MEDTECH_METRICS_PORT", "0"))
+METRICS_HOST = os.environ.get("MEDTECH_METRICS_HOST", "127.0.0.1")
+
+# --- REST service ---
+# Pool size of the headless JSON service (api_service.py), and the bearer token
+# required on every endpoint except /health. The service does not start without it.
+API_POOL_MAX = int(os.environ.get("MEDTECH_API_POOL_MAX", "20"))
+API_TOKEN = os.environ.get("MEDTECH_API_TOKEN", "")
+
+# --- Table exports ---
+# Directory holding the Tables page's export files (one subdirectory per export),
+# and the age after which exports that were never downloaded are deleted.
+EXPORT_DIR = os.environ.get("MEDTECH_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "medtech_exports"))
+EXPORT_MAX_AGE_SECONDS = int(os.environ.get("MEDTECH_EXPORT_MAX_AGE_SECONDS", "3600"))
+
+# --- Local analytics snapshot ---
+# DuckDB file the reporting tables are replicated into (relative paths are
+# resolved against the webapp directory, not the working directory), how often
+# the app refreshes it in the background (0, the default, disables it), and the
+# age after which pages reading it flag it as stale.
+SNAPSHOT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    os.environ.get("MEDTECH_SNAPSHOT_PATH", "medtech_snapshot.duckdb")
+)
+SNAPSHOT_REFRESH_SECONDS = int(os.environ.get("MEDTECH_SNAPSHOT_REFRESH_SECONDS", "0"))
+SNAPSHOT_MAX_AGE_SECONDS = int(os.environ.get("MEDTECH_SNAPSHOT_MAX_AGE_SECONDS", "900"))
+# The snapshot holds the schema owner's view of the reporting tables, so only
+# these database users (comma-separated) are offered the snapshot switch.
+SNAPSHOT_USERS = {
+    user.strip().upper()
+    for user in os.environ.get("MEDTECH_SNAPSHOT_USERS", DB_USER).split(",") if user.strip()
+}
+
+
+def connect_params():
+    """Returns the host/port/service keyword arguments for oracledb.connect()/create_pool()."""
+    return {
+        "host": DB_HOST,
+        "port": DB_PORT,
+        "service_name": DB_SERVICE_NAME,
+    }
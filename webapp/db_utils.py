@@ -1,84 +1,11 @@
 # webapp/db_utils.py
 import streamlit as st
+import duckdb
 import oracledb
-import os
-
-# --- Database Connection Details ---
-# These details are used by all pages to connect to the DB
-DB_USER = "C##MEDTECHDBA" # Your schema owner user
-DB_PASSWORD = "medtechdba" # Your schema owner's password
-DB_HOST = "localhost"
-DB_PORT = "1521"
-DB_SERVICE_NAME = "XE"
-
-# --- Functions to manage connection pool in st.session_state ---
-
-def get_db_pool():
-    """Initializes and returns the Oracle DB connection pool, stored in session state."""
-    if 'db_pool' not in st.session_state or st.session_state.db_pool is None:
-        print("Attempting to initialize database connection pool...")
-        try:
-            pool = oracledb.create_pool(
-                user=DB_USER,
-                password=DB_PASSWORD,
-                host=DB_HOST,
-                port=DB_PORT,
-                service_name=DB_SERVICE_NAME,
-                min=2,
-                max=5,
-                increment=1,
-            )
-            st.session_state.db_pool = pool
-            st.session_state.db_connected = True
-            st.success(f"Successfully connected to the database as {DB_USER}!")
-            print("Database connection pool initialized successfully.")
-        except oracledb.Error as e:
-            error_obj, = e.args
-            st.session_state.db_connected = False
-            st.error(f"Failed to connect to database: {error_obj.message}")
-            print(f"Error initializing DB pool: {error_obj.message}")
-            st.stop() # Stop the app if connection fails critically
-        except Exception as e:
-            st.session_state.db_connected = False
-            st.error(f"An unexpected error occurred during connection: {e}")
-            print(f"Unexpected error: {e}")
-            st.stop() # Stop the app if connection fails critically
-    return st.session_state.db_pool
-
-def close_db_pool():
-    """Closes the Oracle DB connection pool and updates session state."""
-    if 'db_pool' in st.session_state and st.session_state.db_pool:
-        try:
-            st.session_state.db_pool.close()
-            st.session_state.db_pool = None
-            st.session_state.db_connected = False
-            st.warning("Database connection pool disconnected.")
-            print("Database connection pool closed.")
-        except Exception as e:
-            st.error(f"Error closing database pool: {e}")
-            print(f"Error closing DB pool: {e}")
-    else:
-        st.info("No database pool to disconnect.")
-        st.session_state.db_connected = False
-
-# --- Initialize session state variables if they don't exist ---
-if 'db_connected' not in st.session_state:
-    st.session_state.db_connected = False
-if 'db_pool' not in st.session_state: # This might get initialized by get_db_pool() directly
-    st.session_state.db_pool = None
-# webapp/db_utils.py
-import streamlit as st
-import oracledb
-import os
-
-# --- Database Connection Details (Fixed for initial connection and fetching user list) ---
-# When fetching the user list, we'll connect as SYSTEM as it has privileges on ALL_USERS.
-# This password is the ORACLE_PWD from your docker-compose.yml.
-SYS_DB_USER = "SYSTEM"
-SYS_DB_PASSWORD = "password123"
-DB_HOST = "localhost"
-DB_PORT = "1521"
-DB_SERVICE_NAME = "XE"
+import db_config
+import query_metrics
+import snapshot
+import sql_catalogue
 
 # --- Initialize session state variables ---
 if 'db_pool' not in st.session_state:
@@ -86,7 +13,70 @@ if 'db_pool' not in st.session_state:
 if 'db_connected' not in st.session_state:
     st.session_state.db_connected = False
 if 'logged_in_user' not in st.session_state:
-    st.session_state.logged_in_user = None # New: Stores the username that successfully logged in
+    st.session_state.logged_in_user = None # Stores the username that successfully logged in
+
+
+# --- Process-wide shared connection pool ---
+
+@st.cache_resource(show_spinner=False)
+def get_shared_pool():
+    """
+    Creates the single heterogeneous connection pool shared by every Streamlit session.
+    The schema owner is only the default identity: each session acquires
+    connections with its own credentials (see UserPool).
+    """
+    print("Creating shared database connection pool...")
+    return oracledb.create_pool(
+        user=db_config.DB_USER,
+        password=db_config.DB_PASSWORD,
+        homogeneous=False,
+        min=db_config.POOL_MIN,
+        max=db_config.POOL_MAX,
+        increment=db_config.POOL_INCREMENT,
+        stmtcachesize=db_config.POOL_STMT_CACHE_SIZE,
+        getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+        wait_timeout=db_config.POOL_WAIT_TIMEOUT_MS,
+        **db_config.connect_params(),
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def start_background_services():
+    """
+    Starts the process-wide metrics endpoint and snapshot refresh thread once,
+    independently of the pool, so a failed pool creation retried by the next
+    session does not bind the metrics port or start a refresh thread again.
+    Both starts are idempotent as well.
+    """
+    try:
+        query_metrics.serve_metrics()
+    except OSError as e:
+        # e.g. the port is taken by another process: the pages work without the endpoint
+        print(f"Could not serve query metrics on port {db_config.METRICS_PORT}: {e}")
+    snapshot.start_background_refresh()
+
+
+class UserPool:
+    """
+    Per-session view over the shared pool, stored in st.session_state.db_pool.
+    Pages keep calling db_pool.acquire() and get a connection authenticated as
+    the logged in user, instrumented by query_metrics.
+    """
+
+    def __init__(self, pool, username, password):
+        self.pool = pool
+        self.username = username
+        self._password = password
+
+    def acquire(self):
+        return query_metrics.timed_acquire(
+            lambda: self.pool.acquire(user=self.username, password=self._password)
+        )
+
+    def close(self):
+        # The shared pool outlives the session: only forget the credentials.
+        self._password = None
+
 
 def get_all_db_users():
     """
@@ -97,20 +87,13 @@ def get_all_db_users():
     try:
         # Use a temporary connection for this privileged query
         with oracledb.connect(
-            user=SYS_DB_USER,
-            password=SYS_DB_PASSWORD,
-            host=DB_HOST,
-            port=DB_PORT,
-            service_name=DB_SERVICE_NAME
+            user=db_config.SYS_DB_USER,
+            password=db_config.SYS_DB_PASSWORD,
+            **db_config.connect_params()
         ) as temp_conn:
             with temp_conn.cursor() as cursor:
                 # Query ALL_USERS, excluding common Oracle system users
-                cursor.execute("""
-                    SELECT USERNAME FROM ALL_USERS
-                    WHERE USERNAME = 'SYSTEM'
-                       OR USERNAME LIKE 'C##%'
-                    ORDER BY USERNAME
-                """)
+                cursor.execute(sql_catalogue.DB_USERS)
                 for row in cursor:
                     users.append(row[0])
     except oracledb.Error as e:
@@ -125,40 +108,30 @@ def get_all_db_users():
 
 def initialize_db_pool(username, password):
     """
-    Initializes and returns the Oracle DB connection pool using provided credentials.
-    Stores the pool and connected status in session state.
+    Validates the provided credentials against the shared pool and stores
+    a UserPool for them in session state.
     """
-    if st.session_state.db_pool: # Close any existing pool first
-        try:
-            st.session_state.db_pool.close()
-            st.session_state.db_pool = None
-        except Exception as e:
-            print(f"Warning: Error closing existing DB pool during re-initialization: {e}")
+    close_db_pool() # Forget any previous login first
 
-    print(f"Attempting to initialize database connection pool for user: {username}...")
+    print(f"Attempting to log in to the shared database pool as: {username}...")
     try:
-        pool = oracledb.create_pool(
-            user=username,
-            password=password,
-            host=DB_HOST,
-            port=DB_PORT,
-            service_name=DB_SERVICE_NAME,
-            min=1, # Min connections for login
-            max=3, # Max connections for login
-            increment=1,
-        )
-        st.session_state.db_pool = pool
+        start_background_services()
+        user_pool = UserPool(get_shared_pool(), username, password)
+        # Acquiring once checks the credentials before the session is marked as connected
+        with user_pool.acquire() as connection:
+            connection.ping()
+        st.session_state.db_pool = user_pool
         st.session_state.db_connected = True
         st.session_state.logged_in_user = username
         st.success(f"Successfully connected to the database as `{username}`!")
-        print(f"Database connection pool initialized successfully for {username}.")
+        print(f"Session logged in to the shared pool as {username}.")
         return True # Indicate success
     except oracledb.Error as e:
         error_obj, = e.args
         st.session_state.db_connected = False
         st.session_state.logged_in_user = None
         st.error(f"Failed to connect to database: {error_obj.message}")
-        print(f"Error initializing DB pool for {username}: {error_obj.message}")
+        print(f"Error logging in as {username}: {error_obj.message}")
         return False # Indicate failure
     except Exception as e:
         st.session_state.db_connected = False
@@ -167,21 +140,60 @@ def initialize_db_pool(username, password):
         print(f"Unexpected error during connection: {e}")
         return False # Indicate failure
 
+
 def logout():
-    """Logs out the user and closes the database pool."""
-    close_db_pool() # Close the DB pool if it exists
+    """Logs out the user and releases the session's view of the database pool."""
+    close_db_pool()
     st.session_state.logged_in_user = None
     st.info("You have been logged out.")
     st.rerun() # Force rerun to clear state and show login page
-    
+
 
 def close_db_pool():
-    """Closes the current database connection pool if it exists."""
+    """Detaches the session from the shared pool. The pool itself stays open for other sessions."""
     if st.session_state.db_pool:
         try:
             st.session_state.db_pool.close()
-            st.session_state.db_pool = None
-            st.session_state.db_connected = False
-            print("Database connection pool closed.")
+            print("Session detached from the shared database pool.")
         except Exception as e:
-            print(f"Error closing DB pool: {e}")
+            print(f"Error detaching from DB pool: {e}")
+    st.session_state.db_pool = None
+    st.session_state.db_connected = False
+
+
+def snapshot_toggle():
+    """
+    Sidebar switch letting a read-only page answer from the local DuckDB snapshot,
+    with its age and a manual refresh. Returns True when the page should read the snapshot.
+    The snapshot is copied as the schema owner, so the switch is only shown to
+    the users in SNAPSHOT_USERS; everyone else always reads the database.
+    """
+    user = st.session_state.logged_in_user
+    if not user or user.upper() not in db_config.SNAPSHOT_USERS:
+        return False
+    try:
+        status = snapshot.snapshot.status()
+    except duckdb.Error as e:
+        st.sidebar.caption(f"Local snapshot unavailable: {e}")
+        return False
+
+    use_snapshot = st.sidebar.toggle(
+        "Read from local snapshot", key="use_snapshot", disabled=status is None,
+        help="Answer this page from a local copy of the reporting tables instead of the database."
+    )
+    if status is None:
+        st.sidebar.caption("No local snapshot yet.")
+    elif status.stale:
+        st.sidebar.warning(f"Snapshot is stale: last refreshed {status.age_seconds / 60:.0f} min ago.")
+    else:
+        st.sidebar.caption(f"Snapshot refreshed {status.age_seconds / 60:.0f} min ago ({status.refreshed_at:%H:%M}).")
+
+    if st.sidebar.button("Refresh snapshot", key="snapshot_refresh"):
+        try:
+            with st.spinner("Refreshing local snapshot..."):
+                snapshot.refresh_now()
+        except (oracledb.Error, duckdb.Error) as e:
+            st.sidebar.error(f"Snapshot refresh failed: {e}")
+        else:
+            st.rerun()
+    return use_snapshot and status is not None
@@ -0,0 +1,156 @@
+# webapp/expiry_forecast.py
+import threading
+import time
+from datetime import date, timedelta
+import pandas as pd
+import data_access
+import db_config
+
+# --- Expiring-soon forecast ---
+# Batches whose product expires within the horizon are aggregated by the database
+# per (center, category, expiry day) from the BatchFact reporting table and kept in process memory, one
+# aggregate per database user (what BatchFact returns depends on who queries it, as
+# for query_cache), shared by that user's sessions. Week and 7/30/90-day figures are bucketed from that small frame with
+# vectorised pandas operations. A refresh only fetches what is new: the days that
+# entered the horizon since the last refresh (range scan on IdxBatchFactExpiryDate)
+# and the batches registered since then (BatchID above the last one seen, on the
+# primary key). A full reload runs after FORECAST_FULL_REFRESH_SECONDS to pick up
+# edits and deletions. The increment only sees BatchIDs above the highest one seen,
+# so batches committed out of ID order (sequence values are cached, and concurrent
+# transactions commit in any order) or inserted with explicit lower IDs are also
+# only counted at the next full reload. Driving the increment from ORA_ROWSCN
+# instead would need a scan of BatchFact per refresh (ORA_ROWSCN is not indexed)
+# and could not tell edits of counted rows from late inserts, so the lag is
+# accepted and shown on the page.
+
+FORECAST_SQL = """
+    SELECT f.CenterName, f.ProductCategory, TRUNC(f.ExpiryDate) AS ExpiryDate,
+           COUNT(*) AS Batches, SUM(f.Quantity) AS Quantity
+    FROM BatchFact f
+    {where}
+    GROUP BY f.CenterName, f.ProductCategory, TRUNC(f.ExpiryDate)
+"""
+
+# Known batches expiring in [from_date, to_date)
+EXPIRY_RANGE_FILTER = """
+    WHERE f.ExpiryDate >= :from_date AND f.ExpiryDate < :to_date
+      AND f.BatchID <= :last_batch
+"""
+
+# Batches registered since the last refresh, expiring in [from_date, to_date)
+NEW_BATCHES_FILTER = """
+    WHERE f.BatchID > :after_batch AND f.BatchID <= :last_batch
+      AND f.ExpiryDate >= :from_date AND f.ExpiryDate < :to_date
+"""
+
+LAST_BATCH_SQL = "SELECT NVL(MAX(BatchID), 0) FROM BatchFact"
+
+KEYS = ["Center", "Category", "Expiry Date"]
+COLUMNS = {
+    "CENTERNAME": "Center",
+    "PRODUCTCATEGORY": "Category",
+    "EXPIRYDATE": "Expiry Date",
+    "BATCHES": "Batches",
+    "QUANTITY": "Quantity",
+}
+WINDOWS = (7, 30, 90)
+
+
+def _fetch(connection, where, params):
+    df = data_access.fetch_dataframe(connection, FORECAST_SQL.format(where=where), params)
+    df = df.rename(columns=COLUMNS)
+    df["Expiry Date"] = pd.to_datetime(df["Expiry Date"]).dt.normalize()
+    return df
+
+
+class ExpiryForecast:
+    """Thread-safe, incrementally refreshed per-day aggregate of batches expiring within a horizon."""
+
+    def __init__(self, horizon_days, full_refresh_seconds):
+        self.horizon_days = horizon_days
+        self.full_refresh_seconds = full_refresh_seconds
+        self._daily = None # Center, Category, Expiry Date, Batches, Quantity
+        self._end = None
+        self._last_batch = 0
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self.last_refresh = None # ("full" | "incremental", rows fetched, seconds)
+
+    def full_refresh_due_in(self):
+        """Seconds until the next refresh reloads the aggregate in full (0 when due)."""
+        with self._lock:
+            if self._daily is None:
+                return 0.0
+            return max(0.0, self.full_refresh_seconds - (time.monotonic() - self._loaded_at))
+
+    def invalidate(self):
+        """Forces a full reload on the next refresh."""
+        with self._lock:
+            self._daily = None
+
+    def refresh(self, connection, today=None):
+        """Brings the aggregate up to date and returns a copy of it."""
+        today = today or date.today()
+        end = today + timedelta(days=self.horizon_days)
+        with self._lock:
+            started = time.perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute(LAST_BATCH_SQL)
+                last_batch = int(cursor.fetchone()[0])
+
+            if self._daily is None or time.monotonic() - self._loaded_at > self.full_refresh_seconds:
+                daily = _fetch(connection, EXPIRY_RANGE_FILTER,
+                               {'from_date': today, 'to_date': end, 'last_batch': last_batch})
+                fetched, kind = len(daily), "full"
+                self._loaded_at = time.monotonic()
+            else:
+                parts = [self._daily[self._daily["Expiry Date"] >= pd.Timestamp(today)]]
+                if end > self._end:
+                    parts.append(_fetch(connection, EXPIRY_RANGE_FILTER, {
+                        'from_date': max(self._end, today), 'to_date': end, 'last_batch': self._last_batch,
+                    }))
+                if last_batch > self._last_batch:
+                    parts.append(_fetch(connection, NEW_BATCHES_FILTER, {
+                        'after_batch': self._last_batch, 'last_batch': last_batch,
+                        'from_date': today, 'to_date': end,
+                    }))
+                fetched, kind = sum(len(part) for part in parts[1:]), "incremental"
+                daily = pd.concat(parts, ignore_index=True).groupby(KEYS, as_index=False)[["Batches", "Quantity"]].sum()
+
+            self._daily = daily
+            self._end, self._last_batch = end, last_batch
+            self.last_refresh = (kind, fetched, time.perf_counter() - started)
+            return daily.copy()
+
+
+def weekly(daily, today=None):
+    """Quantity-weighted totals per center x category x week; weeks start today."""
+    today = pd.Timestamp(today or date.today())
+    df = daily.assign(Week=today + pd.to_timedelta((daily["Expiry Date"] - today).dt.days // 7 * 7, unit="D"))
+    return df.groupby(["Center", "Category", "Week"], as_index=False)[["Batches", "Quantity"]].sum()
+
+
+def windows(daily, today=None, days=WINDOWS):
+    """Quantity expiring within each of the next `days` windows, per center x category."""
+    today = pd.Timestamp(today or date.today())
+    offsets = (daily["Expiry Date"] - today).dt.days
+    df = daily[["Center", "Category"]].copy()
+    for window in days:
+        df[f"Next {window} days"] = daily["Quantity"].where(offsets < window, 0)
+    return df.groupby(["Center", "Category"], as_index=False).sum()
+
+
+_forecasts = {} # database user -> ExpiryForecast
+_forecasts_lock = threading.Lock()
+
+
+def for_user(username):
+    """Returns the forecast of a database user, creating it on first use."""
+    key = (username or "").upper()
+    with _forecasts_lock:
+        forecast = _forecasts.get(key)
+        if forecast is None:
+            forecast = _forecasts[key] = ExpiryForecast(
+                db_config.FORECAST_HORIZON_DAYS, db_config.FORECAST_FULL_REFRESH_SECONDS
+            )
+        return forecast
@@ -0,0 +1,46 @@
+# webapp/expiry_sweep.py
+import data_access
+
+# --- Quarantined batches of expired products ---
+# The SweepExpiredBatches procedure (scripts/08_expiry_sweep.sql) runs daily and
+# quarantines the batches of products that expired since its previous run, so the
+# expired batches page reads a precomputed set joined by primary key to the
+# BatchFact reporting table instead of checking every batch's product on each view.
+
+QUARANTINE_SQL = """
+    SELECT q.BatchID, f.SerialNo, f.ProductCategory, f.ExpiryDate,
+           f.Quantity, f.ArrivalDate, f.CenterName, q.QuarantinedAt
+    FROM BatchQuarantine q
+    JOIN BatchFact f ON f.BatchID = q.BatchID
+    ORDER BY q.BatchID
+"""
+
+SWEEP_STATE_SQL = """
+    SELECT SweptThrough, LastRunAt, LastQuarantined
+    FROM ExpirySweepState
+    WHERE SweepName = 'EXPIRED_BATCHES'
+"""
+
+
+def load_quarantine_frame(connection):
+    """Quarantined batches with product and center, as a DataFrame for display."""
+    return data_access.fetch_dataframe(connection, QUARANTINE_SQL)
+
+
+def sweep_state(connection):
+    """Returns (swept_through, last_run_at, last_quarantined), or None before the first run."""
+    with connection.cursor() as cursor:
+        cursor.execute(SWEEP_STATE_SQL)
+        return cursor.fetchone()
+
+
+def run_sweep(connection, rebuild=False):
+    """
+    Runs the sweep now and commits. Returns the number of batches it quarantined.
+    With rebuild=True every expired product is re-checked, not only those
+    that expired since the last run.
+    """
+    with connection.cursor() as cursor:
+        cursor.callproc("SweepExpiredBatches", [1 if rebuild else 0])
+    connection.commit()
+    return sweep_state(connection)[2]
@@ -0,0 +1,85 @@
+# webapp/lookups.py
+from collections import namedtuple
+
+# --- Batch -> product -> center -> team lookup ---
+# ProductBatch.ByDistCenter is the source of truth for where a batch is stored,
+# so a single REF join (backed by IdxProdBatchDistCenter and IdxProdBatchProduct)
+# resolves every batch in one round trip instead of one query per batch.
+# Batches change with every registration and order, from this process and from
+# others (REST service, tools), so the lookup is never served from query_cache.
+
+BatchInfo = namedtuple(
+    "BatchInfo",
+    [
+        "batch_id", "serial_no", "category", "expiry_date",
+        "quantity", "arrival_date", "center_name", "team_code", "team_name",
+    ],
+)
+
+BATCH_LOOKUP_SQL = """
+    SELECT pb.BatchID, p.SerialNo, p.ProductCategory, p.ExpiryDate,
+           pb.Quantity, pb.ArrivalDate, dc.CenterName, lt.TeamCode, lt.TeamName
+    FROM ProductBatch pb
+    JOIN Product p ON pb.BatchProduct = REF(p)
+    JOIN DistributionCenter dc ON pb.ByDistCenter = REF(dc)
+    JOIN LogisticTeam lt ON dc.ByTeam = REF(lt)
+    {where}
+    ORDER BY pb.BatchID
+"""
+
+ORDER_BATCHES_FILTER = """
+    WHERE REF(pb) IN (
+        SELECT t.COLUMN_VALUE
+        FROM BatchOrder bo, TABLE(bo.OrderBatches) t
+        WHERE bo.OrderID = :order_id
+    )
+"""
+
+class BatchLookup:
+    """In-memory index over BatchInfo rows, by batch id and by distribution center."""
+
+    def __init__(self, rows):
+        self.by_id = {}
+        self.by_center = {}
+        for row in rows:
+            info = BatchInfo(*row)
+            self.by_id[info.batch_id] = info
+            self.by_center.setdefault(info.center_name, []).append(info)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def centers(self):
+        """Returns the names of the centers holding at least one batch, sorted."""
+        return sorted(self.by_center)
+
+    def batches_at(self, center_name):
+        return self.by_center.get(center_name, [])
+
+    def center_of(self, batch_id):
+        info = self.by_id.get(batch_id)
+        return info.center_name if info else None
+
+    def teams_of(self, center_name):
+        """Returns {TeamCode: TeamName} for the teams serving a center."""
+        return {info.team_code: info.team_name for info in self.batches_at(center_name)}
+
+
+def _batch_lookup_query(order_id=None):
+    if order_id is not None:
+        return BATCH_LOOKUP_SQL.format(where=ORDER_BATCHES_FILTER), {'order_id': order_id}
+    return BATCH_LOOKUP_SQL.format(where=""), {}
+
+
+def load_batch_lookup(connection, order_id=None):
+    """
+    Fetches batch, product, center and team in a single round trip.
+    Optionally restricted to the batches of one order.
+    """
+    sql, params = _batch_lookup_query(order_id)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return BatchLookup(cursor.fetchall())
@@ -0,0 +1,131 @@
+# webapp/object_fetch.py
+from collections import defaultdict
+import oracledb
+import pandas as pd
+import data_access
+
+# --- Native object and collection fetch ---
+# Object columns (ContactInfo, Location) are fetched as DbObjects and turned into
+# Python dicts and lists by an output type handler while the rows are read, so
+# a VARRAY such as PhoneList arrives as a list instead of a LISTAGG string built
+# by a subquery per row. Collections of REFs (SupplyPreferences, BelongsToDepts)
+# are resolved for a whole page at once: one query unnests the page's
+# collections and joins the referenced rows, and the results are grouped by key.
+
+
+def to_python(value):
+    """Converts a DbObject (recursively) to a dict, or to a list for collections."""
+    if not isinstance(value, oracledb.DbObject):
+        return value
+    if value.type.iscollection:
+        return [to_python(element) for element in value.aslist()]
+    return {attr.name: to_python(getattr(value, attr.name)) for attr in value.type.attributes}
+
+
+def object_type_handler(cursor, metadata):
+    """Output type handler fetching object and collection columns as Python structures."""
+    if metadata.type_code is oracledb.DB_TYPE_OBJECT:
+        return cursor.var(metadata.type, arraysize=cursor.arraysize, outconverter=to_python)
+
+
+def fetch_object_frame(connection, sql, params=None, arraysize=data_access.DEFAULT_ARRAYSIZE):
+    """
+    Runs a query that selects object columns and returns a pandas DataFrame.
+    Object columns hold dicts/lists; the Arrow fetch of fetch_dataframe() cannot carry them.
+    """
+    with connection.cursor() as cursor:
+        cursor.arraysize = arraysize
+        cursor.prefetchrows = arraysize
+        cursor.outputtypehandler = object_type_handler
+        cursor.execute(sql, params or {})
+        columns = [col[0] for col in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+
+def _grouped(connection, sql, keys, prefix):
+    """Runs a batched resolution query for `keys`; returns {key: [row tuple without key]}."""
+    in_list, binds = data_access.in_list_binds(keys, prefix)
+    grouped = defaultdict(list)
+    with connection.cursor() as cursor:
+        cursor.outputtypehandler = object_type_handler
+        cursor.execute(sql.format(in_list=in_list), binds)
+        for key, *rest in cursor:
+            grouped[key].append(rest)
+    return grouped
+
+
+def _chunks(values, size=data_access.IN_LIST_BUCKETS[-1]):
+    values = list(dict.fromkeys(values))
+    for offset in range(0, len(values), size):
+        yield values[offset:offset + size]
+
+
+# --- Departments ---
+
+DEPARTMENT_PREFERENCES_SQL = """
+    SELECT d.DepartmentID, p.SerialNo
+    FROM Department d, TABLE(d.SupplyPreferences) sp, Product p
+    WHERE sp.COLUMN_VALUE = REF(p)
+      AND d.DepartmentID IN ({in_list})
+    ORDER BY d.DepartmentID, p.SerialNo
+"""
+
+
+def resolve_departments(connection, frame):
+    """
+    Expands a page of (DEPARTMENTID, DEPTCONTACT) rows: the contact becomes
+    email, fax and phone number list columns, and the supply preferences are
+    resolved to product serial numbers in one query for the page.
+    """
+    preferences = {}
+    for keys in _chunks(frame["DEPARTMENTID"]):
+        preferences.update(_grouped(connection, DEPARTMENT_PREFERENCES_SQL, keys, "dept"))
+    contact = frame.pop("DEPTCONTACT")
+    frame["DEPARTMENTEMAIL"] = [c["EMAIL"] if c else None for c in contact]
+    frame["DEPARTMENTFAX"] = [c["FAX"] if c else None for c in contact]
+    frame["DEPARTMENTPHONENUMBERS"] = [(c["PHONENUMBERS"] or []) if c else [] for c in contact]
+    frame["SUPPLYPREFERENCESERIALNOS"] = [
+        [row[0] for row in preferences.get(key, [])] for key in frame["DEPARTMENTID"]
+    ]
+    return frame
+
+
+# --- Customers ---
+
+CUSTOMER_DEPARTMENTS_SQL = """
+    SELECT c.CustomerCode, d.DepartmentID, d.DeptContact
+    FROM Customer c, TABLE(c.BelongsToDepts) bd, Department d
+    WHERE bd.COLUMN_VALUE = REF(d)
+      AND c.CustomerCode IN ({in_list})
+    ORDER BY c.CustomerCode, d.DepartmentID
+"""
+
+
+def resolve_customers(connection, frame):
+    """
+    Expands a page of (CUSTOMERCODE, CUSTOMERLOCATION) rows: the location
+    becomes address columns, and the affiliated departments are resolved in one
+    query for the page into a list of {DepartmentID, Email, Fax, PhoneNumbers}.
+    """
+    departments = {}
+    for keys in _chunks(frame["CUSTOMERCODE"]):
+        departments.update(_grouped(connection, CUSTOMER_DEPARTMENTS_SQL, keys, "customer"))
+    location = frame.pop("CUSTOMERLOCATION")
+    for attr in ("CITY", "STREET", "STREETNO", "ZIPCODE"):
+        frame[f"CUSTOMER{attr}"] = [loc[attr] if loc else None for loc in location]
+    frame["DEPARTMENTIDS"] = [
+        [dept_id for dept_id, _ in departments.get(key, [])] for key in frame["CUSTOMERCODE"]
+    ]
+    frame["DEPARTMENTS"] = [
+        [
+            {
+                "DepartmentID": dept_id,
+                "Email": contact["EMAIL"] if contact else None,
+                "Fax": contact["FAX"] if contact else None,
+                "PhoneNumbers": (contact["PHONENUMBERS"] or []) if contact else [],
+            }
+            for dept_id, contact in departments.get(key, [])
+        ]
+        for key in frame["CUSTOMERCODE"]
+    ]
+    return frame
@@ -0,0 +1,63 @@
+import streamlit as st
+import oracledb
+import db_utils
+import expiry_forecast
+
+st.title("⌛ Batches Expiring Soon")
+
+if not db_utils.st.session_state.db_connected or not db_utils.st.session_state.logged_in_user:
+    st.warning("You must be logged in to view the expiry forecast. Please go to the **'Login'** page.")
+else:
+    reload = st.button("Reload forecast")
+
+    try:
+        with db_utils.st.session_state.db_pool.acquire() as connection:
+            # Shared by the sessions of the same user; only new days and new batches are fetched
+            forecast = expiry_forecast.for_user(connection.username)
+            if reload:
+                forecast.invalidate()
+            daily = forecast.refresh(connection)
+    except oracledb.Error as e:
+        error_obj, = e.args
+        st.error(f"Error loading the expiry forecast: {error_obj.message}")
+        st.stop()
+
+    kind, fetched, seconds = forecast.last_refresh
+    st.caption(
+        f"Batches expiring in the next {forecast.horizon_days} days, weighted by quantity. "
+        f"Last refresh: {kind}, {fetched} aggregate rows fetched in {seconds * 1000:.0f} ms."
+    )
+    st.caption(
+        "Incremental refreshes only add batches with a higher BatchID than any seen before. "
+        "Edited or deleted batches, and batches committed out of BatchID order, are included at the "
+        f"next full reload (in {forecast.full_refresh_due_in() / 60:.0f} min) or with **Reload forecast**."
+    )
+
+    if daily.empty:
+        st.info(f"No product batches expire in the next {forecast.horizon_days} days.")
+    else:
+        # --- Filters ---
+        col1, col2 = st.columns(2)
+        centers = col1.multiselect("Distribution centers", sorted(daily["Center"].unique()))
+        categories = col2.multiselect("Categories", sorted(daily["Category"].unique()))
+        if centers:
+            daily = daily[daily["Center"].isin(centers)]
+        if categories:
+            daily = daily[daily["Category"].isin(categories)]
+
+        # --- 7/30/90-day windows ---
+        days = [window for window in expiry_forecast.WINDOWS if window <= forecast.horizon_days]
+        by_window = expiry_forecast.windows(daily, days=days)
+        for col, window in zip(st.columns(len(days)), days):
+            col.metric(f"Next {window} days", f"{int(by_window[f'Next {window} days'].sum()):,}")
+        st.dataframe(by_window, use_container_width=True, hide_index=True)
+
+        # --- Weekly buckets ---
+        st.subheader("Quantity expiring per week")
+        weeks = expiry_forecast.weekly(daily)
+        chart = weeks.groupby(["Week", "Category"], as_index=False)["Quantity"].sum()
+        chart["Week"] = chart["Week"].dt.strftime("%Y-%m-%d")
+        st.bar_chart(chart, x="Week", y="Quantity", color="Category")
+        with st.expander("Weekly figures by center and category"):
+            weeks["Week"] = weeks["Week"].dt.strftime("%Y-%m-%d")
+            st.dataframe(weeks, use_container_width=True, hide_index=True)
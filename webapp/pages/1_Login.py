@@ -1,6 +1,7 @@
 # webapp/pages/Login.py
 import streamlit as st
 import db_utils # Import your database utility functions
+import sql_catalogue
 
 st.title("🔐 Login to Oracle Database")
 st.markdown("Select your username and enter your password to connect to the database.")
@@ -33,7 +34,7 @@ if db_utils.st.session_state.db_connected and db_utils.st.session_state.db_pool:
         try:
             with db_utils.st.session_state.db_pool.acquire() as connection:
                 with connection.cursor() as cursor:
-                    cursor.execute("SELECT SYSDATE FROM DUAL")
+                    cursor.execute(sql_catalogue.DB_SYSDATE)
                     db_time = cursor.fetchone()[0]
                     st.success(f"Current DB SYSDATE: {db_time.strftime('%Y-%m-%d %H:%M:%S')}")
         except Exception as e:
@@ -1,257 +1,123 @@
 # webapp/pages/Tables.py
+import os
 import streamlit as st
-import pandas as pd
+import duckdb
 import oracledb
 import db_utils # Import your database utility functions
+import snapshot
+import table_browser
+import table_export
 
 
 st.title("🗄️ MedTech Logistic Tables Overview")
 
 
-def products():
-    with st.expander("Products", expanded=False):
-        with connection.cursor() as cursor:
-            cursor.execute(
-                'SELECT * FROM Product'
-            )
-            rows = cursor.fetchall()
-            if rows:
-                columns = [desc[0] for desc in cursor.description]
-                df = pd.DataFrame(rows, columns=columns)
-                st.dataframe(df, use_container_width=True)
-                st.info(f"Showing {len(df)} rows from Product.")
-            else:
-                st.info("Product table is empty or no data accessible.")
-  
-         
-def product_batches():
-    with st.expander("Products Batches", expanded=False):
-        with connection.cursor() as cursor:
-            cursor.execute(
-                '''
-                SELECT
-                    PB.BatchID,
-                    PB.Quantity,
-                    PB.ArrivalDate,
-                    DEREF(PB.BatchProduct).SerialNo AS ProductSerialNo,
-                    DEREF(PB.BatchProduct).ProductCategory AS ProductCategory,
-                    DEREF(PB.BatchProduct).ExpiryDate AS ProductExpiryDate
-                FROM
-                    ProductBatch PB
-                '''
-            )
-            rows = cursor.fetchall()
-            if rows:
-                columns = [desc[0] for desc in cursor.description]
-                df = pd.DataFrame(rows, columns=columns)
-                st.dataframe(df, use_container_width=True)
-                st.info(f"Showing {len(df)} rows from ProductBatch (Product REF DEREFed).")
-            else:
-                st.info("ProductBatch table is empty or no data accessible.")
-
-
-def departments():
-    with st.expander("Departments", expanded=False):
-        with connection.cursor() as cursor:
-            cursor.execute(
-                '''
-                SELECT
-                    D.DepartmentID,
-                    D.DeptContact.Email AS DepartmentEmail,
-                    D.DeptContact.Fax AS DepartmentFax,
-                    (SELECT LISTAGG(P.COLUMN_VALUE, ', ') WITHIN GROUP (ORDER BY ROWNUM)
-                        FROM TABLE(D.DeptContact.PhoneNumbers) P) AS DepartmentPhoneNumbers,
-                    (SELECT LISTAGG(DEREF(SP.COLUMN_VALUE).SerialNo, ', ')
-                        FROM TABLE(D.SupplyPreferences) SP) AS SupplyPreferenceSerialNos
-                FROM Department D
-                '''
-            )
-            rows = cursor.fetchall()
-            if rows:
-                columns = [desc[0] for desc in cursor.description]
-                df = pd.DataFrame(rows, columns=columns)
-                st.dataframe(df, use_container_width=True)
-                st.info(f"Showing {len(df)} rows from Department.")
-            else:
-                st.info("Department table is empty or no data accessible.")
-     
-
-def customers():
-    with st.expander("Customers", expanded=False):
-        with connection.cursor() as cursor:
-            cursor.execute(
-                '''
-                SELECT
-                    C.CustomerCode,
-                    DEREF(DeptRef.COLUMN_VALUE).DepartmentID AS DepartmentID,
-                    DEREF(DeptRef.COLUMN_VALUE).DeptContact.Email AS DepartmentEmail,
-                    DEREF(DeptRef.COLUMN_VALUE).DeptContact.Fax AS DepartmentFax,
-                    (SELECT LISTAGG(Phone.COLUMN_VALUE, ', ') WITHIN GROUP (ORDER BY ROWNUM)
-                    FROM TABLE(DEREF(DeptRef.COLUMN_VALUE).DeptContact.PhoneNumbers) Phone
-                    ) AS DepartmentPhoneNumbers
-                FROM
-                    Customer C,
-                    TABLE(C.BelongsToDepts) DeptRef
-                '''
-            )
-            rows = cursor.fetchall()
-            if rows:
-                columns = [desc[0] for desc in cursor.description]
-                df = pd.DataFrame(rows, columns=columns)
-                st.dataframe(df, use_container_width=True)
-                st.info(f"Showing {len(df)} rows from ViewCustomerDeptAffiliation.")
-            else:
-                st.info("ViewCustomerDeptAffiliation view is empty or no data accessible.")
-
-
-def team_members():
-    with st.expander("Team Members", expanded=False):
-        with connection.cursor() as cursor:
-            cursor.execute(
-                'SELECT * FROM TeamMember'
-            )
-            rows = cursor.fetchall()
-            if rows:
-                columns = [desc[0] for desc in cursor.description]
-                df = pd.DataFrame(rows, columns=columns)
-                st.dataframe(df, use_container_width=True)
-                st.info(f"Showing {len(df)} rows from TeamMember.")
-            else:
-                st.info("TeamMember table is empty or no data accessible.")
-
-           
-def chief_officiers():
-    with st.expander("Chief Officiers", expanded=False):
-        with connection.cursor() as cursor:
-            cursor.execute(
-                'SELECT tm.TaxCode, tm.MemberName, tm.MemberSurname, tm.BirthDate, tm.EmploymentDate, co.StartDate FROM ChiefOfficier co, TeamMember tm WHERE co.TaxCode = tm.TaxCode'
-            )
-            rows = cursor.fetchall()
-            if rows:
-                columns = [desc[0] for desc in cursor.description]
-                df = pd.DataFrame(rows, columns=columns)
-                st.dataframe(df, use_container_width=True)
-                st.info(f"Showing {len(df)} rows from ChiefOfficier.")
-            else:
-                st.info("ChiefOfficier table is empty or no data accessible.")
-
-
-def logistic_teams():
-    with st.expander("Logistic Teams", expanded=False):
-        with connection.cursor() as cursor:
-            cursor.execute(
-                '''
-                SELECT
-                    LT.TeamCode,
-                    LT.TeamName,
-                    DEREF(LT.TeamChief).TaxCode AS ChiefTaxCode,
-                    TMEM.MemberName AS ChiefName,
-                    TMEM.MemberSurname AS ChiefSurname,
-                    LT.CompletedDeliveries,
-                    DEREF(TM.COLUMN_VALUE).TaxCode AS MemberTaxCode,
-                    DEREF(TM.COLUMN_VALUE).MemberName AS MemberName,
-                    DEREF(TM.COLUMN_VALUE).MemberSurname AS MemberSurname,
-                    DEREF(TM.COLUMN_VALUE).BirthDate AS MemberBirthDate,
-                    DEREF(TM.COLUMN_VALUE).EmploymentDate AS MemberEmploymentDate
-                FROM
-                    LogisticTeam LT
-                    LEFT JOIN TeamMember TMEM ON TMEM.TaxCode = DEREF(LT.TeamChief).TaxCode,
-                    TABLE(LT.TeamMembers) TM
-                '''
-            )
-            rows = cursor.fetchall()
-            if rows:
-                columns = [desc[0] for desc in cursor.description]
-                df = pd.DataFrame(rows, columns=columns)
-                st.dataframe(df, use_container_width=True)
-                st.info(f"Showing {len(df)} rows from LogisticTeam.")
-            else:
-                st.info("LogisticTeam table is empty or no data accessible.")
-
-
-def distribution_centers():
-    with st.expander("Distribution Centers", expanded=False):
-        with connection.cursor() as cursor:
-            cursor.execute(
-                '''
-                SELECT
-                    DC.CenterName,                    
-                    DEREF(P.COLUMN_VALUE).SerialNo AS ProductSerialNo,
-                    DEREF(P.COLUMN_VALUE).ProductCategory AS ProductCategory,
-                    DEREF(P.COLUMN_VALUE).ExpiryDate AS ProductExpiryDate
-                FROM
-                    DistributionCenter DC,
-                    TABLE(DC.ListOfProducts) P
-                '''
-            )
-            rows = cursor.fetchall()
-            if rows:
-                columns = [desc[0] for desc in cursor.description]
-                df = pd.DataFrame(rows, columns=columns)
-                st.dataframe(df, use_container_width=True)
-                st.info(f"Showing {len(df)} rows from ViewDistCenterProducts.")
-            else:
-                st.info("ViewDistCenterProducts view is empty or no data accessible.")
-
-
-def batch_orders():
-    with st.expander("Batch Orders", expanded=False):
-        with connection.cursor() as cursor:
-            cursor.execute(
-                '''
-                SELECT
-                    BO.OrderID,
-                    BO.OrderDate,
-                    BO.ExpectedDeliveryDate,
-                    BO.DeliveryStatus,
-                    DEREF(BO.ByCustomer).CustomerCode AS CustomerCode,
-                    DEREF(BO.ByCustomer).CustomerLocation.City AS CustomerCity,
-                    DEREF(BO.ByCustomer).CustomerLocation.Street AS CustomerStreet,
-                    DEREF(BO.ByCustomer).CustomerLocation.ZipCode AS CustomerZipCode,
-                    DEREF(BO.ByLogisticTeam).TeamCode AS LogisticTeamCode,
-                    DEREF(BO.ByLogisticTeam).TeamName AS LogisticTeamName
-                FROM
-                    BatchOrder BO
-                '''
-            )
-            rows = cursor.fetchall()
-            if rows:
-                columns = [desc[0] for desc in cursor.description]
-                df = pd.DataFrame(rows, columns=columns)
-                st.dataframe(df, use_container_width=True)
-                st.info(f"Showing {len(df)} rows from ViewBatchOrderDetails.")
-            else:
-                st.info("ViewBatchOrderDetails view is empty or no data accessible.")
-
-
-def complaints():
-    with st.expander("Complaints", expanded=False):
-        with connection.cursor() as cursor:
-            cursor.execute(
-                '''
-                SELECT
-                    C.TicketID,
-                    C.ComplaintType,
-                    C.StartDate AS ComplaintStartDate,
-                    C.EndDate AS ComplaintEndDate,
-                    DEREF(C.ByCustomer).CustomerCode AS CustomerCode,
-                    DEREF(C.ByCustomer).CustomerLocation.City AS CustomerCity,
-                    DEREF(C.ByCustomer).CustomerLocation.Street AS CustomerStreet,
-                    DEREF(C.OnBatchOrder).OrderID AS BatchOrderID,
-                    DEREF(C.OnBatchOrder).DeliveryStatus AS BatchOrderDeliveryStatus,
-                    DEREF(C.OnBatchOrder).OrderDate AS BatchOrderDate
-                FROM
-                    Complaint C
-                '''
-            )
-            rows = cursor.fetchall()
-            if rows:
-                columns = [desc[0] for desc in cursor.description]
-                df = pd.DataFrame(rows, columns=columns)
-                st.dataframe(df, use_container_width=True)
-                st.info(f"Showing {len(df)} rows from Complaint.")
-            else:
-                st.info("Complaint table is empty or no data accessible.")
+def table_controls(name):
+    """
+    Renders one catalogue table's expander and controls.
+    Returns (PageRequest, placeholder for the results), or None when the table is not loaded.
+    """
+    spec = table_browser.TABLES[name]
+    with st.expander(spec.title, expanded=False):
+        if not st.toggle("Load data", key=f"{name}_load"):
+            st.caption("Turn on **Load data** to query this table.")
+            return None
+
+        col_sort, col_dir, col_filter_by, col_filter = st.columns([2, 1, 2, 3])
+        sort_column = col_sort.selectbox("Sort by", spec.columns, key=f"{name}_sort")
+        descending = col_dir.toggle("Descending", key=f"{name}_desc")
+        filter_column = col_filter_by.selectbox("Filter on", spec.columns, key=f"{name}_filter_by")
+        filter_text = col_filter.text_input("Contains", key=f"{name}_filter")
+
+        # Stack of keyset positions: one entry per page the user has walked through.
+        # Changing sort or filter starts again from the first page.
+        view = (sort_column, descending, filter_column, filter_text)
+        if st.session_state.get(f"{name}_view") != view:
+            st.session_state[f"{name}_view"] = view
+            st.session_state[f"{name}_pages"] = [None]
+        pages = st.session_state[f"{name}_pages"]
+
+        results = st.empty()
+        results.caption("Loading...")
+        request = table_browser.PageRequest(
+            name, sort_column, descending, filter_column, filter_text, after=pages[-1]
+        )
+        return request, results
+
+
+def show_page(request, page, estimate, results):
+    """Fills a table's results placeholder with its page and the paging buttons."""
+    spec = table_browser.TABLES[request.name]
+    name = request.name
+    pages = st.session_state[f"{name}_pages"]
+    with results.container():
+        if len(page.frame):
+            df = page.frame
+            st.dataframe(df, use_container_width=True)
+            estimate_text = f"~{estimate} rows" if estimate is not None else "row count unknown (no statistics)"
+            st.info(f"Page {len(pages)}: showing {len(df)} rows from {spec.title} ({estimate_text}).")
+        else:
+            st.info(f"{spec.title} is empty or no data accessible.")
+
+        # Callbacks update the page stack before the next run, so no explicit rerun
+        # interrupts the fetches of the other tables.
+        col_prev, col_next = st.columns(2)
+        col_prev.button("⬅️ Previous", key=f"{name}_prev", disabled=len(pages) == 1, on_click=pages.pop)
+        col_next.button(
+            "Next ➡️", key=f"{name}_next", disabled=not page.has_next,
+            on_click=pages.append, args=(page.last_key,)
+        )
+
+
+def export_section():
+    """
+    Exports a whole table to a temporary file, chunk by chunk with a progress
+    bar, then offers it for download. The file is only read when the button is
+    clicked, and deleted once read (see table_export.read_export).
+    """
+    st.subheader("Export")
+    col_table, col_format = st.columns([3, 1])
+    name = col_table.selectbox(
+        "Table", list(table_browser.TABLES), format_func=lambda n: table_browser.TABLES[n].title,
+        key="export_table"
+    )
+    fmt = col_format.selectbox("Format", list(table_export.FORMATS), key="export_format")
+
+    if st.button("Export table", key="export_run"):
+        previous = st.session_state.pop("export_file", None)
+        if previous:
+            table_export.discard_export(previous[0])
+        table_export.remove_stale_exports()
+        spec = table_browser.TABLES[name]
+        bar = st.progress(0.0, text="Starting export...")
+        path = table_export.new_export_path(name, fmt)
+        try:
+            with db_utils.st.session_state.db_pool.acquire() as connection:
+                estimate = table_browser.estimate_rows(connection, spec)
+
+                def progress(rows):
+                    fraction = min(rows / estimate, 1.0) if estimate else 0.0
+                    bar.progress(fraction, text=f"{rows:,} rows exported")
+
+                result = table_export.export_table(connection, name, fmt, path, progress=progress)
+        except oracledb.Error as e:
+            table_export.discard_export(path)
+            error_obj, = e.args
+            st.error(f"Export failed: {error_obj.message}")
+            return
+        bar.progress(1.0, text=f"{result.rows:,} rows exported in {result.elapsed:.1f}s")
+        if not result.rows:
+            table_export.discard_export(path)
+            st.info(f"{spec.title} is empty, nothing to export.")
+            return
+        st.session_state.export_file = (path, table_export.file_name(name, fmt), table_export.FORMATS[fmt].mime)
+
+    if st.session_state.get("export_file") and os.path.exists(st.session_state.export_file[0]):
+        path, download_name, mime = st.session_state.export_file
+        st.download_button(
+            f"⬇️ Download {download_name}", data=lambda: table_export.read_export(path),
+            file_name=download_name, mime=mime, key="export_download"
+        )
 
 
 # --- Check if connected ---
@@ -259,19 +125,39 @@ if not db_utils.st.session_state.db_connected or not db_utils.st.session_state.l
     st.warning("You must be logged in to view this page. Please go to the **'Login'** page.")
 else:
     st.write(f"Viewing data as: **`{db_utils.st.session_state.logged_in_user}`**")
+    use_snapshot = db_utils.snapshot_toggle()
 
     try:
-        with db_utils.st.session_state.db_pool.acquire() as connection:
-            products()
-            product_batches()
-            departments()
-            customers()
-            team_members()
-            chief_officiers()
-            logistic_teams()
-            distribution_centers()
-            batch_orders()
-            complaints()
+        # Lay out every section first, then run the loaded tables' queries
+        # concurrently and fill each section as soon as its query completes.
+        loaded = {}
+        for table_name in table_browser.TABLES:
+            controls = table_controls(table_name)
+            if controls:
+                request, results = controls
+                loaded[table_name] = (request, results)
+
+        requests = [request for request, _ in loaded.values()]
+        if use_snapshot:
+            # Reporting tables are answered locally; the rest still go to the database
+            for request in [r for r in requests if r.name in snapshot.TABLE_PAGES]:
+                results = loaded[request.name][1]
+                try:
+                    page, rows = snapshot.load_table_page(request)
+                except duckdb.Error as e:
+                    results.error(f"Snapshot Error: {e}")
+                else:
+                    show_page(request, page, rows, results)
+            requests = [r for r in requests if r.name not in snapshot.TABLE_PAGES]
+        for request, page, estimate, error in table_browser.load_pages(db_utils.st.session_state.db_pool, requests):
+            results = loaded[request.name][1]
+            if error is not None:
+                error_obj, = error.args
+                results.error(f"Database Error: {error_obj.message}")
+            else:
+                show_page(request, page, estimate, results)
+
+        export_section()
 
     except oracledb.Error as e:
         error_obj, = e.args
@@ -1,23 +1,75 @@
 import streamlit as st
 import oracledb
 import db_utils
+import query_cache
+import bulk_ingest
+import sql_catalogue
+import pandas as pd
 from datetime import date
 
 st.title("📦 Register a New Product Batch")
 
+
+def bulk_upload(connection, center, center_products):
+    """Registers many batches for a center from an uploaded CSV/Excel file."""
+    st.subheader("Bulk Upload Product Batches")
+    st.caption(
+        "Upload a CSV or Excel file with the columns "
+        f"**{', '.join(bulk_ingest.REQUIRED_COLUMNS)}**. "
+        "Every row is registered at the selected distribution center."
+    )
+    uploaded_file = st.file_uploader("Batch file", type=["csv", "xlsx"], key="bulk_batch_file")
+    if uploaded_file is None:
+        return
+    try:
+        df = bulk_ingest.read_batch_file(uploaded_file)
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    valid, errors = bulk_ingest.validate_rows(df, center_products)
+    st.info(f"{len(valid)} of {len(df)} rows passed validation.")
+    if errors:
+        st.warning(f"{len(errors)} rows will be skipped:")
+        st.dataframe(pd.DataFrame(errors), use_container_width=True)
+    if valid.empty or not st.button(f"Register {len(valid)} Batches", key="bulk_register"):
+        return
+
+    progress_bar = st.progress(0.0, text="Registering batches...")
+    try:
+        result = bulk_ingest.insert_batches(
+            connection, center, valid,
+            progress=lambda done: progress_bar.progress(done, text="Registering batches...")
+        )
+    except oracledb.Error as e:
+        error_obj, = e.args
+        st.error(f"Database Error: {error_obj.message}")
+        return
+    finally:
+        query_cache.invalidate("ProductBatch")
+
+    rate = result.inserted / result.elapsed if result.elapsed else 0
+    st.success(
+        f"Registered {result.inserted} batches at {center} "
+        f"in {result.elapsed:.2f}s ({rate:,.0f} rows/s)."
+    )
+    if result.errors:
+        st.error(f"{len(result.errors)} rows were rejected by the database:")
+        st.dataframe(pd.DataFrame(result.errors), use_container_width=True)
+
+
 if not db_utils.st.session_state.db_connected or not db_utils.st.session_state.logged_in_user:
     st.warning("You must be logged in to register a new product batch. Please go to the **'Login'** page.")
 else:
     with db_utils.st.session_state.db_pool.acquire() as connection:
         # Fetch distribution centers
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT CenterName FROM DistributionCenter ORDER BY CenterName")
-            centers = [row[0] for row in cursor.fetchall()]
-
-        # Get next BatchID (move this before center selection)
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT NVL(MAX(BatchID), 0) + 1 FROM ProductBatch")
-            next_batch_id = cursor.fetchone()[0]
+        centers = [
+            row[0] for row in query_cache.cached_query(
+                connection,
+                sql_catalogue.CENTER_NAMES,
+                tables=("DistributionCenter",)
+            )
+        ]
 
         # Select center outside the form so product list updates on change
         center = st.selectbox(
@@ -25,23 +77,25 @@ else:
         )
 
         # Fetch products available at the selected center
-        with connection.cursor() as cursor:
-            cursor.execute(
-                '''
-                SELECT DEREF(p.COLUMN_VALUE).SerialNo, DEREF(p.COLUMN_VALUE).ProductCategory, 
-                       DEREF(p.COLUMN_VALUE).ExpiryDate
-                FROM DistributionCenter dc, TABLE(dc.ListOfProducts) p
-                WHERE dc.CenterName = :center
-                ORDER BY DEREF(p.COLUMN_VALUE).SerialNo
-                ''',
-                {'center': center}
-            )
-            center_products = cursor.fetchall()
+        center_products = query_cache.cached_query(
+            connection,
+            sql_catalogue.CENTER_PRODUCTS,
+            {'center': center},
+            tables=("DistributionCenter", "Product")
+        )
 
         if not center_products:
             st.warning("No products available at this distribution center.")
             st.stop()
 
+        mode = st.radio(
+            "Registration mode", ["Single batch", "Bulk upload"],
+            horizontal=True, key="register_mode"
+        )
+        if mode == "Bulk upload":
+            bulk_upload(connection, center, center_products)
+            st.stop()
+
         product_options = {
             f"SerialNo: {row[0]} | Category: {row[1]} | Expiry: {row[2].strftime('%Y-%m-%d') if row[2] else 'N/A'}": row[0]
             for row in center_products
@@ -49,7 +103,7 @@ else:
 
         with st.form("register_batch_form"):
             st.subheader("Register a New Product Batch")
-            st.info(f"Next Batch ID will be: {next_batch_id}")
+            st.caption("The Batch ID is assigned by the database when the batch is registered.")
             product_label = st.selectbox(
                 "Select Product (available at this center)",
                 list(product_options.keys()),
@@ -62,22 +116,11 @@ else:
         if submitted:
             try:
                 with connection.cursor() as cursor:
+                    batch_id_var = cursor.var(int)
                     cursor.execute(
-                        """
-                        INSERT INTO ProductBatch \
-                        (BatchID, BatchProduct, Quantity, ArrivalDate, ByDistCenter)
-                        VALUES (
-                            :batch_id,
-                            (SELECT REF(p) FROM Product p \
-                             WHERE p.SerialNo = :serial_no),
-                            :quantity,
-                            :arrival_date,
-                            (SELECT REF(dc) FROM DistributionCenter dc \
-                             WHERE dc.CenterName = :center)
-                        )
-                        """,
+                        sql_catalogue.INSERT_BATCH_RETURNING,
                         {
-                            'batch_id': int(next_batch_id),
+                            'batch_id': batch_id_var,
                             'serial_no': serial_no,
                             'quantity': int(quantity),
                             'arrival_date': arrival_date,
@@ -85,8 +128,10 @@ else:
                         }
                     )
                     connection.commit()
+                    query_cache.invalidate("ProductBatch")
+                    new_batch_id = batch_id_var.getvalue()[0]
                     st.success(
-                        f"Batch {next_batch_id} registered for product "
+                        f"Batch {new_batch_id} registered for product "
                         f"{serial_no} at {center}."
                     )
             except oracledb.Error as e:
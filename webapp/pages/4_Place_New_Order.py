@@ -1,6 +1,9 @@
 import streamlit as st
 import oracledb
 import db_utils
+import query_cache
+import lookups
+import sql_catalogue
 from datetime import date, timedelta
 
 st.title("🚚 Place New Batch Order")
@@ -10,59 +13,32 @@ if not db_utils.st.session_state.db_connected or not db_utils.st.session_state.l
 else:
     with db_utils.st.session_state.db_pool.acquire() as connection:
         # Fetch customers
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT CustomerCode FROM Customer ORDER BY CustomerCode")
-            customers = [row[0] for row in cursor.fetchall()]
-        # Fetch product batches
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT BatchID, DEREF(BatchProduct).SerialNo, Quantity, ArrivalDate FROM ProductBatch ORDER BY BatchID")
-            batches = cursor.fetchall()
-        # Fetch distribution centers and their products/teams
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT dc.CenterName, dc.ByTeam.TeamCode, lt.TeamName, 
-                       DEREF(prod_list.COLUMN_VALUE).SerialNo AS StockedProductSerialNo
-                FROM DistributionCenter dc
-                JOIN LogisticTeam lt ON lt.TeamCode = dc.ByTeam.TeamCode
-                , TABLE(dc.ListOfProducts) prod_list
-            """)
-            dc_rows = cursor.fetchall()
-            # Build: {SerialNo: (CenterName, TeamCode, TeamName)}
-            serial_to_dc = {}
-            for row in dc_rows:
-                center, team_code, team_name, serial_no = row
-                serial_to_dc.setdefault(serial_no, []).append((center, team_code, team_name))
-        # Get next OrderID
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT NVL(MAX(OrderID), 0) + 1 FROM BatchOrder")
-            next_order_id = cursor.fetchone()[0]
-
-        # Map: center_name -> [batch rows]
-        center_to_batches = {}
-        for row in batches:
-            # Find the center for this batch
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    "SELECT dc.CenterName FROM DistributionCenter dc, "
-                    "TABLE(dc.ListOfProducts) p WHERE DEREF(p.COLUMN_VALUE).SerialNo = :serial_no",
-                    {'serial_no': row[1]}
-                )
-                center_name = cursor.fetchone()[0]
-            center_to_batches.setdefault(center_name, []).append(row)
+        customers = [
+            row[0] for row in query_cache.cached_query(
+                connection,
+                sql_catalogue.CUSTOMER_CODES,
+                tables=("Customer",)
+            )
+        ]
+        # Fetch product batches with their center and team in one round trip
+        batch_lookup = lookups.load_batch_lookup(connection)
         # Let user select a center outside the form so batch list updates
         center = st.selectbox(
             "Select Distribution Center for this order",
-            list(center_to_batches.keys()),
+            batch_lookup.centers(),
             key="order_center_select"
         )
-        center_batches = center_to_batches[center]
+        if center is None:
+            st.info("No product batches available to order.")
+            st.stop()
+        center_batches = batch_lookup.batches_at(center)
         batch_label_map = {
-            f"BatchID: {row[0]} | Product: {row[1]} | Qty: {row[2]} | Arrived: {row[3].strftime('%Y-%m-%d')}": row
-            for row in center_batches
+            f"BatchID: {b.batch_id} | Product: {b.serial_no} | Qty: {b.quantity} | Arrived: {b.arrival_date.strftime('%Y-%m-%d')}": b
+            for b in center_batches
         }
         with st.form("quick_place_order_form"):
             st.subheader("Quick Place a New Batch Order")
-            st.info(f"Next Order ID will be: {next_order_id}")
+            st.caption("The Order ID is assigned by the database when the order is placed.")
             customer = st.selectbox("Select Customer", customers)
             selected_batch_labels = st.multiselect(
                 "Select Product Batches for Order (from this center only)",
@@ -90,40 +66,27 @@ else:
             else:
                 try:
                     with connection.cursor() as cursor:
-                        batch_ids = [str(b[0]) for b in selected_batches]
-                        in_clause = ','.join(batch_ids)
+                        order_id_var = cursor.var(int)
+                        insert_sql, batch_binds = sql_catalogue.with_in_list(
+                            sql_catalogue.INSERT_ORDER,
+                            [b.batch_id for b in selected_batches], prefix="batch"
+                        )
                         cursor.execute(
-                            f'''
-                            INSERT INTO BatchOrder (
-                                OrderID, OrderBatches, OrderDate,
-                                ExpectedDeliveryDate, DeliveryStatus,
-                                ByCustomer, ByLogisticTeam
-                            )
-                            VALUES (
-                                :order_id,
-                                (SELECT CAST(COLLECT(REF(pb)) AS BatchList)
-                                 FROM ProductBatch pb
-                                 WHERE pb.BatchID IN ({in_clause})
-                                ),
-                                :order_date,
-                                :expected_delivery,
-                                :status,
-                                (SELECT REF(c) FROM Customer c
-                                 WHERE c.CustomerCode = :customer),
-                                NULL
-                            )
-                            ''',
+                            insert_sql,
                             {
-                                'order_id': int(next_order_id),
+                                'order_id': order_id_var,
                                 'order_date': date.today(),
                                 'expected_delivery': expected_delivery,
                                 'status': delivery_status,
-                                'customer': customer
+                                'customer': customer,
+                                **batch_binds
                             }
                         )
                         connection.commit()
+                        query_cache.invalidate("BatchOrder")
+                        new_order_id = order_id_var.getvalue()[0]
                         st.success(
-                            f"Order {next_order_id} placed successfully."
+                            f"Order {new_order_id} placed successfully."
                         )
                 except oracledb.Error as e:
                     error_obj, = e.args
@@ -1,124 +1,146 @@
 import streamlit as st
 import oracledb
 import db_utils
+import query_cache
+import lookups
+import sql_catalogue
+import auto_assign
+import pandas as pd
+import time
 from datetime import date
 
 st.title("🚚 Assign Delivery to Logistics Team")
 
-if not db_utils.st.session_state.db_connected or not db_utils.st.session_state.logged_in_user:
-    st.warning("You must be logged in to assign a delivery. Please go to the **'Login'** page.")
-else:
-    with db_utils.st.session_state.db_pool.acquire() as connection:
-        # Fetch all batch orders not delivered, cancelled, or assigned
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT bo.OrderID, bo.DeliveryStatus
-                FROM BatchOrder bo
-                WHERE bo.DeliveryStatus = 'Pending' AND bo.ByLogisticTeam IS NULL
-                ORDER BY bo.OrderID
-                """
-            )
-            orders = cursor.fetchall()
-        order_options = {
-            f"OrderID: {row[0]} | Status: {row[1]}": row[0]
-            for row in orders
-        }
-        if not order_options:
-            st.info("No active orders available for assignment.")
-            st.stop()
-        # Select order outside the form for dynamic team update
-        order_label = st.selectbox(
-            "Select Order to Assign",
-            list(order_options.keys())
-        )
-        order_id = order_options[order_label]
 
-        # Get the first batch of the selected order
-        with connection.cursor() as cursor:
-            cursor.execute(
-                '''
-                SELECT DEREF(CAST(t.COLUMN_VALUE AS REF ProdBatch_t)).BatchID
-                FROM BatchOrder bo, TABLE(bo.OrderBatches) t
-                WHERE bo.OrderID = :order_id
-                AND ROWNUM = 1
-                ''',
-                {'order_id': order_id}
-            )
-            batch_row = cursor.fetchone()
-            if not batch_row:
-                st.warning("Selected order has no batches.")
-                st.stop()
-            first_batch_id = batch_row[0]
+def assign_single_order(connection):
+    # Fetch all pending, unassigned orders (never cached: they change constantly)
+    with connection.cursor() as cursor:
+        cursor.execute(sql_catalogue.PENDING_ORDERS)
+        orders = cursor.fetchall()
+    order_options = {
+        f"OrderID: {row[0]} | Status: {row[1]}": row[0]
+        for row in orders
+    }
+    if not order_options:
+        st.info("No active orders available for assignment.")
+        st.stop()
+    # Select order outside the form for dynamic team update
+    order_label = st.selectbox(
+        "Select Order to Assign",
+        list(order_options.keys())
+    )
+    order_id = order_options[order_label]
+
+    # Resolve the order's batches with their center and team in one round trip
+    order_batches = lookups.load_batch_lookup(connection, order_id=order_id)
+    if not order_batches:
+        st.warning("Selected order has no batches.")
+        st.stop()
+    first_batch = next(iter(order_batches))
+    center_name = first_batch.center_name
+
+    # Teams related to that center
+    teams = order_batches.teams_of(center_name)
+    team_options = {
+        f"{team_name} (Code: {team_code})": team_code
+        for team_code, team_name in teams.items()
+    }
 
-            # Find the distribution center of the batch
-            cursor.execute(
-                '''
-                SELECT dc.CenterName
-                FROM DistributionCenter dc, TABLE(dc.ListOfProducts) p
-                WHERE DEREF(p.COLUMN_VALUE).SerialNo = (
-                    SELECT DEREF(pb.BatchProduct).SerialNo
-                    FROM ProductBatch pb
-                    WHERE pb.BatchID = :batch_id
+    st.info(f"Distribution Center for first batch: **{center_name}**")
+    with st.form("assign_delivery_form"):
+        st.subheader("Assign a Delivery to a Logistics Team")
+        team_label = st.selectbox(
+            "Select Logistics Team",
+            list(team_options.keys())
+        )
+        team_code = team_options[team_label]
+        submitted = st.form_submit_button("Assign Team")
+    if submitted:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    sql_catalogue.ASSIGN_TEAM,
+                    {'team_code': team_code, 'order_id': order_id}
                 )
-                ''',
-                {'batch_id': first_batch_id}
-            )
-            dc_row = cursor.fetchone()
-            if not dc_row:
-                st.warning("Distribution center not found for the batch.")
-                st.stop()
-            center_name = dc_row[0]
+                assigned = cursor.rowcount
+            connection.commit()
+            query_cache.invalidate("BatchOrder")
+            if assigned:
+                st.success(
+                    f"Order {order_id} assigned to team {team_label}."
+                )
+            else:
+                st.warning(
+                    f"Order {order_id} is already assigned or no longer pending; it was not changed."
+                )
+        except oracledb.Error as e:
+            error_obj, = e.args
+            st.error(f"Database Error: {error_obj.message}")
+        except Exception as e:
+            st.error(f"Unexpected error: {e}")
 
-            # Find teams related to that center
-            cursor.execute(
-                """
-                SELECT dc.ByTeam.TeamCode, lt.TeamName
-                FROM DistributionCenter dc
-                JOIN LogisticTeam lt ON lt.TeamCode = dc.ByTeam.TeamCode
-                WHERE dc.CenterName = :center_name
-                """,
-                {'center_name': center_name}
-            )
-            teams = cursor.fetchall()
-            if not teams:
-                st.warning("No teams found for the distribution center.")
-                st.stop()
-            team_options = {
-                f"{row[1]} (Code: {row[0]})": row[0]
-                for row in teams
-            }
 
-        st.info(f"Distribution Center for first batch: **{center_name}**")
-        with st.form("assign_delivery_form"):
-            st.subheader("Assign a Delivery to a Logistics Team")
-            team_label = st.selectbox(
-                "Select Logistics Team",
-                list(team_options.keys())
+def assign_all_pending(connection):
+    st.caption(
+        "Resolves the teams serving the centers of every pending, unassigned order in one query, "
+        "balances them by current open orders, and applies all assignments with one array UPDATE."
+    )
+    balance = st.checkbox(
+        "Balance load across the teams of an order's centers", value=True,
+        help="Otherwise each order goes to the team of its first batch's center, like in single order mode.",
+        # A preview planned with the other setting must not be applied
+        on_change=lambda: st.session_state.pop("auto_assign_plan", None),
+    )
+    if st.button("Preview assignments"):
+        try:
+            start = time.perf_counter()
+            candidates = auto_assign.load_candidates(connection)
+            assignments, load = auto_assign.plan_assignments(candidates, balance=balance)
+            st.session_state.auto_assign_plan = (assignments, load, time.perf_counter() - start)
+        except oracledb.Error as e:
+            error_obj, = e.args
+            st.error(f"Database Error: {error_obj.message}")
+
+    plan = st.session_state.get("auto_assign_plan")
+    if not plan:
+        return
+    assignments, load, planned_in = plan
+    if not assignments:
+        st.info("No pending unassigned orders with batches to assign.")
+        return
+
+    st.write(f"**{len(assignments)}** orders planned in {planned_in * 1000:.0f} ms.")
+    preview = pd.DataFrame(assignments, columns=["OrderID", "Center", "Team Code", "Team", "Candidate Teams"])
+    st.dataframe(preview, use_container_width=True, hide_index=True)
+    planned = preview.groupby(["Team Code", "Team"], as_index=False).size().rename(columns={"size": "Planned"})
+    planned["Open Orders After"] = planned["Team Code"].map(load)
+    with st.expander("Load per team"):
+        st.dataframe(planned, use_container_width=True, hide_index=True)
+
+    if st.button(f"Assign {len(assignments)} Orders", type="primary"):
+        try:
+            result = auto_assign.apply_assignments(connection, assignments)
+            del st.session_state.auto_assign_plan
+            rate = result.assigned / result.elapsed if result.elapsed else 0
+            st.success(
+                f"Assigned {result.assigned} orders in {result.elapsed * 1000:.0f} ms ({rate:,.0f} orders/s)."
             )
-            team_code = team_options[team_label]
-            submitted = st.form_submit_button("Assign Team")
-        if submitted:
-            try:
-                with connection.cursor() as cursor:
-                    cursor.execute(
-                        """
-                        UPDATE BatchOrder
-                        SET ByLogisticTeam = (
-                            SELECT REF(t)
-                            FROM LogisticTeam t
-                            WHERE t.TeamCode = :team_code
-                        )
-                        WHERE OrderID = :order_id
-                        """,
-                        {'team_code': team_code, 'order_id': order_id}
-                    )
-                    connection.commit()
-                    st.success(
-                        f"Order {order_id} assigned to team {team_label}."
-                    )
-            except oracledb.Error as e:
-                error_obj, = e.args
-                st.error(f"Database Error: {error_obj.message}")
-            except Exception as e:
-                st.error(f"Unexpected error: {e}")
+            if result.skipped:
+                st.warning(
+                    f"{len(result.skipped)} orders were assigned or changed since the preview and were skipped: "
+                    + ", ".join(str(order_id) for order_id in result.skipped)
+                )
+        except oracledb.Error as e:
+            error_obj, = e.args
+            st.error(f"Database Error: {error_obj.message}")
+
+
+if not db_utils.st.session_state.db_connected or not db_utils.st.session_state.logged_in_user:
+    st.warning("You must be logged in to assign a delivery. Please go to the **'Login'** page.")
+else:
+    mode = st.radio("Mode", ["Single order", "All pending orders"], horizontal=True)
+    with db_utils.st.session_state.db_pool.acquire() as connection:
+        if mode == "Single order":
+            assign_single_order(connection)
+        else:
+            assign_all_pending(connection)
@@ -1,98 +1,134 @@
 import streamlit as st
+import duckdb
 import oracledb
 import db_utils
-from datetime import date
+import data_access
+import query_cache
+import sql_catalogue
+import route_planner
+import snapshot
+import team_deliveries
+from datetime import date, timedelta
 
 st.title("📋 View Deliveries Assigned to a Team")
 
 if not db_utils.st.session_state.db_connected or not db_utils.st.session_state.logged_in_user:
     st.warning("You must be logged in to view deliveries. Please go to the **'Login'** page.")
 else:
+    use_snapshot = db_utils.snapshot_toggle()
     with db_utils.st.session_state.db_pool.acquire() as connection:
-        # Fetch all chief officers
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT c.TaxCode, c.MemberName, c.MemberSurname
-                FROM ChiefOfficier c
-                WHERE EXISTS (
-                    SELECT 1 FROM LogisticTeam t WHERE t.TeamChief = REF(c)
-                )
-                ORDER BY c.MemberSurname, c.MemberName
-                """
-            )
-            chiefs = cursor.fetchall()
+        # Chief officers coordinating at least one team
+        chiefs = query_cache.cached_query(
+            connection,
+            sql_catalogue.CHIEFS_WITH_TEAMS,
+            tables=("ChiefOfficier", "LogisticTeam")
+        )
         chief_options = {
             f"{(row[1] or '')} {(row[2] or '')} (TaxCode: {row[0]})": row[0]
             for row in sorted(chiefs, key=lambda r: r[0])
         }
-        with st.form("select_chief_form"):
-            st.subheader("Select Chief Officer to View Team Deliveries")
-            if not chief_options:
-                st.info("No chief officers found.")
-                st.stop()
-            chief_label = st.selectbox(
-                "Chief Officer",
-                list(chief_options.keys())
+        if not chief_options:
+            st.info("No chief officers found.")
+            st.stop()
+
+        st.subheader("Select Chief Officer to View Team Deliveries")
+        chief_label = st.selectbox("Chief Officer", list(chief_options.keys()))
+        chief_taxcode = chief_options[chief_label]
+
+        # --- Filters ---
+        col_status, col_from, col_to = st.columns(3)
+        status = col_status.selectbox("Status", ["All"] + team_deliveries.STATUSES)
+        date_from = col_from.date_input("Expected from", value=None)
+        date_to = col_to.date_input("Expected until", value=None)
+
+        # Keyset pagination: one last OrderID per visited page, reset when the view changes
+        view = (chief_taxcode, status, date_from, date_to)
+        if st.session_state.get("deliveries_view") != view:
+            st.session_state.deliveries_view = view
+            st.session_state.deliveries_pages = [0]
+        pages = st.session_state.deliveries_pages
+
+        try:
+            # Teams, per-status counts and one page of orders in a single round trip
+            filters = dict(
+                status=None if status == "All" else status,
+                date_from=date_from,
+                date_to=date_to + timedelta(days=1) if date_to else None,
+                after=pages[-1],
             )
-            chief_taxcode = chief_options[chief_label]
-            submitted = st.form_submit_button("View Deliveries")
-        if submitted:
-            # Find the team(s) coordinated by this chief
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    "SELECT TeamCode, TeamName FROM LogisticTeam "
-                    "WHERE TeamChief = (SELECT REF(c) FROM ChiefOfficier c "
-                    "WHERE c.TaxCode = :taxcode)",
-                    {'taxcode': chief_taxcode}
-                )
-                teams = cursor.fetchall()
-            if not teams:
-                st.info("No teams found for this chief officer.")
-                st.stop()
-            team_codes = [row[0] for row in teams]
-            team_names = [row[1] for row in teams]
-            # Show the taxcodes of the chiefs for the selected teams
-            format_codes = ','.join(str(tc) for tc in team_codes)
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    f'''
-                    SELECT DISTINCT DEREF(lt.TeamChief).TaxCode
-                    FROM LogisticTeam lt
-                    WHERE lt.TeamCode IN ({format_codes})
-                    '''
+            if use_snapshot:
+                page = snapshot.fetch_deliveries(chief_taxcode, **filters)
+            else:
+                page = team_deliveries.fetch_deliveries(connection, chief_taxcode, **filters)
+        except oracledb.Error as e:
+            error_obj, = e.args
+            st.error(f"Error fetching deliveries: {error_obj.message}")
+            st.stop()
+        except duckdb.Error as e:
+            st.error(f"Error reading the local snapshot: {e}")
+            st.stop()
+
+        if not page.teams:
+            st.info("No teams found for this chief officer.")
+            st.stop()
+        st.markdown(f"### Deliveries for Team(s): {', '.join(page.teams.values())}")
+        for col, (order_status, count) in zip(st.columns(len(page.counts)), page.counts.items()):
+            col.metric(order_status, int(count))
+
+        tab_list, tab_routes = st.tabs(["Deliveries", "Trips"])
+        with tab_list:
+            if page.frame.empty:
+                st.info("No deliveries match these filters.")
+            else:
+                st.caption(f"Page {len(pages)}: {len(page.frame)} orders.")
+                st.dataframe(
+                    data_access.format_dates(page.frame, ["Order Date", "Expected Delivery"]),
+                    use_container_width=True, hide_index=True
                 )
-                chief_taxcodes = [row[0] for row in cursor.fetchall()]
-            st.markdown(
-                f"**Chief TaxCodes for selected teams:** "
-                f"{', '.join(str(tc) for tc in chief_taxcodes)}"
+            col_prev, col_next = st.columns(2)
+            col_prev.button("⬅️ Previous", key="deliveries_prev", disabled=len(pages) == 1, on_click=pages.pop)
+            col_next.button(
+                "Next ➡️", key="deliveries_next", disabled=not page.has_next,
+                on_click=pages.append, args=(page.last_key,)
             )
-            st.markdown(f"### Deliveries for Team(s): {', '.join(team_names)}")
-            # Fetch all deliveries (orders) assigned to these teams
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    f'''
-                    SELECT bo.OrderID, bo.OrderDate, bo.ExpectedDeliveryDate,
-                           bo.DeliveryStatus, DEREF(bo.ByCustomer).CustomerCode
-                    FROM BatchOrder bo
-                    WHERE DEREF(bo.ByLogisticTeam).TeamCode IN ({format_codes})
-                    ORDER BY bo.OrderID
-                    '''
-                )
-                deliveries = cursor.fetchall()
-            if not deliveries:
-                st.info("No deliveries assigned to this team.")
+        with tab_routes:
+            # Open orders grouped into trips per delivery date and center, stops in route order.
+            # Planning runs only on request (tab bodies run on every rerun) and is kept per set of teams.
+            team_codes = tuple(page.teams)
+            plan = st.session_state.get("trip_plan")
+            if plan is not None and plan[0] != team_codes:
+                plan = st.session_state.trip_plan = None
+            if st.button("Plan trips" if plan is None else "Re-plan trips", key="plan_trips"):
+                try:
+                    open_orders = route_planner.load_open_orders(connection, list(team_codes))
+                except oracledb.Error as e:
+                    error_obj, = e.args
+                    st.error(f"Error loading open orders: {error_obj.message}")
+                    st.stop()
+                trips, seconds = route_planner.plan_routes(open_orders) if not open_orders.empty else ([], 0.0)
+                plan = st.session_state.trip_plan = (team_codes, len(open_orders), trips, seconds)
+
+            if plan is None:
+                st.caption("Group the teams' open (Pending or In Transit) orders into trips with a route for each.")
+            elif not plan[1]:
+                st.info("No open (Pending or In Transit) orders to plan.")
             else:
-                st.dataframe(
-                    [
-                        {
-                            "OrderID": row[0],
-                            "Order Date": row[1].strftime('%Y-%m-%d'),
-                            "Expected Delivery": row[2].strftime('%Y-%m-%d'),
-                            "Status": row[3],
-                            "Customer": row[4]
-                        }
-                        for row in deliveries
-                    ],
-                    use_container_width=True
+                _, order_count, trips, seconds = plan
+                st.caption(
+                    f"{len(trips)} trips, {order_count} orders planned in {seconds * 1000:.0f} ms. "
+                    "Distances are estimated from zip codes and city changes."
                 )
+                for trip in trips:
+                    saved = 1 - trip.length / trip.initial_length if trip.initial_length else 0
+                    with st.expander(
+                        f"{trip.delivery_date:%Y-%m-%d} from {trip.center}: "
+                        f"{len(trip.stops)} stops, {trip.orders} orders"
+                    ):
+                        st.caption(f"Route length {trip.length:,.1f} ({saved:.0%} shorter than nearest-neighbour).")
+                        st.dataframe(
+                            trip.stops.rename(columns={
+                                "STOP": "Stop", "CITY": "City", "ZIPCODE": "Zip Code", "STREET": "Street",
+                                "STREETNO": "No.", "CUSTOMERCODE": "Customer", "ORDERS": "Orders",
+                            }),
+                            use_container_width=True, hide_index=True
+                        )
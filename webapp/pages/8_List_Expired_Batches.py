@@ -1,47 +1,63 @@
 import streamlit as st
+import duckdb
 import oracledb
 import db_utils
+import expiry_sweep
+import data_access
+import snapshot
 from datetime import date
 
 st.title("⏰ List All Batches of Expired Products")
 
+EXPIRED_COLUMNS = [
+    "BatchID", "Product SerialNo", "Category", "Expiry Date",
+    "Quantity", "Arrival Date", "Distribution Center", "Quarantined At",
+]
+
 if not db_utils.st.session_state.db_connected or not db_utils.st.session_state.logged_in_user:
     st.warning("You must be logged in to view expired product batches. Please go to the **'Login'** page.")
 else:
-    with db_utils.st.session_state.db_pool.acquire() as connection:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                '''
-                SELECT pb.BatchID, DEREF(pb.BatchProduct).SerialNo, 
-                       DEREF(pb.BatchProduct).ProductCategory, 
-                       DEREF(pb.BatchProduct).ExpiryDate, pb.Quantity, 
-                       pb.ArrivalDate, dc.CenterName
-                FROM ProductBatch pb
-                JOIN DistributionCenter dc
-                  ON EXISTS (
-                    SELECT 1 FROM TABLE(dc.ListOfProducts) p
-                    WHERE DEREF(p.COLUMN_VALUE).SerialNo = DEREF(pb.BatchProduct).SerialNo
-                  )
-                WHERE DEREF(pb.BatchProduct).ExpiryDate < TRUNC(SYSDATE)
-                ORDER BY pb.BatchID
-                '''
+    use_snapshot = db_utils.snapshot_toggle()
+    try:
+        with db_utils.st.session_state.db_pool.acquire() as connection:
+            # The sweep itself runs in the SWEEP_EXPIRED_BATCHES scheduler job: this page only reads
+            state = expiry_sweep.sweep_state(connection)
+
+            # Batches quarantined by the sweep, with the center they are stored at
+            if not use_snapshot:
+                df = expiry_sweep.load_quarantine_frame(connection)
+        if use_snapshot:
+            df = snapshot.expired_batches()
+
+        if state is None or state[1] is None:
+            st.warning("The expiry sweep has not run yet: no batches are quarantined until its first run.")
+        else:
+            swept_through, last_run_at, last_quarantined = state
+            st.caption(
+                f"Quarantined by the expiry sweep, last run {last_run_at:%Y-%m-%d %H:%M} "
+                f"({last_quarantined} newly expired batches)."
             )
-            rows = cursor.fetchall()
-        if not rows:
+            if last_run_at.date() < date.today():
+                st.warning("The expiry sweep has not run today yet: products that expired since the last run are not listed.")
+        if df.empty:
             st.info("No expired product batches found.")
         else:
+            df = df.rename(columns={
+                "BATCHID": "BatchID",
+                "SERIALNO": "Product SerialNo",
+                "PRODUCTCATEGORY": "Category",
+                "EXPIRYDATE": "Expiry Date",
+                "QUANTITY": "Quantity",
+                "ARRIVALDATE": "Arrival Date",
+                "CENTERNAME": "Distribution Center",
+                "QUARANTINEDAT": "Quarantined At",
+            })[EXPIRED_COLUMNS]
             st.dataframe(
-                [
-                    {
-                        "BatchID": row[0],
-                        "Product SerialNo": row[1],
-                        "Category": row[2],
-                        "Expiry Date": row[3].strftime('%Y-%m-%d') if row[3] else '',
-                        "Quantity": row[4],
-                        "Arrival Date": row[5].strftime('%Y-%m-%d'),
-                        "Distribution Center": row[6]
-                    }
-                    for row in rows
-                ],
+                data_access.format_dates(df, ["Expiry Date", "Arrival Date", "Quarantined At"]),
                 use_container_width=True
             )
+    except oracledb.Error as e:
+        error_obj, = e.args
+        st.error(f"Error loading expired batches: {error_obj.message}")
+    except duckdb.Error as e:
+        st.error(f"Error reading the local snapshot: {e}")
@@ -0,0 +1,78 @@
+import streamlit as st
+import pandas as pd
+import db_utils
+import db_config
+import query_metrics
+
+st.title("📈 Query Performance")
+
+SUMMARY_COLUMNS = {
+    "sql_id": "SQL ID",
+    "kind": "Kind",
+    "executions": "Executions",
+    "p50_ms": "p50 (ms)",
+    "p95_ms": "p95 (ms)",
+    "p99_ms": "p99 (ms)",
+    "max_ms": "Max (ms)",
+    "avg_rows": "Avg Rows",
+    "avg_round_trips": "Avg Round Trips",
+    "errors": "Errors",
+    "sql": "Statement",
+}
+
+if not db_utils.st.session_state.db_connected or not db_utils.st.session_state.logged_in_user:
+    st.warning("You must be logged in to view query performance. Please go to the **'Login'** page.")
+else:
+    recorder = query_metrics.recorder
+    st.caption(
+        f"Process-wide figures over the last {recorder.capacity} statements and pool acquires, "
+        "from every session. Round trips are estimated from rows fetched, prefetch and array sizes."
+    )
+
+    # --- Pool acquire waits ---
+    st.subheader("Connection pool")
+    waits = recorder.acquire_summary()
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Acquires", waits["acquires"])
+    for col, key, label in ((col2, "p50_ms", "Wait p50"), (col3, "p95_ms", "Wait p95"), (col4, "p99_ms", "Wait p99")):
+        col.metric(label, f"{waits[key]:.1f} ms" if waits[key] is not None else "-")
+    col5.metric("Timeouts/errors", waits["errors"])
+
+    # --- Statements ---
+    st.subheader("Statements")
+    summary = recorder.summary()
+    if not summary:
+        st.info("No statements recorded yet. Browse the other pages to collect samples.")
+    else:
+        df = pd.DataFrame(summary).rename(columns=SUMMARY_COLUMNS)
+        st.dataframe(df.round(2), use_container_width=True, hide_index=True)
+
+        sql_ids = ["All statements"] + [row["sql_id"] for row in summary]
+        chosen = st.selectbox("Latency histogram for", sql_ids)
+        sql_id = None if chosen == "All statements" else chosen
+        if sql_id:
+            st.code(recorder.statement_text(sql_id), language="sql")
+        histogram = pd.DataFrame(
+            [
+                {"Latency": f"≤ {bound:g} ms" if bound != float("inf") else "> 10 s", "Statements": count}
+                for bound, count in recorder.histogram(sql_id)
+            ]
+        )
+        st.bar_chart(histogram, x="Latency", y="Statements", sort=False)
+
+    # --- Export ---
+    st.subheader("Export")
+    col_prom, col_json, col_reset = st.columns(3)
+    col_prom.download_button(
+        "Prometheus text", recorder.to_prometheus(), file_name="medtech_metrics.prom", mime="text/plain"
+    )
+    col_json.download_button(
+        "JSON", recorder.to_json(), file_name="medtech_metrics.json", mime="application/json"
+    )
+    if col_reset.button("Reset metrics"):
+        recorder.reset()
+        st.rerun()
+    if db_config.METRICS_PORT:
+        st.caption(f"Prometheus can scrape `http://<host>:{db_config.METRICS_PORT}/metrics` (JSON at `/metrics.json`).")
+    else:
+        st.caption("Set `MEDTECH_METRICS_PORT` to expose a `/metrics` endpoint for Prometheus scraping.")
@@ -0,0 +1,107 @@
+# webapp/query_cache.py
+import threading
+import time
+from collections import OrderedDict
+import db_config
+
+# --- Process-wide cache for reference data ---
+# Module state is shared by every Streamlit session in the process.
+# Entries are keyed by the database user, SQL text and bind values (sessions log in
+# as different users, and unqualified table names and privileges depend on who
+# runs the query), expire after a TTL, are evicted
+# least-recently-used past a size bound, and are tagged with the tables they read
+# so the app's own writes can invalidate exactly what they touched.
+
+
+class QueryCache:
+    """Thread-safe TTL + LRU cache of query results, tagged by table name."""
+
+    def __init__(self, ttl_seconds, max_entries):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # key -> (expires_at, tables, rows)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(user, sql, params):
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        elif params is not None:
+            params = tuple(params)
+        return ((user or "").upper(), " ".join(sql.split()), params)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, tables, rows):
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl_seconds
+            self._entries[key] = (expires_at, frozenset(t.upper() for t in tables), rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *tables):
+        """Drops every entry that read from any of the given tables."""
+        tables = {t.upper() for t in tables}
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[1] & tables]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+reference_cache = QueryCache(db_config.CACHE_TTL_SECONDS, db_config.CACHE_MAX_ENTRIES)
+
+
+def cached_query(connection, sql, params=None, tables=()):
+    """
+    Returns the rows of a reference-data query, from the cache when possible.
+    `tables` lists the tables the query reads, used for invalidation.
+    Results are only shared between sessions logged in as the same user.
+    """
+    key = QueryCache.make_key(connection.username, sql, params)
+    rows = reference_cache.get(key)
+    if rows is None:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params or {})
+            rows = cursor.fetchall()
+        reference_cache.put(key, tables, rows)
+    return rows
+
+
+def invalidate(*tables):
+    """Call after the app writes to a table so cached reads of it are refreshed."""
+    reference_cache.invalidate(*tables)
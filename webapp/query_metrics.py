@@ -0,0 +1,485 @@
+# webapp/query_metrics.py
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque, namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import oracledb
+import db_config
+
+# --- Per-statement instrumentation ---
+# Every connection handed out by UserPool.acquire() is wrapped so that each
+# statement records its elapsed time, rows, estimated round trips and SQL
+# identity, and each acquire records how long it waited for the pool.
+# Recent samples live in a ring buffer (percentiles for the Performance page);
+# running totals and histogram buckets are kept for the Prometheus export.
+
+logger = logging.getLogger(__name__)
+
+Sample = namedtuple(
+    "Sample", ["finished_at", "sql_id", "kind", "elapsed", "rows", "round_trips", "error"]
+)
+AcquireSample = namedtuple("AcquireSample", ["finished_at", "elapsed", "error"])
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def sql_identity(sql):
+    """Returns (sql_id, normalized text). Statements differing only in whitespace share an ID."""
+    text = " ".join(sql.split())
+    return hashlib.sha1(text.encode()).hexdigest()[:12], text
+
+
+def statement_kind(text):
+    first = text.split(" ", 1)[0].upper()
+    if first in ("SELECT", "WITH"):
+        return "query"
+    if first in ("INSERT", "UPDATE", "DELETE", "MERGE"):
+        return "dml"
+    if first in ("BEGIN", "DECLARE", "CALL"):
+        return "plsql"
+    return "other"
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list (None when empty)."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class _Totals:
+    """Monotonic counters and histogram buckets for one series."""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.round_trips = 0
+        self.seconds = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def add(self, elapsed, rows=0, round_trips=0, error=None):
+        self.count += 1
+        self.errors += error is not None
+        self.rows += rows
+        self.round_trips += round_trips
+        self.seconds += elapsed
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if elapsed <= bound:
+                self.buckets[i] += 1
+
+
+class MetricsRecorder:
+    """Thread-safe ring buffer of statement and pool-acquire samples."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._samples = deque(maxlen=capacity)
+        self._acquires = deque(maxlen=capacity)
+        self._statements = {} # sql_id -> normalized SQL text
+        self._totals = {} # sql_id -> _Totals
+        self._acquire_totals = _Totals()
+        self._lock = threading.Lock()
+
+    def record_statement(self, sql, kind, elapsed, rows=0, round_trips=1, error=None):
+        sql_id, text = sql_identity(sql)
+        sample = Sample(time.time(), sql_id, kind, elapsed, rows, round_trips, error)
+        with self._lock:
+            self._samples.append(sample)
+            self._statements.setdefault(sql_id, text)
+            self._totals.setdefault(sql_id, _Totals()).add(elapsed, rows, round_trips, error)
+        if error is not None:
+            logger.warning("SQL %s failed after %.1f ms: %s", sql_id, elapsed * 1000, error)
+
+    def record_acquire(self, elapsed, error=None):
+        with self._lock:
+            self._acquires.append(AcquireSample(time.time(), elapsed, error))
+            self._acquire_totals.add(elapsed, error=error)
+        if error is not None:
+            logger.warning("Pool acquire failed after %.1f ms: %s", elapsed * 1000, error)
+
+    def samples(self):
+        with self._lock:
+            return list(self._samples)
+
+    def statement_text(self, sql_id):
+        with self._lock:
+            return self._statements.get(sql_id)
+
+    def summary(self):
+        """
+        Per-statement figures over the samples in the ring buffer,
+        slowest p95 first. Latencies are in milliseconds.
+        """
+        with self._lock:
+            samples = list(self._samples)
+            statements = dict(self._statements)
+        by_id = {}
+        for sample in samples:
+            by_id.setdefault(sample.sql_id, []).append(sample)
+        rows = []
+        for sql_id, group in by_id.items():
+            elapsed = sorted(s.elapsed * 1000 for s in group)
+            rows.append({
+                "sql_id": sql_id,
+                "kind": group[-1].kind,
+                "executions": len(group),
+                "p50_ms": percentile(elapsed, 0.5),
+                "p95_ms": percentile(elapsed, 0.95),
+                "p99_ms": percentile(elapsed, 0.99),
+                "max_ms": elapsed[-1],
+                "avg_rows": sum(s.rows for s in group) / len(group),
+                "avg_round_trips": sum(s.round_trips for s in group) / len(group),
+                "errors": sum(s.error is not None for s in group),
+                "sql": statements[sql_id],
+            })
+        rows.sort(key=lambda r: r["p95_ms"], reverse=True)
+        return rows
+
+    def acquire_summary(self):
+        """Pool acquire-wait percentiles (milliseconds) over the ring buffer."""
+        with self._lock:
+            acquires = list(self._acquires)
+        waits = sorted(a.elapsed * 1000 for a in acquires)
+        return {
+            "acquires": len(waits),
+            "p50_ms": percentile(waits, 0.5),
+            "p95_ms": percentile(waits, 0.95),
+            "p99_ms": percentile(waits, 0.99),
+            "max_ms": waits[-1] if waits else None,
+            "errors": sum(a.error is not None for a in acquires),
+        }
+
+    def histogram(self, sql_id=None):
+        """Counts of buffered statement latencies per bucket, as (upper bound in ms, count) pairs."""
+        counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        for sample in self.samples():
+            if sql_id is not None and sample.sql_id != sql_id:
+                continue
+            index = next((i for i, b in enumerate(LATENCY_BUCKETS) if sample.elapsed <= b), len(LATENCY_BUCKETS))
+            counts[index] += 1
+        bounds = [b * 1000 for b in LATENCY_BUCKETS] + [math.inf]
+        return list(zip(bounds, counts))
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._acquires.clear()
+            self._statements.clear()
+            self._totals.clear()
+            self._acquire_totals = _Totals()
+
+    # --- Exports ---
+
+    def to_json(self):
+        return json.dumps({
+            "generated_at": time.time(),
+            "buffer_capacity": self.capacity,
+            "statements": self.summary(),
+            "pool_acquire": self.acquire_summary(),
+        }, default=str, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus text exposition: cumulative histograms and counters plus buffered quantiles."""
+        with self._lock:
+            totals = {k: dict(vars(v), buckets=list(v.buckets)) for k, v in self._totals.items()}
+            acquire = dict(vars(self._acquire_totals), buckets=list(self._acquire_totals.buckets))
+            statements = dict(self._statements)
+        summary = {row["sql_id"]: row for row in self.summary()}
+        acquire_summary = self.acquire_summary()
+
+        lines = []
+
+        def histogram(name, help_text, series):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, t in series:
+                prefix = f"{labels}," if labels else ""
+                for bound, count in zip(LATENCY_BUCKETS, t["buckets"]):
+                    lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {t["count"]}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {t['seconds']:.6f}")
+                lines.append(f"{name}_count{suffix} {t['count']}")
+
+        def counter(name, help_text, field):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for sql_id, t in totals.items():
+                lines.append(f'{name}{{sql_id="{sql_id}"}} {t[field]}')
+
+        histogram(
+            "medtech_sql_duration_seconds", "Statement elapsed time.",
+            [(f'sql_id="{sql_id}"', t) for sql_id, t in totals.items()],
+        )
+        counter("medtech_sql_rows_total", "Rows fetched or affected.", "rows")
+        counter("medtech_sql_round_trips_total", "Estimated client/server round trips.", "round_trips")
+        counter("medtech_sql_errors_total", "Statements that raised a database error.", "errors")
+
+        lines.append("# HELP medtech_sql_duration_quantile_seconds Statement latency quantiles over the recent sample buffer.")
+        lines.append("# TYPE medtech_sql_duration_quantile_seconds gauge")
+        for sql_id, row in summary.items():
+            for q in QUANTILES:
+                value = row[f"p{int(q * 100)}_ms"] / 1000
+                lines.append(f'medtech_sql_duration_quantile_seconds{{sql_id="{sql_id}",quantile="{q}"}} {value:.6f}')
+
+        lines.append("# HELP medtech_sql_info Normalized SQL text of each statement ID.")
+        lines.append("# TYPE medtech_sql_info gauge")
+        for sql_id, text in statements.items():
+            escaped = text[:200].replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'medtech_sql_info{{sql_id="{sql_id}",statement="{escaped}"}} 1')
+
+        histogram("medtech_pool_acquire_wait_seconds", "Time spent waiting for a pooled connection.", [("", acquire)])
+        lines.append("# HELP medtech_pool_acquire_errors_total Pool acquires that failed (e.g. wait timeout).")
+        lines.append("# TYPE medtech_pool_acquire_errors_total counter")
+        lines.append(f"medtech_pool_acquire_errors_total {acquire['errors']}")
+        lines.append("# HELP medtech_pool_acquire_wait_quantile_seconds Acquire-wait quantiles over the recent sample buffer.")
+        lines.append("# TYPE medtech_pool_acquire_wait_quantile_seconds gauge")
+        for q in QUANTILES:
+            value = acquire_summary[f"p{int(q * 100)}_ms"]
+            if value is not None:
+                lines.append(f'medtech_pool_acquire_wait_quantile_seconds{{quantile="{q}"}} {value / 1000:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+recorder = MetricsRecorder(db_config.METRICS_BUFFER_SIZE)
+
+
+# --- Instrumented connection and cursor wrappers ---
+
+def _error_text(error):
+    error_obj, = error.args
+    return getattr(error_obj, "message", str(error_obj))
+
+
+class InstrumentedCursor:
+    """
+    Wraps an oracledb cursor. A query's sample is recorded once the cursor moves
+    on to another statement or is closed, so its rows and fetch time are included.
+    """
+
+    def __init__(self, cursor, recorder):
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_recorder", recorder)
+        object.__setattr__(self, "_pending", None) # [sql, kind, elapsed, rows, prefetch, arraysize]
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        # arraysize, prefetchrows, ... must reach the real cursor
+        setattr(self._cursor, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def _finish(self):
+        pending = self._pending
+        if pending is None:
+            return
+        object.__setattr__(self, "_pending", None)
+        sql, kind, elapsed, rows, prefetch, arraysize = pending
+        if kind == "query":
+            # The execute round trip brings back prefetchrows rows, each further fetch up to arraysize
+            round_trips = 1 + math.ceil(max(0, rows - prefetch) / max(1, arraysize))
+        else:
+            round_trips = 1
+        self._recorder.record_statement(sql, kind, elapsed, rows, round_trips)
+
+    def execute(self, statement, parameters=None, **keyword_parameters):
+        self._finish()
+        sql = statement if statement is not None else (self._cursor.statement or "")
+        kind = statement_kind(" ".join(sql.split()))
+        start = time.perf_counter()
+        try:
+            result = self._cursor.execute(statement, parameters, **keyword_parameters)
+        except oracledb.Error as e:
+            self._recorder.record_statement(sql, kind, time.perf_counter() - start, 0, 1, _error_text(e))
+            raise
+        elapsed = time.perf_counter() - start
+        rows = 0 if kind == "query" else max(0, self._cursor.rowcount)
+        object.__setattr__(
+            self, "_pending",
+            [sql, kind, elapsed, rows, self._cursor.prefetchrows, self._cursor.arraysize]
+        )
+        return self if result is self._cursor else result
+
+    def executemany(self, statement, parameters, **keyword_parameters):
+        self._finish()
+        sql = statement if statement is not None else (self._cursor.statement or "")
+        kind = statement_kind(" ".join(sql.split()))
+        start = time.perf_counter()
+        try:
+            result = self._cursor.executemany(statement, parameters, **keyword_parameters)
+        except oracledb.Error as e:
+            self._recorder.record_statement(sql, kind, time.perf_counter() - start, 0, 1, _error_text(e))
+            raise
+        # Array DML: one round trip per call
+        self._recorder.record_statement(
+            sql, kind, time.perf_counter() - start, max(0, self._cursor.rowcount), 1
+        )
+        return result
+
+    def _timed_fetch(self, fetch, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        if self._pending is not None:
+            self._pending[2] += time.perf_counter() - start
+            if isinstance(result, list):
+                self._pending[3] += len(result)
+            elif result is not None:
+                self._pending[3] += 1
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(self._cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._timed_fetch(self._cursor.fetchmany)
+        return self._timed_fetch(self._cursor.fetchmany, size)
+
+    def fetchall(self):
+        return self._timed_fetch(self._cursor.fetchall)
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+
+class InstrumentedConnection:
+    """Wraps an oracledb connection so its cursors and data frame fetches are recorded."""
+
+    def __init__(self, connection, recorder):
+        self._connection = connection
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._connection.__exit__(*exc_info)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs), self._recorder)
+
+    def fetch_df_all(self, statement, parameters=None, arraysize=None, **kwargs):
+        arraysize = arraysize or oracledb.defaults.arraysize
+        start = time.perf_counter()
+        try:
+            oracle_df = self._connection.fetch_df_all(statement, parameters, arraysize=arraysize, **kwargs)
+        except oracledb.Error as e:
+            self._recorder.record_statement(statement, "query", time.perf_counter() - start, 0, 1, _error_text(e))
+            raise
+        rows = oracle_df.num_rows()
+        self._recorder.record_statement(
+            statement, "query", time.perf_counter() - start, rows, max(1, math.ceil(rows / arraysize))
+        )
+        return oracle_df
+
+    def fetch_df_batches(self, statement, parameters=None, size=None, **kwargs):
+        size = size or oracledb.defaults.arraysize
+        elapsed = 0.0
+        rows = 0
+        batches = 0
+        error = None
+        batch_iter = iter(self._connection.fetch_df_batches(statement, parameters, size=size, **kwargs))
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    oracle_df = next(batch_iter)
+                except StopIteration:
+                    elapsed += time.perf_counter() - start
+                    break
+                except oracledb.Error as e:
+                    elapsed += time.perf_counter() - start
+                    error = _error_text(e)
+                    raise
+                elapsed += time.perf_counter() - start
+                rows += oracle_df.num_rows()
+                batches += 1
+                yield oracle_df
+        finally:
+            self._recorder.record_statement(statement, "query", elapsed, rows, max(1, batches), error)
+
+
+def instrument(connection, recorder=recorder):
+    return InstrumentedConnection(connection, recorder)
+
+
+def timed_acquire(acquire, recorder=recorder):
+    """Calls a pool acquire function, records its wait and returns an instrumented connection."""
+    start = time.perf_counter()
+    try:
+        connection = acquire()
+    except oracledb.Error as e:
+        recorder.record_acquire(time.perf_counter() - start, _error_text(e))
+        raise
+    recorder.record_acquire(time.perf_counter() - start)
+    return instrument(connection, recorder)
+
+
+# --- Optional Prometheus scrape endpoint ---
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, content_type = recorder.to_json(), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, content_type = recorder.to_prometheus(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass # Keep scrapes out of the Streamlit console
+
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+
+def serve_metrics(port=db_config.METRICS_PORT, host=db_config.METRICS_HOST):
+    """
+    Serves /metrics (Prometheus text) and /metrics.json from a daemon thread.
+    The endpoint is unauthenticated, so expose it beyond localhost only behind a
+    proxy that checks credentials. Does nothing when port is 0. Idempotent: later calls return the running
+    server instead of binding the port again. Returns the server, or None.
+    """
+    global _metrics_server
+    if not port:
+        return None
+    with _metrics_server_lock:
+        if _metrics_server is None:
+            server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            print(f"Serving query metrics on {host}:{port} (/metrics, /metrics.json)")
+            _metrics_server = server
+        return _metrics_server
@@ -0,0 +1,144 @@
+# webapp/route_planner.py
+import time
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import data_access
+
+# --- Delivery route planning ---
+# A team's open orders are grouped into trips by expected delivery date and the
+# distribution center of their first batch. Orders to the same address become one
+# stop per customer, and each trip's stops are ordered from the center with nearest-neighbour
+# followed by 2-opt. The schema stores no coordinates, so the distance between two
+# locations is approximated from their zip codes, with a penalty for changing city.
+
+ZIP_SCALE = 10.0      # zip code difference counted as one distance unit
+CITY_PENALTY = 50.0   # added when two locations are in different cities
+TWO_OPT_BUDGET = 0.5  # seconds of 2-opt per team, shared by its trips
+
+ROUTE_ORDERS_SQL = """
+    SELECT bo.OrderID, bo.ExpectedDeliveryDate, bo.DeliveryStatus,
+           c.CustomerCode, c.CustomerLocation.City AS City, c.CustomerLocation.Street AS Street,
+           c.CustomerLocation.StreetNo AS StreetNo, c.CustomerLocation.ZipCode AS ZipCode,
+           fc.CenterName, fc.CenterCity, fc.CenterZip
+    FROM BatchOrder bo
+    JOIN Customer c ON bo.ByCustomer = REF(c)
+    OUTER APPLY (
+        SELECT dc.CenterName, dc.CenterLocation.City AS CenterCity, dc.CenterLocation.ZipCode AS CenterZip
+        FROM TABLE(bo.OrderBatches) ob, ProductBatch pb, DistributionCenter dc
+        WHERE ob.COLUMN_VALUE = REF(pb) AND pb.ByDistCenter = REF(dc)
+        ORDER BY pb.BatchID
+        FETCH FIRST 1 ROW ONLY
+    ) fc
+    WHERE bo.ByLogisticTeam IN (SELECT REF(t) FROM LogisticTeam t WHERE t.TeamCode IN ({in_list}))
+      AND bo.DeliveryStatus IN ('Pending', 'In Transit')
+    ORDER BY bo.ExpectedDeliveryDate, bo.OrderID
+"""
+
+Trip = namedtuple(
+    "Trip",
+    ["delivery_date", "center", "stops", "orders", "length", "initial_length"],
+)
+
+
+def load_open_orders(connection, team_codes):
+    """Open (Pending / In Transit) orders of the teams with customer and center locations."""
+    in_list, binds = data_access.in_list_binds(team_codes, prefix="team")
+    return data_access.fetch_dataframe(connection, ROUTE_ORDERS_SQL.format(in_list=in_list), binds)
+
+
+def distance_matrix(zips, cities):
+    """Pairwise distances from zip code differences plus a penalty for changing city."""
+    zips = np.asarray(zips, dtype=np.float32)
+    city_codes = pd.factorize(pd.Series(cities, dtype=object).fillna(""))[0]
+    distances = np.abs(zips[:, None] - zips[None, :]) / np.float32(ZIP_SCALE)
+    distances += np.float32(CITY_PENALTY) * (city_codes[:, None] != city_codes[None, :])
+    return distances
+
+
+def route_length(distances, tour):
+    """Length of an open path visiting `tour` in order."""
+    return float(distances[tour[:-1], tour[1:]].sum())
+
+
+def nearest_neighbour(distances):
+    """Open path from node 0 that always moves to the closest unvisited node."""
+    n = len(distances)
+    tour = np.empty(n, dtype=np.intp)
+    visited = np.zeros(n, dtype=bool)
+    tour[0], visited[0] = 0, True
+    for position in range(1, n):
+        row = np.where(visited, np.inf, distances[tour[position - 1]])
+        tour[position] = np.argmin(row)
+        visited[tour[position]] = True
+    return tour
+
+
+def two_opt(distances, tour, deadline):
+    """
+    Improves an open path with node 0 fixed at the start by reversing segments.
+    For each segment start every segment end is evaluated at once; passes
+    repeat until no reversal helps or `deadline` (perf_counter) is reached.
+    """
+    tour = tour.copy()
+    n = len(tour)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(1, n - 1):
+            a, b = tour[i - 1], tour[i]
+            c = tour[i + 1:]
+            d = np.append(tour[i + 2:], -1)
+            # Reversing tour[i..j] replaces edges (a, b) and (c, d) with (a, c) and (b, d);
+            # the last segment end has no successor in an open path.
+            has_next = d >= 0
+            d_safe = np.where(has_next, d, 0)
+            delta = distances[a, c] - distances[a, b]
+            delta += np.where(has_next, distances[b, d_safe] - distances[c, d_safe], 0)
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-6:
+                tour[i:i + j + 2] = tour[i:i + j + 2][::-1]
+                improved = True
+            if time.perf_counter() >= deadline:
+                break
+    return tour
+
+
+def plan_trip(center_city, center_zip, stops, deadline):
+    """Orders the stops of one trip, starting at the center. Returns (order, length, initial length)."""
+    zips = np.concatenate(([center_zip], stops["ZIPCODE"].to_numpy(dtype=np.float32)))
+    cities = [center_city] + stops["CITY"].tolist()
+    distances = distance_matrix(zips, cities)
+    initial = nearest_neighbour(distances)
+    tour = two_opt(distances, initial, deadline) if len(stops) > 2 else initial
+    return tour[1:] - 1, route_length(distances, tour), route_length(distances, initial)
+
+
+def plan_routes(orders, time_budget=TWO_OPT_BUDGET):
+    """
+    Groups orders (as returned by load_open_orders) into trips by expected
+    delivery date and center, and orders each trip's stops.
+    Returns (list of Trip, seconds spent).
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget
+    orders = orders.assign(
+        ZIPCODE=pd.to_numeric(orders["ZIPCODE"], errors="coerce").fillna(0).astype("int64"),
+        CENTERZIP=pd.to_numeric(orders["CENTERZIP"], errors="coerce").fillna(0),
+        CENTERNAME=orders["CENTERNAME"].fillna("(no batches)"),
+    )
+    address = ["CITY", "ZIPCODE", "STREET", "STREETNO", "CUSTOMERCODE"]
+    trips = []
+    for (delivery_date, center), group in orders.groupby(["EXPECTEDDELIVERYDATE", "CENTERNAME"], sort=True):
+        stops = (
+            group.groupby(address, dropna=False, sort=False)["ORDERID"]
+            .agg(lambda ids: ", ".join(str(i) for i in sorted(ids)))
+            .reset_index()
+            .rename(columns={"ORDERID": "ORDERS"})
+        )
+        first = group.iloc[0]
+        order, length, initial = plan_trip(first["CENTERCITY"], first["CENTERZIP"], stops, deadline)
+        stops = stops.iloc[order].reset_index(drop=True)
+        stops.insert(0, "STOP", np.arange(1, len(stops) + 1))
+        trips.append(Trip(delivery_date, center, stops, len(group), length, initial))
+    return trips, time.perf_counter() - start
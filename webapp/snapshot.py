@@ -0,0 +1,336 @@
+# webapp/snapshot.py
+import logging
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+import duckdb
+import oracledb
+import pyarrow
+import db_config
+import expiry_sweep
+import table_browser
+import team_deliveries
+
+# --- Local analytics snapshot ---
+# The flat reporting tables (scripts/09_reporting.sql), the quarantine and the
+# team/chief pairs are replicated into a local DuckDB file, so read-only pages
+# can scan them there (vectorised, in process) instead of on the OLTP database.
+# Each refresh only transfers rows whose ORA_ROWSCN is above the SCN recorded
+# at the previous refresh; the reporting tables are created with
+# ROWDEPENDENCIES so the SCN is tracked per row, not per block. Deleted rows
+# are detected by comparing row counts, and only then reconciled by key.
+
+logger = logging.getLogger(__name__)
+
+# `source` is the Oracle table whose ORA_ROWSCN marks changed rows
+SnapshotTable = namedtuple("SnapshotTable", ["name", "source", "columns", "keys", "incremental"])
+
+TABLES = [
+    SnapshotTable("BatchFact", "BatchFact", "*", ["BatchID"], True),
+    SnapshotTable("OrderLine", "OrderLine", "*", ["OrderID", "BatchID"], True),
+    SnapshotTable("ComplaintFact", "ComplaintFact", "*", ["TicketID"], True),
+    SnapshotTable(
+        "BatchQuarantine", "BatchQuarantine", "BatchID, SerialNo, ExpiryDate, QuarantinedAt", ["BatchID"], True
+    ),
+    # A few rows per team, copied in full
+    SnapshotTable(
+        "TeamChief", "LogisticTeam t", "t.TeamCode, t.TeamName, t.TeamChief.TaxCode AS ChiefTaxCode",
+        ["TeamCode"], False
+    ),
+]
+
+# Tables Overview sections whose query only reads a replicated table
+TABLE_PAGES = {
+    "product_batches": "BatchFact",
+    "batch_orders": "OrderLine",
+    "complaints": "ComplaintFact",
+}
+
+CURRENT_SCN_SQL = "SELECT CURRENT_SCN FROM V$DATABASE"
+
+STATE_DDL = """
+    CREATE TABLE IF NOT EXISTS snapshot_state (
+        table_name VARCHAR PRIMARY KEY,
+        scn BIGINT NOT NULL,
+        refreshed_at TIMESTAMP NOT NULL,
+        row_count BIGINT NOT NULL
+    )
+"""
+
+RefreshResult = namedtuple("RefreshResult", ["rows", "deleted", "elapsed"])
+SnapshotStatus = namedtuple("SnapshotStatus", ["refreshed_at", "age_seconds", "stale"])
+
+
+def _source_sql(table):
+    return f"SELECT {table.columns} FROM {table.source}"
+
+
+def delta_query(table):
+    """The Oracle query of a table's refresh: rows changed after :since_scn, or all of them."""
+    if not table.incremental:
+        return _source_sql(table)
+    return _source_sql(table) + " WHERE ORA_ROWSCN > :since_scn"
+
+
+class Snapshot:
+    """Process-wide DuckDB replica of the reporting tables; safe to read while it refreshes."""
+
+    def __init__(self, path, max_age_seconds):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self._db = None
+        self._open_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def _database(self):
+        with self._open_lock:
+            if self._db is None:
+                self._db = duckdb.connect(self.path)
+                self._db.execute(STATE_DDL)
+            return self._db
+
+    def cursor(self):
+        """A DuckDB connection for the calling thread (DuckDB connections are not shared across threads)."""
+        return self._database().cursor()
+
+    def _state(self, db):
+        rows = db.execute("SELECT table_name, scn, refreshed_at, row_count FROM snapshot_state").fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def status(self):
+        """SnapshotStatus of the least recently refreshed table, or None until every table is loaded."""
+        with self.cursor() as db:
+            state = self._state(db)
+        if any(table.name not in state for table in TABLES):
+            return None
+        refreshed_at = min(refreshed for _, refreshed, _ in state.values())
+        age = (datetime.now() - refreshed_at).total_seconds()
+        return SnapshotStatus(refreshed_at, age, age > self.max_age_seconds)
+
+    def row_count(self, name):
+        """Rows of a replicated table at its last refresh, or None before the first."""
+        with self.cursor() as db:
+            return self._state(db).get(name, (None, None, None))[2]
+
+    def refresh(self, connection, full=False, chunk_size=10_000):
+        """
+        Brings every table up to date from `connection` (the schema owner, which
+        can read V$DATABASE). Tables not loaded yet, or all of them with full=True,
+        are copied in full. Returns {table name: RefreshResult}.
+        """
+        results = {}
+        with self._refresh_lock, self.cursor() as db:
+            state = self._state(db)
+            for table in TABLES:
+                start = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute(CURRENT_SCN_SQL)
+                    scn = int(cursor.fetchone()[0])
+                since = state.get(table.name, (None,))[0]
+                reload = full or since is None or not table.incremental
+
+                db.execute("BEGIN TRANSACTION")
+                try:
+                    if reload:
+                        rows = self._reload(db, connection, table, chunk_size)
+                        deleted = 0
+                    else:
+                        rows = self._apply_delta(db, connection, table, since, chunk_size)
+                        deleted = self._reconcile_deletes(db, connection, table)
+                    count = db.execute(f"SELECT COUNT(*) FROM {table.name}").fetchone()[0]
+                    db.execute(
+                        "INSERT OR REPLACE INTO snapshot_state VALUES (?, ?, ?, ?)",
+                        [table.name, scn, datetime.now(), count],
+                    )
+                    db.execute("COMMIT")
+                except BaseException:
+                    db.execute("ROLLBACK")
+                    raise
+                results[table.name] = RefreshResult(rows, deleted, time.perf_counter() - start)
+        return results
+
+    def _reload(self, db, connection, table, chunk_size):
+        # The empty result still carries the column types, so empty tables get created too
+        empty = pyarrow.table(connection.fetch_df_all(_source_sql(table) + " WHERE 1 = 0"))
+        db.register("snapshot_chunk", empty)
+        db.execute(f"CREATE OR REPLACE TABLE {table.name} AS SELECT * FROM snapshot_chunk")
+        rows = 0
+        for oracle_df in connection.fetch_df_batches(_source_sql(table), size=chunk_size):
+            chunk = pyarrow.table(oracle_df)
+            db.register("snapshot_chunk", chunk)
+            db.execute(f"INSERT INTO {table.name} SELECT * FROM snapshot_chunk")
+            rows += chunk.num_rows
+        db.unregister("snapshot_chunk")
+        return rows
+
+    def _apply_delta(self, db, connection, table, since, chunk_size):
+        """Upserts the rows changed since SCN `since`."""
+        match = " AND ".join(f"t.{k} = c.{k}" for k in table.keys)
+        rows = 0
+        for oracle_df in connection.fetch_df_batches(delta_query(table), {'since_scn': since}, size=chunk_size):
+            chunk = pyarrow.table(oracle_df)
+            db.register("snapshot_chunk", chunk)
+            db.execute(f"DELETE FROM {table.name} t USING snapshot_chunk c WHERE {match}")
+            db.execute(f"INSERT INTO {table.name} SELECT * FROM snapshot_chunk")
+            rows += chunk.num_rows
+        db.unregister("snapshot_chunk")
+        return rows
+
+    def _reconcile_deletes(self, db, connection, table):
+        """Drops local rows deleted in Oracle; the key list is only fetched when the counts differ."""
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {table.source}")
+            remote = cursor.fetchone()[0]
+        local = db.execute(f"SELECT COUNT(*) FROM {table.name}").fetchone()[0]
+        if remote == local:
+            return 0
+        keys = ", ".join(table.keys)
+        db.register("snapshot_keys", pyarrow.table(connection.fetch_df_all(f"SELECT {keys} FROM {table.source}")))
+        match = " AND ".join(f"t.{k} = k.{k}" for k in table.keys)
+        deleted = db.execute(
+            f"DELETE FROM {table.name} t WHERE NOT EXISTS (SELECT 1 FROM snapshot_keys k WHERE {match})"
+        ).fetchone()[0]
+        db.unregister("snapshot_keys")
+        return deleted
+
+    def query(self, sql, params=None):
+        """Runs a DuckDB query on the snapshot; returns a DataFrame with upper-case column names like Oracle's."""
+        with self.cursor() as db:
+            frame = db.execute(sql, params or {}).df()
+        frame.columns = frame.columns.str.upper()
+        return frame
+
+
+snapshot = Snapshot(db_config.SNAPSHOT_PATH, db_config.SNAPSHOT_MAX_AGE_SECONDS)
+
+
+# --- Background refresh ---
+
+def refresh_now(full=False):
+    """Refreshes the snapshot on a dedicated connection as the schema owner."""
+    with oracledb.connect(
+        user=db_config.DB_USER,
+        password=db_config.DB_PASSWORD,
+        **db_config.connect_params()
+    ) as connection:
+        return snapshot.refresh(connection, full=full)
+
+
+_refresh_thread = None
+_refresh_thread_lock = threading.Lock()
+
+
+def start_background_refresh(interval=db_config.SNAPSHOT_REFRESH_SECONDS):
+    """
+    Refreshes the snapshot every `interval` seconds from a daemon thread. Does nothing when 0.
+    Idempotent: later calls return the running thread instead of starting another one.
+    """
+    global _refresh_thread
+    if not interval:
+        return None
+
+    def run():
+        while True:
+            try:
+                refresh_now()
+            except (oracledb.Error, duckdb.Error):
+                logger.exception("Snapshot refresh failed")
+            time.sleep(interval)
+
+    with _refresh_thread_lock:
+        if _refresh_thread is None:
+            _refresh_thread = threading.Thread(target=run, name="snapshot-refresh", daemon=True)
+            _refresh_thread.start()
+        return _refresh_thread
+
+
+# --- Readers for the read-only pages ---
+
+def expired_batches():
+    """The expired batches page's rows, from the snapshot (the quarantine query is portable SQL)."""
+    return snapshot.query(expiry_sweep.QUARANTINE_SQL)
+
+
+def _bind(value):
+    """Keyset values come back from pandas; DuckDB binds plain Python values."""
+    if hasattr(value, "to_pydatetime"):
+        return value.to_pydatetime()
+    return value.item() if hasattr(value, "item") else value
+
+
+def fetch_table_page(spec, sort_column, descending=False,
+                     filter_column=None, filter_text=None, after=None,
+                     page_size=db_config.TABLE_PAGE_SIZE):
+    """table_browser.fetch_page() for the TABLE_PAGES sections, answered by the snapshot."""
+    if sort_column not in spec.columns:
+        raise ValueError(f"Cannot sort {spec.title} by {sort_column}")
+    if filter_text and filter_column not in spec.columns:
+        raise ValueError(f"Cannot filter {spec.title} by {filter_column}")
+
+    order_columns = table_browser._order_columns(spec, sort_column)
+    binds = {}
+    where = []
+    if filter_text:
+        where.append(f"UPPER(CAST(q.{filter_column} AS VARCHAR)) LIKE $filter_text ESCAPE '\\'")
+        binds['filter_text'] = table_browser.like_pattern(filter_text)
+    if after is not None:
+        where.append(table_browser._keyset_predicate(
+            order_columns, descending, after, binds, marker="$", nullable=spec.nullable_keys
+        ))
+    sql = f"SELECT * FROM ({spec.sql}) q"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY " + table_browser._order_by(order_columns, descending, spec.nullable_keys)
+    sql += " LIMIT $page_limit"
+    binds['page_limit'] = page_size + 1
+    frame = snapshot.query(sql, {name: _bind(value) for name, value in binds.items()})
+    return table_browser.page_from_frame(spec, sort_column, frame, page_size)
+
+
+def load_table_page(request):
+    """Answers a table_browser.PageRequest from the snapshot; returns (page, exact row count)."""
+    page = fetch_table_page(
+        table_browser.TABLES[request.name], request.sort_column, request.descending,
+        request.filter_column, request.filter_text, after=request.after
+    )
+    return page, snapshot.row_count(TABLE_PAGES[request.name])
+
+
+# Same row layout as team_deliveries.DELIVERIES_PAGE_SQL, over OrderLine (one row per order batch).
+# Orders without order lines are not in the snapshot, so this view can list fewer
+# orders than the database one until RebuildReporting repairs the reporting tables.
+DELIVERIES_PAGE_SQL = """
+    WITH teams AS (
+        SELECT TeamCode, TeamName FROM TeamChief WHERE ChiefTaxCode = $taxcode
+    ), orders AS (
+        SELECT DISTINCT ol.OrderID, ol.TeamCode, ol.DeliveryStatus, ol.OrderDate,
+               ol.ExpectedDeliveryDate, ol.CustomerCode
+        FROM OrderLine ol JOIN teams t ON ol.TeamCode = t.TeamCode
+        WHERE ol.ExpectedDeliveryDate >= CAST($date_from AS TIMESTAMP)
+          AND ol.ExpectedDeliveryDate < CAST($date_to AS TIMESTAMP)
+    )
+    SELECT 'COUNT' AS RowKind, t.TeamCode, t.TeamName, o.DeliveryStatus, COUNT(o.OrderID) AS Orders,
+           CAST(NULL AS BIGINT) AS OrderID, CAST(NULL AS TIMESTAMP) AS OrderDate,
+           CAST(NULL AS TIMESTAMP) AS ExpectedDeliveryDate, CAST(NULL AS VARCHAR) AS CustomerCode
+    FROM teams t LEFT JOIN orders o ON o.TeamCode = t.TeamCode
+    GROUP BY t.TeamCode, t.TeamName, o.DeliveryStatus
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'ORDER', o.TeamCode, t.TeamName, o.DeliveryStatus, NULL,
+               o.OrderID, o.OrderDate, o.ExpectedDeliveryDate, o.CustomerCode
+        FROM orders o JOIN teams t ON t.TeamCode = o.TeamCode
+        WHERE o.OrderID > $after
+          AND (CAST($status AS VARCHAR) IS NULL OR o.DeliveryStatus = CAST($status AS VARCHAR))
+        ORDER BY o.OrderID
+        LIMIT $page_rows
+    )
+"""
+
+
+def fetch_deliveries(taxcode, status=None, date_from=None, date_to=None,
+                     after=0, page_size=db_config.TABLE_PAGE_SIZE):
+    """team_deliveries.fetch_deliveries() answered by the snapshot."""
+    binds = team_deliveries.deliveries_binds(taxcode, status, date_from, date_to, after, page_size)
+    frame = snapshot.query(DELIVERIES_PAGE_SQL, binds)
+    return team_deliveries.page_from_frame(frame, page_size)
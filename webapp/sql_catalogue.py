@@ -0,0 +1,158 @@
+# webapp/sql_catalogue.py
+import data_access
+import lookups
+import table_browser
+import bulk_ingest
+import expiry_sweep
+import expiry_forecast
+import auto_assign
+import route_planner
+import team_deliveries
+import object_fetch
+import table_export
+import snapshot
+
+# --- Named catalogue of the SQL issued by the web app ---
+# Pages take their statements from here instead of inlining them, so tools
+# (tools.explain_plans, tools.benchmark) see every statement under a stable name.
+# Templates with an {in_list} placeholder are completed with data_access.in_list_binds().
+# Statements owned by a module (table_browser, lookups, bulk_ingest, expiry_*, auto_assign,
+# route_planner, team_deliveries, object_fetch, table_export, snapshot) stay there
+# and are only registered in statements().
+
+# Login
+DB_USERS = """
+    SELECT USERNAME FROM ALL_USERS
+    WHERE USERNAME = 'SYSTEM'
+       OR USERNAME LIKE 'C##%'
+    ORDER BY USERNAME
+"""
+
+DB_SYSDATE = "SELECT SYSDATE FROM DUAL"
+
+# Operation 1: Register a New Product Batch
+CENTER_NAMES = "SELECT CenterName FROM DistributionCenter ORDER BY CenterName"
+
+CENTER_PRODUCTS = """
+    SELECT DEREF(p.COLUMN_VALUE).SerialNo, DEREF(p.COLUMN_VALUE).ProductCategory,
+           DEREF(p.COLUMN_VALUE).ExpiryDate
+    FROM DistributionCenter dc, TABLE(dc.ListOfProducts) p
+    WHERE dc.CenterName = :center
+    ORDER BY DEREF(p.COLUMN_VALUE).SerialNo
+"""
+
+INSERT_BATCH_RETURNING = bulk_ingest.INSERT_BATCH_SQL + "RETURNING BatchID INTO :batch_id\n"
+
+# Operation 2: Place a New Order
+CUSTOMER_CODES = "SELECT CustomerCode FROM Customer ORDER BY CustomerCode"
+
+INSERT_ORDER = """
+    INSERT INTO BatchOrder (
+        OrderID, OrderBatches, OrderDate,
+        ExpectedDeliveryDate, DeliveryStatus,
+        ByCustomer, ByLogisticTeam
+    )
+    VALUES (
+        batch_order_id_seq.NEXTVAL,
+        (SELECT CAST(COLLECT(REF(pb)) AS BatchList)
+         FROM ProductBatch pb
+         WHERE pb.BatchID IN ({in_list})
+        ),
+        :order_date,
+        :expected_delivery,
+        :status,
+        (SELECT REF(c) FROM Customer c
+         WHERE c.CustomerCode = :customer),
+        NULL
+    )
+    RETURNING OrderID INTO :order_id
+"""
+
+# Operation 3: Assign a Delivery to a Logistics Team
+PENDING_ORDERS = """
+    SELECT bo.OrderID, bo.DeliveryStatus
+    FROM BatchOrder bo
+    WHERE bo.DeliveryStatus = 'Pending' AND bo.ByLogisticTeam IS NULL
+    ORDER BY bo.OrderID
+"""
+
+# Only a still pending, unassigned order is updated: an order assigned or
+# delivered since the page listed it is left alone (rowcount 0), not reassigned.
+ASSIGN_TEAM = """
+    UPDATE BatchOrder
+    SET ByLogisticTeam = (
+        SELECT REF(t)
+        FROM LogisticTeam t
+        WHERE t.TeamCode = :team_code
+    )
+    WHERE OrderID = :order_id
+      AND DeliveryStatus = 'Pending'
+      AND ByLogisticTeam IS NULL
+"""
+
+# Operation 4: View Deliveries Assigned to a Team
+CHIEFS_WITH_TEAMS = """
+    SELECT c.TaxCode, c.MemberName, c.MemberSurname
+    FROM ChiefOfficier c
+    WHERE EXISTS (
+        SELECT 1 FROM LogisticTeam t WHERE t.TeamChief = REF(c)
+    )
+    ORDER BY c.MemberSurname, c.MemberName
+"""
+
+
+# Page statements by catalogue name; templates are listed with their IN-list bind prefix
+PAGE_STATEMENTS = {
+    "login.db_users": DB_USERS,
+    "login.sysdate": DB_SYSDATE,
+    "register_batch.center_names": CENTER_NAMES,
+    "register_batch.center_products": CENTER_PRODUCTS,
+    "register_batch.insert": INSERT_BATCH_RETURNING,
+    "place_order.customer_codes": CUSTOMER_CODES,
+    "place_order.insert": (INSERT_ORDER, "batch"),
+    "assign_delivery.pending_orders": PENDING_ORDERS,
+    "assign_delivery.assign_team": ASSIGN_TEAM,
+    "team_deliveries.chiefs": CHIEFS_WITH_TEAMS,
+}
+
+
+def with_in_list(template, values, prefix):
+    """Completes an {in_list} template. Returns (sql, binds)."""
+    in_list, binds = data_access.in_list_binds(values, prefix=prefix)
+    return template.format(in_list=in_list), binds
+
+
+def statements(in_list_size=4):
+    """
+    Returns {name: sql} for every statement the web app issues.
+    Templates get an IN list of `in_list_size` binds; each Tables Overview
+    query is listed as its first page, sorted by its first column.
+    """
+    catalogue = {}
+    for name, entry in PAGE_STATEMENTS.items():
+        if isinstance(entry, tuple):
+            template, prefix = entry
+            entry = with_in_list(template, range(in_list_size), prefix)[0]
+        catalogue[name] = entry
+    catalogue["lookups.batches"] = lookups._batch_lookup_query()[0]
+    catalogue["lookups.order_batches"] = lookups._batch_lookup_query(order_id=0)[0]
+    catalogue["expiry_sweep.quarantine"] = expiry_sweep.QUARANTINE_SQL
+    catalogue["expiry_sweep.state"] = expiry_sweep.SWEEP_STATE_SQL
+    catalogue["expiry_forecast.range"] = expiry_forecast.FORECAST_SQL.format(where=expiry_forecast.EXPIRY_RANGE_FILTER)
+    catalogue["expiry_forecast.new_batches"] = expiry_forecast.FORECAST_SQL.format(where=expiry_forecast.NEW_BATCHES_FILTER)
+    catalogue["expiry_forecast.last_batch"] = expiry_forecast.LAST_BATCH_SQL
+    catalogue["auto_assign.candidates"] = auto_assign.CANDIDATES_SQL
+    catalogue["auto_assign.assign_pending"] = auto_assign.ASSIGN_PENDING_SQL
+    catalogue["team_deliveries.page"] = team_deliveries.DELIVERIES_PAGE_SQL
+    catalogue["route_planner.open_orders"] = with_in_list(route_planner.ROUTE_ORDERS_SQL, range(in_list_size), "team")[0]
+    catalogue["bulk_ingest.insert_batch"] = bulk_ingest.INSERT_BATCH_SQL
+    catalogue["object_fetch.department_preferences"] = with_in_list(object_fetch.DEPARTMENT_PREFERENCES_SQL, range(in_list_size), "dept")[0]
+    catalogue["object_fetch.customer_departments"] = with_in_list(object_fetch.CUSTOMER_DEPARTMENTS_SQL, range(in_list_size), "customer")[0]
+    for table_name, spec in table_browser.TABLES.items():
+        catalogue[f"tables.{table_name}"] = table_browser.page_query(spec, spec.columns[0])[0]
+        catalogue[f"table_export.{table_name}"] = table_export.export_query(spec)
+    catalogue["tables.estimate_rows"] = table_browser.ESTIMATE_ROWS_SQL
+    catalogue["snapshot.current_scn"] = snapshot.CURRENT_SCN_SQL
+    for table in snapshot.TABLES:
+        catalogue[f"snapshot.{table.name}"] = snapshot.delta_query(table)
+    return catalogue
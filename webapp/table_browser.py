@@ -0,0 +1,350 @@
+# webapp/table_browser.py
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import oracledb
+import db_config
+import data_access
+import object_fetch
+
+# --- Catalogue of the tables shown on the Tables Overview page ---
+# keys: columns that identify a row, used as keyset tie-breakers.
+# columns: NOT NULL columns the user may sort and filter on.
+# nullable_keys: keys that can be NULL (values read through a REF that may
+#   dangle); they sort last and the keyset predicate tests them with IS NULL.
+# stats_table: table whose optimizer statistics give the row count estimate.
+# resolve: for queries selecting object columns, fn(connection, page frame) that
+#   expands them and resolves REF collections once per page (object_fetch).
+# Batches, orders and complaints are read from the flat reporting tables of
+# scripts/09_reporting.sql, so no REF is dereferenced per row; an order is
+# listed once per batch it includes.
+
+TableSpec = namedtuple(
+    "TableSpec", ["title", "sql", "keys", "columns", "stats_table", "resolve", "nullable_keys"],
+    defaults=[None, ()]
+)
+
+TablePage = namedtuple("TablePage", ["frame", "has_next", "last_key"])
+
+# One page to load: the catalogue entry name plus the fetch_page() arguments
+PageRequest = namedtuple(
+    "PageRequest", ["name", "sort_column", "descending", "filter_column", "filter_text", "after"]
+)
+
+TABLES = {
+    "products": TableSpec(
+        "Products",
+        'SELECT * FROM Product',
+        ["SerialNo"],
+        ["SerialNo", "ProductCategory"],
+        "PRODUCT",
+    ),
+    "product_batches": TableSpec(
+        "Products Batches",
+        '''
+        SELECT
+            BF.BatchID,
+            BF.Quantity,
+            BF.ArrivalDate,
+            BF.SerialNo AS ProductSerialNo,
+            BF.ProductCategory,
+            BF.ExpiryDate AS ProductExpiryDate,
+            BF.CenterName
+        FROM
+            BatchFact BF
+        ''',
+        ["BatchID"],
+        ["BatchID", "Quantity", "ArrivalDate"],
+        "BATCHFACT",
+    ),
+    "departments": TableSpec(
+        "Departments",
+        '''
+        SELECT
+            D.DepartmentID,
+            D.DeptContact
+        FROM Department D
+        ''',
+        ["DepartmentID"],
+        ["DepartmentID"],
+        "DEPARTMENT",
+        object_fetch.resolve_departments,
+    ),
+    "customers": TableSpec(
+        "Customers",
+        '''
+        SELECT
+            C.CustomerCode,
+            C.CustomerLocation
+        FROM Customer C
+        ''',
+        ["CustomerCode"],
+        ["CustomerCode"],
+        "CUSTOMER",
+        object_fetch.resolve_customers,
+    ),
+    "team_members": TableSpec(
+        "Team Members",
+        'SELECT * FROM TeamMember',
+        ["TaxCode"],
+        ["TaxCode", "MemberName", "MemberSurname", "BirthDate", "EmploymentDate"],
+        "TEAMMEMBER",
+    ),
+    "chief_officiers": TableSpec(
+        "Chief Officiers",
+        'SELECT tm.TaxCode, tm.MemberName, tm.MemberSurname, tm.BirthDate, tm.EmploymentDate, co.StartDate FROM ChiefOfficier co, TeamMember tm WHERE co.TaxCode = tm.TaxCode',
+        ["TaxCode"],
+        ["TaxCode", "MemberName", "MemberSurname", "StartDate"],
+        "CHIEFOFFICIER",
+    ),
+    "logistic_teams": TableSpec(
+        "Logistic Teams",
+        '''
+        SELECT
+            LT.TeamCode,
+            LT.TeamName,
+            DEREF(LT.TeamChief).TaxCode AS ChiefTaxCode,
+            TMEM.MemberName AS ChiefName,
+            TMEM.MemberSurname AS ChiefSurname,
+            LT.CompletedDeliveries,
+            DEREF(TM.COLUMN_VALUE).TaxCode AS MemberTaxCode,
+            DEREF(TM.COLUMN_VALUE).MemberName AS MemberName,
+            DEREF(TM.COLUMN_VALUE).MemberSurname AS MemberSurname,
+            DEREF(TM.COLUMN_VALUE).BirthDate AS MemberBirthDate,
+            DEREF(TM.COLUMN_VALUE).EmploymentDate AS MemberEmploymentDate
+        FROM
+            LogisticTeam LT
+            LEFT JOIN TeamMember TMEM ON TMEM.TaxCode = DEREF(LT.TeamChief).TaxCode,
+            TABLE(LT.TeamMembers) TM
+        ''',
+        ["TeamCode", "MemberTaxCode"],
+        ["TeamCode", "TeamName", "CompletedDeliveries"],
+        "LOGISTICTEAM",
+        nullable_keys=("MemberTaxCode",),
+    ),
+    "distribution_centers": TableSpec(
+        "Distribution Centers",
+        '''
+        SELECT
+            DC.CenterName,
+            DEREF(P.COLUMN_VALUE).SerialNo AS ProductSerialNo,
+            DEREF(P.COLUMN_VALUE).ProductCategory AS ProductCategory,
+            DEREF(P.COLUMN_VALUE).ExpiryDate AS ProductExpiryDate
+        FROM
+            DistributionCenter DC,
+            TABLE(DC.ListOfProducts) P
+        ''',
+        ["CenterName", "ProductSerialNo"],
+        ["CenterName"],
+        "DISTRIBUTIONCENTER",
+        nullable_keys=("ProductSerialNo",),
+    ),
+    "batch_orders": TableSpec(
+        "Batch Orders",
+        '''
+        SELECT
+            OL.OrderID,
+            OL.BatchID,
+            OL.OrderDate,
+            OL.ExpectedDeliveryDate,
+            OL.DeliveryStatus,
+            OL.CustomerCode,
+            OL.CustomerCity,
+            OL.CustomerStreet,
+            OL.CustomerZipCode,
+            OL.TeamCode AS LogisticTeamCode,
+            OL.TeamName AS LogisticTeamName,
+            OL.SerialNo AS ProductSerialNo,
+            OL.ProductCategory,
+            OL.Quantity AS BatchQuantity
+        FROM
+            OrderLine OL
+        ''',
+        ["OrderID", "BatchID"],
+        ["OrderID", "OrderDate", "ExpectedDeliveryDate", "DeliveryStatus"],
+        "ORDERLINE",
+    ),
+    "complaints": TableSpec(
+        "Complaints",
+        '''
+        SELECT
+            CF.TicketID,
+            CF.ComplaintType,
+            CF.StartDate AS ComplaintStartDate,
+            CF.EndDate AS ComplaintEndDate,
+            CF.CustomerCode,
+            CF.CustomerCity,
+            CF.CustomerStreet,
+            CF.OrderID AS BatchOrderID,
+            CF.OrderDeliveryStatus AS BatchOrderDeliveryStatus,
+            CF.OrderDate AS BatchOrderDate
+        FROM
+            ComplaintFact CF
+        ''',
+        ["TicketID"],
+        ["TicketID", "ComplaintType", "ComplaintStartDate"],
+        "COMPLAINTFACT",
+    ),
+}
+
+
+def _is_null(value):
+    # NULL keys come back from pandas as None, NaN or NaT
+    return value is None or value != value
+
+
+def _keyset_predicate(order_columns, descending, after, binds, marker=":", nullable=()):
+    """
+    Builds the lexicographic "row comes after :after" predicate.
+    Oracle has no row value comparison, so (a, b) > (x, y) is expanded to
+    a > x OR (a = x AND b > y). `marker` prefixes the bind names (":" for Oracle).
+    Columns in `nullable` sort NULLS LAST (see _order_by): a NULL is only equal
+    to NULL and nothing comes after it, and every NULL comes after a value.
+    """
+    op = "<" if descending else ">"
+    terms = []
+    equal = []
+    for i, (column, value) in enumerate(zip(order_columns, after)):
+        if _is_null(value):
+            # Nothing sorts after a NULL: only later columns can still advance
+            equal.append(f"q.{column} IS NULL")
+            continue
+        binds[f"k{i}"] = value
+        later = f"q.{column} {op} {marker}k{i}"
+        if column in nullable:
+            later = f"({later} OR q.{column} IS NULL)"
+        terms.append("(" + " AND ".join(equal + [later]) + ")")
+        equal.append(f"q.{column} = {marker}k{i}")
+    return "(" + " OR ".join(terms) + ")" if terms else "(1 = 0)"
+
+
+def _order_by(order_columns, descending, nullable=()):
+    direction = "DESC" if descending else "ASC"
+    return ", ".join(
+        f"q.{c} {direction}" + (" NULLS LAST" if c in nullable else "") for c in order_columns
+    )
+
+
+def like_pattern(text):
+    """Case-insensitive "contains" pattern for LIKE ... ESCAPE '\\', with % and _ matched literally."""
+    escaped = text.upper().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def page_query(spec, sort_column, descending=False,
+               filter_column=None, filter_text=None, after=None,
+               page_size=db_config.TABLE_PAGE_SIZE):
+    """
+    Returns (sql, binds) for one keyset-paginated page of a catalogue query,
+    sorted and filtered in the database. One extra row is requested to tell
+    whether another page exists.
+    """
+    if sort_column not in spec.columns:
+        raise ValueError(f"Cannot sort {spec.title} by {sort_column}")
+    if filter_text and filter_column not in spec.columns:
+        raise ValueError(f"Cannot filter {spec.title} by {filter_column}")
+
+    order_columns = _order_columns(spec, sort_column)
+    binds = {}
+    where = []
+    if filter_text:
+        where.append(f"UPPER(TO_CHAR(q.{filter_column})) LIKE :filter_text ESCAPE '\\'")
+        binds['filter_text'] = like_pattern(filter_text)
+    if after is not None:
+        where.append(_keyset_predicate(order_columns, descending, after, binds, nullable=spec.nullable_keys))
+
+    sql = f"SELECT * FROM ({spec.sql}) q"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY " + _order_by(order_columns, descending, spec.nullable_keys)
+    sql += " FETCH FIRST :page_limit ROWS ONLY"
+    binds['page_limit'] = page_size + 1
+    return sql, binds
+
+
+def _order_columns(spec, sort_column):
+    return [sort_column] + [k for k in spec.keys if k != sort_column]
+
+
+def fetch_page(connection, spec, sort_column, descending=False,
+               filter_column=None, filter_text=None, after=None,
+               page_size=db_config.TABLE_PAGE_SIZE):
+    """
+    Fetches one keyset-paginated page of a catalogue query, sorted and filtered in the database.
+    `after` is the last_key of the previous page (None for the first page).
+    """
+    sql, binds = page_query(spec, sort_column, descending, filter_column, filter_text, after, page_size)
+    if spec.resolve:
+        frame = object_fetch.fetch_object_frame(connection, sql, binds, arraysize=page_size + 1)
+    else:
+        frame = data_access.fetch_dataframe(connection, sql, binds, arraysize=page_size + 1)
+
+    page = page_from_frame(spec, sort_column, frame, page_size)
+    if spec.resolve and len(page.frame):
+        page = page._replace(frame=spec.resolve(connection, page.frame.copy()))
+    return page
+
+
+def page_from_frame(spec, sort_column, frame, page_size=db_config.TABLE_PAGE_SIZE):
+    """Turns the page_size + 1 rows of a page query (upper-case columns) into a TablePage."""
+    has_next = len(frame) > page_size
+    frame = frame.head(page_size)
+    last_key = None
+    if len(frame):
+        order_columns = _order_columns(spec, sort_column)
+        last_row = frame[[c.upper() for c in order_columns]].tail(1).to_dict("records")[0]
+        last_key = tuple(last_row.values())
+    return TablePage(frame, has_next, last_key)
+
+
+ESTIMATE_ROWS_SQL = "SELECT MAX(NUM_ROWS) FROM ALL_ALL_TABLES WHERE TABLE_NAME = :table_name"
+
+
+def estimate_rows(connection, spec):
+    """
+    Returns the optimizer's row count estimate for the table behind a catalogue entry,
+    or None when statistics have not been gathered. ALL_ALL_TABLES also lists object tables.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(ESTIMATE_ROWS_SQL, {'table_name': spec.stats_table})
+        return cursor.fetchone()[0]
+
+
+# --- Concurrent page loading ---
+# Each loaded section runs on its own pooled connection, so the page waits for
+# the slowest query instead of the sum of all of them. The worker count is
+# capped so a single page view cannot take every connection in the pool.
+
+def _load_page(db_pool, request):
+    """Fetches one requested page and its row estimate on a dedicated connection."""
+    spec = TABLES[request.name]
+    with db_pool.acquire() as connection:
+        page = fetch_page(
+            connection, spec, request.sort_column, request.descending,
+            request.filter_column, request.filter_text, after=request.after
+        )
+        estimate = estimate_rows(connection, spec)
+    return page, estimate
+
+
+def load_pages(db_pool, requests, max_workers=db_config.TABLE_FETCH_CONCURRENCY):
+    """
+    Runs the requested page fetches concurrently, at most max_workers at a time.
+    Yields (request, page, estimate, error) in completion order; `error` is the
+    oracledb.Error raised by that fetch (page and estimate are then None).
+    """
+    if not requests:
+        return
+    workers = max(1, min(max_workers, db_config.POOL_MAX, len(requests)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="table-fetch")
+    try:
+        futures = {executor.submit(_load_page, db_pool, r): r for r in requests}
+        for future in as_completed(futures):
+            try:
+                page, estimate = future.result()
+            except oracledb.Error as e:
+                yield futures[future], None, None, e
+            else:
+                yield futures[future], page, estimate, None
+    finally:
+        # Pending fetches are dropped if the caller stops early
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,160 @@
+# webapp/table_export.py
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import namedtuple
+import pandas as pd
+import pyarrow
+import pyarrow.csv
+import pyarrow.parquet
+import db_config
+import object_fetch
+import table_browser
+
+# --- Streaming export of the Tables Overview queries ---
+# A table is exported by fetching its catalogue query in chunks and writing
+# each chunk to the output as soon as it arrives, so memory use depends on the
+# chunk size, not on the table size. Plain queries are fetched straight into
+# Arrow batches (fetch_df_batches); queries with object columns go through
+# fetchmany() and their page resolver, and nested values are written as JSON.
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+ExportFormat = namedtuple("ExportFormat", ["extension", "mime"])
+
+FORMATS = {
+    "csv": ExportFormat(".csv", "text/csv"),
+    "parquet": ExportFormat(".parquet", "application/vnd.apache.parquet"),
+}
+
+ExportResult = namedtuple("ExportResult", ["rows", "elapsed"])
+
+
+def export_query(spec):
+    """The full catalogue query of a table, in key order so exports are repeatable."""
+    return f"SELECT * FROM ({spec.sql}) q ORDER BY " + ", ".join(f"q.{k}" for k in spec.keys)
+
+
+def _json_cell(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def _object_chunks(connection, spec, chunk_size):
+    """Arrow tables of resolved object rows, chunk_size rows at a time."""
+    with connection.cursor() as cursor:
+        cursor.arraysize = chunk_size
+        cursor.outputtypehandler = object_fetch.object_type_handler
+        cursor.execute(export_query(spec))
+        columns = [col[0] for col in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            frame = spec.resolve(connection, pd.DataFrame(rows, columns=columns))
+            for column in frame.columns[frame.dtypes == object]:
+                frame[column] = frame[column].map(_json_cell)
+            yield pyarrow.Table.from_pandas(frame, preserve_index=False)
+
+
+def iter_chunks(connection, spec, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yields the rows of a catalogue table as pyarrow Tables of at most chunk_size rows."""
+    if spec.resolve:
+        yield from _object_chunks(connection, spec, chunk_size)
+        return
+    for oracle_df in connection.fetch_df_batches(export_query(spec), size=chunk_size):
+        yield pyarrow.table(oracle_df)
+
+
+def _open_writer(fmt, sink, schema):
+    if fmt == "csv":
+        return pyarrow.csv.CSVWriter(sink, schema)
+    return pyarrow.parquet.ParquetWriter(sink, schema)
+
+
+def _stable_schema(schema):
+    """Columns that are all null in the first chunk are written as strings."""
+    return pyarrow.schema([
+        field.with_type(pyarrow.string()) if pyarrow.types.is_null(field.type) else field
+        for field in schema
+    ])
+
+
+def export_table(connection, name, fmt, sink, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Writes the catalogue table `name` to `sink` (a path or binary file object)
+    as CSV or Parquet, one chunk at a time. `progress`, if given, is called with
+    the number of rows written so far after each chunk. Returns an ExportResult.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {', '.join(FORMATS)}")
+    spec = table_browser.TABLES[name]
+    start = time.perf_counter()
+    writer = None
+    schema = None
+    rows = 0
+    try:
+        for chunk in iter_chunks(connection, spec, chunk_size):
+            if writer is None:
+                schema = _stable_schema(chunk.schema)
+                writer = _open_writer(fmt, sink, schema)
+            if not chunk.schema.equals(schema):
+                chunk = chunk.cast(schema)
+            writer.write_table(chunk)
+            rows += chunk.num_rows
+            if progress:
+                progress(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return ExportResult(rows, time.perf_counter() - start)
+
+
+def file_name(name, fmt):
+    return f"{name}{FORMATS[fmt].extension}"
+
+
+# --- Temporary export files of the web app ---
+# Each export is written to its own directory under EXPORT_DIR. The directory is
+# removed as soon as the file has been read for download, when the session
+# exports again, or, for sessions that never download, by the sweep that runs
+# before every export once it is older than EXPORT_MAX_AGE_SECONDS.
+
+def remove_stale_exports(max_age_seconds=db_config.EXPORT_MAX_AGE_SECONDS):
+    """Deletes export directories older than max_age_seconds. Returns how many were removed."""
+    if not os.path.isdir(db_config.EXPORT_DIR):
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(db_config.EXPORT_DIR):
+        try:
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        except FileNotFoundError: # removed by another session meanwhile
+            pass
+    return removed
+
+
+def new_export_path(name, fmt):
+    """Creates a fresh export directory and returns the path of the file to write in it."""
+    os.makedirs(db_config.EXPORT_DIR, exist_ok=True)
+    directory = tempfile.mkdtemp(prefix="export_", dir=db_config.EXPORT_DIR)
+    return os.path.join(directory, file_name(name, fmt))
+
+
+def discard_export(path):
+    """Removes an export file and its directory; missing files are ignored."""
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+def read_export(path):
+    """Returns the bytes of an export file and removes it, so it is served once."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        discard_export(path)
@@ -0,0 +1,106 @@
+# webapp/team_deliveries.py
+from collections import namedtuple
+from datetime import date
+import db_config
+import data_access
+
+# --- Deliveries of the teams coordinated by a chief officer ---
+# One statement returns both the per-team, per-status order counts and one
+# keyset page of orders. Both branches walk chief -> teams -> orders through
+# REF joins, so they use IdxLogTeamChief and the (ByLogisticTeam, DeliveryStatus,
+# ExpectedDeliveryDate) index; the counts never leave the database, and only a
+# page of orders is fetched however long the team's history is. BatchOrder, not
+# the OrderLine reporting table, is the source: an order without order lines
+# (no batches, or batches changed by nested-table DML that the reporting
+# triggers do not see) must still be listed and counted.
+
+STATUSES = ["Pending", "In Transit", "Delivered", "Cancelled", "Problem"]
+
+DeliveriesPage = namedtuple("DeliveriesPage", ["teams", "counts", "frame", "has_next", "last_key"])
+
+# Teams of the chief and their orders with an expected delivery in [date_from, date_to)
+TEAM_ORDERS = """
+        FROM ChiefOfficier c
+        JOIN LogisticTeam t ON t.TeamChief = REF(c)
+        {join} BatchOrder bo ON bo.ByLogisticTeam = REF(t)
+             AND bo.ExpectedDeliveryDate >= :date_from AND bo.ExpectedDeliveryDate < :date_to
+        WHERE c.TaxCode = :taxcode
+"""
+
+DELIVERIES_PAGE_SQL = f"""
+    SELECT 'COUNT' AS RowKind, t.TeamCode, t.TeamName, bo.DeliveryStatus, COUNT(bo.DeliveryStatus) AS Orders,
+           CAST(NULL AS NUMBER) AS OrderID, CAST(NULL AS DATE) AS OrderDate,
+           CAST(NULL AS DATE) AS ExpectedDeliveryDate, CAST(NULL AS VARCHAR2(10)) AS CustomerCode
+    {TEAM_ORDERS.format(join="LEFT JOIN")}
+    GROUP BY t.TeamCode, t.TeamName, bo.DeliveryStatus
+    UNION ALL
+    SELECT * FROM (
+        -- The customer REF is only dereferenced for the rows of the page
+        SELECT 'ORDER', p.TeamCode, p.TeamName, p.DeliveryStatus, NULL,
+               p.OrderID, p.OrderDate, p.ExpectedDeliveryDate, DEREF(p.ByCustomer).CustomerCode
+        FROM (
+            SELECT t.TeamCode, t.TeamName, bo.DeliveryStatus,
+                   bo.OrderID, bo.OrderDate, bo.ExpectedDeliveryDate, bo.ByCustomer
+            {TEAM_ORDERS.format(join="JOIN")}
+              AND bo.OrderID > :after
+              AND (:status IS NULL OR bo.DeliveryStatus = :status)
+            ORDER BY bo.OrderID
+            FETCH FIRST :page_rows ROWS ONLY
+        ) p
+        ORDER BY p.OrderID
+    )
+"""
+
+ORDER_COLUMNS = {
+    "ORDERID": "OrderID",
+    "ORDERDATE": "Order Date",
+    "EXPECTEDDELIVERYDATE": "Expected Delivery",
+    "DELIVERYSTATUS": "Status",
+    "CUSTOMERCODE": "Customer",
+    "TEAMCODE": "Team",
+}
+
+
+def deliveries_binds(taxcode, status=None, date_from=None, date_to=None,
+                     after=0, page_size=db_config.TABLE_PAGE_SIZE):
+    """Bind values of DELIVERIES_PAGE_SQL; one extra row is requested to detect a next page."""
+    return {
+        'taxcode': taxcode,
+        'date_from': date_from or date.min,
+        'date_to': date_to or date.max,
+        'after': after,
+        'status': status,
+        'page_rows': page_size + 1,
+    }
+
+
+def page_from_frame(frame, page_size=db_config.TABLE_PAGE_SIZE):
+    """Splits the rows of DELIVERIES_PAGE_SQL into a DeliveriesPage."""
+    count_rows = frame[frame["ROWKIND"] == "COUNT"]
+    teams = dict(zip(count_rows["TEAMCODE"], count_rows["TEAMNAME"]))
+    counts = (
+        count_rows.dropna(subset=["DELIVERYSTATUS"])
+        .groupby("DELIVERYSTATUS")["ORDERS"].sum()
+        .reindex(STATUSES, fill_value=0)
+    )
+    orders = frame[frame["ROWKIND"] == "ORDER"][list(ORDER_COLUMNS)].rename(columns=ORDER_COLUMNS)
+    has_next = len(orders) > page_size
+    orders = orders.head(page_size).reset_index(drop=True)
+    last_key = int(orders["OrderID"].iloc[-1]) if len(orders) else None
+    return DeliveriesPage(teams, counts, orders, has_next, last_key)
+
+
+def fetch_deliveries(connection, taxcode, status=None, date_from=None, date_to=None,
+                     after=0, page_size=db_config.TABLE_PAGE_SIZE):
+    """
+    Fetches the chief's teams, their order counts per status and one page of
+    orders (OrderID > after, optionally of one status) in a single round trip.
+    The date range bounds ExpectedDeliveryDate and applies to the counts as well.
+    """
+    frame = data_access.fetch_dataframe(
+        connection,
+        DELIVERIES_PAGE_SQL,
+        deliveries_binds(taxcode, status, date_from, date_to, after, page_size),
+        arraysize=page_size + 1,
+    )
+    return page_from_frame(frame, page_size)
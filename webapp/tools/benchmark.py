@@ -0,0 +1,285 @@
+# webapp/tools/benchmark.py
+"""
+Benchmarks the SQL and DML of every page against the connected database and
+compares the results with a JSON baseline.
+
+Run from the webapp directory:
+    python -m tools.benchmark --label 1x --save           # record a baseline
+    python -m tools.benchmark --label 1x                  # compare, exit 1 on regression
+    python -m tools.benchmark --generate --scales 1 10 100 --save
+
+With --generate the database (demo data only) is topped up with
+tools.generate_data before each scale, so each label is measured on
+demo data plus N scale units. DML scenarios are rolled back.
+"""
+import argparse
+import json
+import math
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+import oracledb
+import db_config
+import lookups
+import table_browser
+import bulk_ingest
+import sql_catalogue
+import expiry_sweep
+import expiry_forecast
+import auto_assign
+import route_planner
+import team_deliveries
+from tools import generate_data
+
+Scenario = namedtuple("Scenario", ["name", "run"])
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+
+# --- Inputs shared by the scenarios, picked once per run ---
+
+Inputs = namedtuple(
+    "Inputs",
+    ["center", "serial_no", "customer", "batch_ids", "order_id", "team_code", "chief_taxcode"],
+)
+
+
+def pick_inputs(connection):
+    """Chooses deterministic keys for the page scenarios from the current data."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT dc.CenterName, p.SerialNo
+            FROM DistributionCenter dc, TABLE(dc.ListOfProducts) lp, Product p
+            WHERE lp.COLUMN_VALUE = REF(p) AND p.ExpiryDate >= TRUNC(SYSDATE)
+              AND EXISTS (SELECT 1 FROM ProductBatch pb WHERE pb.ByDistCenter = REF(dc))
+            ORDER BY dc.CenterName, p.SerialNo
+            FETCH FIRST 1 ROW ONLY
+            """
+        )
+        center, serial_no = cursor.fetchone()
+        cursor.execute("SELECT MIN(CustomerCode) FROM Customer")
+        customer = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            SELECT pb.BatchID FROM ProductBatch pb
+            WHERE pb.ByDistCenter = (SELECT REF(dc) FROM DistributionCenter dc WHERE dc.CenterName = :center)
+            ORDER BY pb.BatchID FETCH FIRST 3 ROWS ONLY
+            """,
+            {'center': center}
+        )
+        batch_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            """
+            SELECT NVL(
+                MIN(CASE WHEN DeliveryStatus = 'Pending' AND ByLogisticTeam IS NULL THEN OrderID END),
+                MIN(OrderID)
+            ) FROM BatchOrder
+            """
+        )
+        order_id = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            SELECT lt.TeamCode, DEREF(lt.TeamChief).TaxCode
+            FROM LogisticTeam lt ORDER BY lt.TeamCode FETCH FIRST 1 ROW ONLY
+            """
+        )
+        team_code, chief_taxcode = cursor.fetchone()
+    return Inputs(center, serial_no, customer, batch_ids, order_id, team_code, chief_taxcode)
+
+
+# --- Page scenarios: run(connection, inputs) -> rows processed ---
+
+def _fetch_rows(connection, sql, params=None):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params or {})
+        return len(cursor.fetchall())
+
+
+def _dml(connection, sql, params):
+    """Runs one DML statement and rolls it back."""
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.rowcount
+    connection.rollback()
+    return rows
+
+
+def _table_scenario(name):
+    spec = table_browser.TABLES[name]
+
+    def run(connection, inputs):
+        return len(table_browser.fetch_page(connection, spec, spec.columns[0]).frame)
+    return Scenario(f"tables.{name}", run)
+
+
+def _batch_lookup(connection, order_id=None):
+    sql, params = lookups._batch_lookup_query(order_id)
+    return _fetch_rows(connection, sql, params)
+
+
+def _place_order(connection, inputs):
+    insert_sql, batch_binds = sql_catalogue.with_in_list(
+        sql_catalogue.INSERT_ORDER, inputs.batch_ids, prefix="batch"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            insert_sql,
+            {
+                'order_date': date.today(),
+                'expected_delivery': date.today() + timedelta(days=2),
+                'status': 'Pending',
+                'customer': inputs.customer,
+                'order_id': cursor.var(oracledb.NUMBER),
+                **batch_binds,
+            },
+        )
+        rows = cursor.rowcount
+    connection.rollback()
+    return rows
+
+
+def _team_deliveries(connection, inputs):
+    return len(team_deliveries.fetch_deliveries(connection, inputs.chief_taxcode).frame)
+
+
+SCENARIOS = [_table_scenario(name) for name in table_browser.TABLES] + [
+    Scenario("register_batch.centers", lambda c, i: _fetch_rows(c, sql_catalogue.CENTER_NAMES)),
+    Scenario("register_batch.center_products", lambda c, i: _fetch_rows(
+        c, sql_catalogue.CENTER_PRODUCTS, {'center': i.center})),
+    Scenario("register_batch.insert", lambda c, i: _dml(
+        c, bulk_ingest.INSERT_BATCH_SQL,
+        {'serial_no': i.serial_no, 'quantity': 10, 'arrival_date': date.today(), 'center': i.center})),
+    Scenario("place_order.customers", lambda c, i: _fetch_rows(c, sql_catalogue.CUSTOMER_CODES)),
+    Scenario("place_order.batch_lookup", lambda c, i: _batch_lookup(c)),
+    Scenario("place_order.insert", _place_order),
+    Scenario("assign_delivery.pending_orders", lambda c, i: _fetch_rows(c, sql_catalogue.PENDING_ORDERS)),
+    Scenario("assign_delivery.order_batches", lambda c, i: _batch_lookup(c, order_id=i.order_id)),
+    Scenario("assign_delivery.auto_plan", lambda c, i: len(
+        auto_assign.plan_assignments(auto_assign.load_candidates(c))[0])),
+    Scenario("assign_delivery.update", lambda c, i: _dml(
+        c, sql_catalogue.ASSIGN_TEAM, {'team_code': i.team_code, 'order_id': i.order_id})),
+    Scenario("team_deliveries.chiefs", lambda c, i: _fetch_rows(c, sql_catalogue.CHIEFS_WITH_TEAMS)),
+    Scenario("team_deliveries.deliveries", _team_deliveries),
+    Scenario("team_deliveries.routes", lambda c, i: sum(
+        trip.orders for trip in route_planner.plan_routes(route_planner.load_open_orders(c, [i.team_code]))[0])),
+    Scenario("expired_batches.list", lambda c, i: len(expiry_sweep.load_quarantine_frame(c))),
+    Scenario("expiring_soon.full_refresh", lambda c, i: len(expiry_forecast.ExpiryForecast(
+        db_config.FORECAST_HORIZON_DAYS, db_config.FORECAST_FULL_REFRESH_SECONDS).refresh(c))),
+]
+
+
+# --- Measurement ---
+
+def measure(connection, scenario, inputs, warmup, repeat):
+    """Runs a scenario warmup + repeat times and returns its latency and throughput figures."""
+    for _ in range(warmup):
+        scenario.run(connection, inputs)
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows += scenario.run(connection, inputs)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    total = sum(timings)
+    return {
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "p95_ms": timings[min(len(timings) - 1, math.ceil(0.95 * len(timings)) - 1)] * 1000,
+        "mean_ms": total / len(timings) * 1000,
+        "rows": rows // repeat,
+        "rows_per_s": rows / total if total else 0.0,
+    }
+
+
+def run_suite(connection, scenarios, warmup, repeat):
+    inputs = pick_inputs(connection)
+    results = {}
+    print(f"{'scenario':<36} {'p50 ms':>9} {'p95 ms':>9} {'rows':>8} {'rows/s':>11}")
+    for scenario in scenarios:
+        result = measure(connection, scenario, inputs, warmup, repeat)
+        results[scenario.name] = result
+        print(
+            f"{scenario.name:<36} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+            f"{result['rows']:>8} {result['rows_per_s']:>11,.0f}"
+        )
+    return results
+
+
+def compare(label, results, baseline, threshold, min_delta_ms):
+    """Returns the scenarios whose p50 regressed by more than threshold (and min_delta_ms)."""
+    previous = baseline.get(label, {}).get("scenarios", {})
+    regressions = []
+    for name, result in results.items():
+        before = previous.get(name)
+        if before is None:
+            continue
+        delta = result["p50_ms"] - before["p50_ms"]
+        if delta > min_delta_ms and result["p50_ms"] > before["p50_ms"] * (1 + threshold):
+            regressions.append((name, before["p50_ms"], result["p50_ms"]))
+    return regressions
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--label", default="current", help="baseline entry for the current data (without --generate)")
+    parser.add_argument("--generate", action="store_true", help="grow the data with tools.generate_data before each scale")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results to the baseline file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p50 slowdown (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--only", nargs="+", help="scenario name prefixes to run")
+    args = parser.parse_args()
+
+    scenarios = SCENARIOS
+    if args.only:
+        scenarios = [s for s in SCENARIOS if s.name.startswith(tuple(args.only))]
+    baseline = load_baseline(args.baseline)
+    failed = False
+
+    with oracledb.connect(
+        user=db_config.DB_USER,
+        password=db_config.DB_PASSWORD,
+        **db_config.connect_params()
+    ) as connection:
+        runs = [(args.label, 0)]
+        if args.generate:
+            loaded = 0
+            runs = []
+            for scale in args.scales:
+                runs.append((f"{scale:g}x", scale - loaded))
+                loaded = scale
+
+        for run_index, (label, top_up) in enumerate(runs):
+            if top_up > 0:
+                print(f"\nGrowing the dataset by {top_up:g} scale units for {label}...")
+                generate_data.generate(connection, top_up, seed=args.seed + run_index)
+            print(f"\n== {label} ==")
+            results = run_suite(connection, scenarios, args.warmup, args.repeat)
+            for name, before, after in compare(label, results, baseline, args.threshold, args.min_delta_ms):
+                print(f"REGRESSION {label} {name}: p50 {before:.2f} ms -> {after:.2f} ms")
+                failed = True
+            if args.save:
+                baseline[label] = {"recorded_at": datetime.now().isoformat(timespec="seconds"), "scenarios": results}
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# webapp/tools/explain_plans.py
+"""
+Explains every statement of the SQL catalogue (sql_catalogue.statements())
+and checks the plans for regressions.
+
+For each statement the tool runs EXPLAIN PLAN, flags full table scans and
+Cartesian joins, reports which indexes of scripts/03_indexes.sql no plan
+uses, and diffs the plan shapes against a JSON baseline.
+
+Run from the webapp directory:
+    python -m tools.explain_plans --save          # record the baseline
+    python -m tools.explain_plans                 # compare, exit 1 on regression
+    python -m tools.explain_plans --only tables. --verbose
+
+EXPLAIN PLAN does not peek at bind values or types (binds are assumed to be
+VARCHAR2), so a plan can differ from the one chosen at run time; compare
+with V$SQL_PLAN when in doubt. RETURNING ... INTO clauses are stripped
+before explaining. Plans are compared on operations and objects only,
+costs and cardinalities are reported but not diffed.
+"""
+import argparse
+import difflib
+import json
+import re
+import sys
+from pathlib import Path
+import oracledb
+import db_config
+import sql_catalogue
+
+DEFAULT_BASELINE = "plan_baseline.json"
+INDEX_SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "03_indexes.sql"
+STATEMENT_ID = "MEDTECH_EXPLAIN"
+
+RETURNING_CLAUSE = re.compile(r"\s+RETURNING\s+.+?\s+INTO\s+:\w+(\s*,\s*:\w+)*\s*$", re.IGNORECASE | re.DOTALL)
+INDEX_DEFINITION = re.compile(r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)", re.IGNORECASE)
+
+PLAN_SQL = """
+    SELECT id, parent_id, depth, operation, options, object_name, object_type, cost, cardinality
+    FROM PLAN_TABLE
+    WHERE statement_id = :statement_id
+    ORDER BY id
+"""
+
+
+def schema_indexes(path=INDEX_SCRIPT):
+    """Returns {INDEX_NAME: TABLE_NAME} for the indexes created by the schema scripts."""
+    text = Path(path).read_text()
+    return {index.upper(): table.upper() for index, table in INDEX_DEFINITION.findall(text)}
+
+
+def explain(cursor, sql, verbose=False):
+    """
+    Explains one statement. Returns (plan rows as dicts, DBMS_XPLAN text or None).
+    """
+    cursor.execute("DELETE FROM PLAN_TABLE WHERE statement_id = :statement_id", {'statement_id': STATEMENT_ID})
+    statement = RETURNING_CLAUSE.sub("", sql.strip())
+    cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{STATEMENT_ID}' INTO PLAN_TABLE FOR {statement}")
+    cursor.execute(PLAN_SQL, {'statement_id': STATEMENT_ID})
+    columns = [col[0].lower() for col in cursor.description]
+    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    text = None
+    if verbose:
+        cursor.execute(
+            "SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY('PLAN_TABLE', :statement_id, 'TYPICAL'))",
+            {'statement_id': STATEMENT_ID}
+        )
+        text = "\n".join(row[0] or "" for row in cursor.fetchall())
+    return rows, text
+
+
+def signature(rows):
+    """Plan shape as indented lines: operation, options and object, without costs."""
+    return [
+        "  " * (row["depth"] or 0)
+        + " ".join(part for part in (row["operation"], row["options"], row["object_name"]) if part)
+        for row in rows
+    ]
+
+
+def findings(rows):
+    """Flags full table scans and Cartesian joins in a plan."""
+    flagged = []
+    for row in rows:
+        if row["operation"] == "TABLE ACCESS" and row["options"] == "FULL":
+            flagged.append(f"full scan of {row['object_name']}")
+        elif row["operation"] == "MERGE JOIN" and row["options"] == "CARTESIAN":
+            flagged.append("Cartesian join")
+    return flagged
+
+
+def used_indexes(rows):
+    return {row["object_name"] for row in rows if (row["operation"] or "").startswith("INDEX") and row["object_name"]}
+
+
+def explain_catalogue(connection, catalogue, verbose=False):
+    """Returns {name: {"plan", "findings", "cost", "indexes"[, "error"]}} for the given statements."""
+    results = {}
+    with connection.cursor() as cursor:
+        for name, sql in catalogue.items():
+            try:
+                rows, text = explain(cursor, sql, verbose)
+            except oracledb.Error as e:
+                error_obj, = e.args
+                results[name] = {"plan": [], "findings": [], "cost": None, "indexes": [], "error": error_obj.message}
+                continue
+            results[name] = {
+                "plan": signature(rows),
+                "findings": findings(rows),
+                "cost": rows[0]["cost"] if rows else None,
+                "indexes": sorted(used_indexes(rows)),
+            }
+            if text:
+                results[name]["text"] = text
+    connection.rollback()
+    return results
+
+
+def compare(baseline, current):
+    """
+    Compares plans with the baseline.
+    Returns (regressions, notes): regressions are plan changes and new findings.
+    """
+    regressions, notes = [], []
+    for name, result in current.items():
+        if "error" in result:
+            continue
+        if name not in baseline:
+            notes.append(f"{name}: not in baseline")
+            continue
+        old = baseline[name]
+        if old["plan"] != result["plan"]:
+            diff = difflib.unified_diff(
+                old["plan"], result["plan"],
+                fromfile=f"{name} (baseline)", tofile=f"{name} (current)", lineterm=""
+            )
+            regressions.append(f"{name}: plan changed\n" + "\n".join(diff))
+        new_findings = sorted(set(result["findings"]) - set(old["findings"]))
+        if new_findings:
+            regressions.append(f"{name}: new {', '.join(new_findings)}")
+    for name in baseline.keys() - current.keys():
+        notes.append(f"{name}: no longer in the catalogue")
+    return regressions, notes
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="write the current plans as the baseline")
+    parser.add_argument("--only", help="only explain statements whose name starts with this prefix")
+    parser.add_argument("--in-list-size", type=int, default=4, help="binds used for IN-list templates")
+    parser.add_argument("--verbose", action="store_true", help="print the DBMS_XPLAN output of each plan")
+    args = parser.parse_args()
+
+    catalogue = sql_catalogue.statements(args.in_list_size)
+    if args.only:
+        catalogue = {name: sql for name, sql in catalogue.items() if name.startswith(args.only)}
+
+    with oracledb.connect(
+        user=db_config.DB_USER,
+        password=db_config.DB_PASSWORD,
+        **db_config.connect_params()
+    ) as connection:
+        current = explain_catalogue(connection, catalogue, args.verbose)
+
+    print(f"{'statement':<34} {'cost':>8}  findings")
+    for name, result in current.items():
+        cost = "-" if result["cost"] is None else result["cost"]
+        print(f"{name:<34} {cost:>8}  {result.get('error') or ', '.join(result['findings'])}")
+        if "text" in result:
+            print(result["text"] + "\n")
+
+    indexes = schema_indexes()
+    used = set().union(*(result["indexes"] for result in current.values()))
+    unused = sorted(name for name in indexes if name not in used)
+    if unused and not args.only:
+        print("\nIndexes not used by any plan:")
+        for name in unused:
+            print(f"  {name} ON {indexes[name]}")
+
+    if args.save:
+        saved = {
+            name: {"plan": result["plan"], "findings": result["findings"]}
+            for name, result in current.items() if "error" not in result
+        }
+        baseline = load_baseline(args.baseline)
+        baseline.update(saved)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nSaved {len(saved)} plans to {args.baseline}")
+        return
+
+    regressions, notes = compare(load_baseline(args.baseline), current)
+    for note in notes:
+        print(note)
+    errors = [f"{name}: {result['error']}" for name, result in current.items() if "error" in result]
+    for line in errors + regressions:
+        print(line)
+    if errors or regressions:
+        sys.exit(1)
+    print("\nNo plan regressions.")
+
+
+if __name__ == "__main__":
+    main()
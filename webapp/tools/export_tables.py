@@ -0,0 +1,78 @@
+# webapp/tools/export_tables.py
+"""
+Exports Tables Overview queries to CSV or Parquet files, streaming the rows in
+chunks so memory use stays flat whatever the table size.
+
+Run from the webapp directory:
+    python -m tools.export_tables --list
+    python -m tools.export_tables batch_orders product_batches complaints --format parquet --out exports
+    python -m tools.export_tables --all --format csv --chunk-size 50000
+
+Each table is written to <out>/<table><extension>. Progress is reported
+against the optimizer's row count estimate, so it is approximate.
+"""
+import argparse
+import sys
+from pathlib import Path
+import oracledb
+import db_config
+import table_browser
+import table_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tables", nargs="*", help="catalogue table names (see --list)")
+    parser.add_argument("--all", action="store_true", help="export every catalogue table")
+    parser.add_argument("--list", action="store_true", help="list the exportable tables and exit")
+    parser.add_argument("--format", choices=list(table_export.FORMATS), default="csv")
+    parser.add_argument("--out", default=".", help="output directory")
+    parser.add_argument("--chunk-size", type=int, default=table_export.DEFAULT_CHUNK_SIZE, help="rows per fetch")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, spec in table_browser.TABLES.items():
+            print(f"{name:<22} {spec.title}")
+        return
+    names = list(table_browser.TABLES) if args.all else args.tables
+    unknown = [name for name in names if name not in table_browser.TABLES]
+    if not names or unknown:
+        parser.error(f"unknown tables: {', '.join(unknown)}" if unknown else "name tables to export or use --all")
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    failed = False
+    with oracledb.connect(
+        user=db_config.DB_USER,
+        password=db_config.DB_PASSWORD,
+        **db_config.connect_params()
+    ) as connection:
+        for name in names:
+            path = out_dir / table_export.file_name(name, args.format)
+            estimate = table_browser.estimate_rows(connection, table_browser.TABLES[name])
+
+            def progress(rows, name=name, estimate=estimate):
+                total = f"/~{estimate:,}" if estimate else ""
+                print(f"\r{name:<22} {rows:>12,}{total} rows", end="", flush=True)
+
+            try:
+                result = table_export.export_table(
+                    connection, name, args.format, str(path), args.chunk_size, progress
+                )
+            except oracledb.Error as e:
+                error_obj, = e.args
+                print(f"\r{name:<22} failed: {error_obj.message}")
+                failed = True
+                continue
+            if result.rows:
+                rate = result.rows / result.elapsed if result.elapsed else 0
+                print(f"\r{name:<22} {result.rows:>12,} rows in {result.elapsed:.1f}s "
+                      f"({rate:,.0f} rows/s) -> {path}")
+            else:
+                print(f"\r{name:<22} is empty, no file written")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,586 @@
+# webapp/tools/generate_data.py
+"""
+Generates a synthetic MedTech dataset of configurable size and loads it with
+array DML from parallel workers.
+
+Run from the webapp directory:
+    python -m tools.generate_data --scale 10 --workers 4 --seed 7
+
+--scale 1 loads 100,000 product batches and 100,000 orders; counts of every
+table grow linearly with the scale. Generated rows get keys above the existing
+ones and only reference other generated rows, so the demo data is kept.
+Customers and teams are picked with a Zipf-like skew (--skew, 0 = uniform).
+The same seed and scale always produce the same dataset, whatever --workers is.
+
+TrgProductBatchChecks is disabled during the load, since historical batches
+arrive in the past, and so are the reporting sync triggers; they are re-enabled
+afterwards and the reporting tables are rebuilt once.
+"""
+import argparse
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+import numpy as np
+import oracledb
+import db_config
+
+# Rows per table at --scale 1
+BASE_COUNTS = {
+    "Product": 1000,
+    "Department": 50,
+    "Customer": 2000,
+    "TeamMember": 800,
+    "LogisticTeam": 100, # One chief officer per team
+    "DistributionCenter": 100,
+    "ProductBatch": 100_000,
+    "BatchOrder": 100_000,
+    "Complaint": 5_000,
+}
+
+# Largest key allowed by the column types (CustomerCode is VARCHAR2(10): 'CUST' + 6 digits)
+KEY_LIMITS = {"Customer": 999_999}
+
+CATEGORIES = np.array(["Medical Equipment", "Supplies", "Consumables"])
+STATUSES = np.array(["Delivered", "In Transit", "Pending", "Cancelled", "Problem"])
+STATUS_WEIGHTS = [0.55, 0.15, 0.15, 0.08, 0.07]
+COMPLAINT_TYPES = np.array(["Delivery Delay", "Missing Items", "Damaged Goods", "Other"])
+
+# Current largest key of each table; generated keys start right after it
+KEY_QUERIES = {
+    "Product": "SELECT NVL(MAX(SerialNo), 0) FROM Product",
+    "Department": "SELECT NVL(MAX(DepartmentID), 0) FROM Department",
+    "Customer": "SELECT NVL(MAX(TO_NUMBER(REGEXP_SUBSTR(CustomerCode, '[0-9]+$'))), 0) FROM Customer",
+    "TeamMember": "SELECT NVL(MAX(TaxCode), 0) FROM TeamMember",
+    "LogisticTeam": "SELECT NVL(MAX(TeamCode), 0) FROM LogisticTeam",
+    "DistributionCenter": "SELECT NVL(MAX(TO_NUMBER(REGEXP_SUBSTR(CenterName, '[0-9]+'))), 0) FROM DistributionCenter",
+    "ProductBatch": "SELECT NVL(MAX(BatchID), 0) FROM ProductBatch",
+    "BatchOrder": "SELECT NVL(MAX(OrderID), 0) FROM BatchOrder",
+    "Complaint": "SELECT NVL(MAX(TicketID), 0) FROM Complaint",
+}
+
+# Sequences moved past the generated keys, so rows inserted by the app do not collide
+SEQUENCES = {
+    "Product": "product_serial_seq",
+    "Department": "department_id_seq",
+    "Customer": "customer_id_seq",
+    "TeamMember": "person_tax_code_seq",
+    "LogisticTeam": "logistic_team_id_seq",
+    "DistributionCenter": "distribution_center_id_seq",
+    "ProductBatch": "product_batch_id_seq",
+    "BatchOrder": "batch_order_id_seq",
+    "Complaint": "complaint_ticket_id_seq",
+}
+
+# Disabled while loading: batch validation (historical batches arrive in the
+# past) and the per-statement reporting sync, replaced by one RebuildReporting
+LOAD_DISABLED_TRIGGERS = [
+    "TrgProductBatchChecks",
+    "TrgBatchFactSync",
+    "TrgOrderLineSync",
+    "TrgComplaintFactSync",
+]
+
+# Nested tables are filled with one array insert per element:
+# INSERT INTO TABLE(<parent collection>) VALUES (<REF subquery>)
+Step = namedtuple("Step", ["table", "insert_sql", "nested_sql", "build"])
+StepResult = namedtuple("StepResult", ["table", "rows", "nested_rows", "elapsed"])
+
+
+# --- Helpers ---
+
+def chunk_rng(seed, step_index, chunk_index):
+    """Independent random stream per (table, chunk), so results do not depend on scheduling."""
+    return np.random.default_rng([seed, step_index, chunk_index])
+
+
+def days_ago(offsets):
+    """Converts an array of day offsets (positive = past) to datetime.date objects."""
+    today = np.datetime64(date.today(), "D")
+    return (today - offsets.astype("timedelta64[D]")).astype(object)
+
+
+def skewed_weights(n, skew):
+    """Zipf-like probabilities for n ranked items (uniform when skew is 0)."""
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    return weights / weights.sum()
+
+
+def pick(rng, keys, size, weights=None):
+    """Picks `size` keys; `weights` are per-key probabilities (None = uniform)."""
+    if weights is None:
+        return keys[rng.integers(0, len(keys), size)]
+    return rng.choice(keys, size=size, p=weights)
+
+
+class Context:
+    """Key ranges of the generated rows and the fixed choices shared by several tables."""
+
+    def __init__(self, offsets, counts, seed, skew):
+        self.keys = {
+            table: np.arange(offsets[table] + 1, offsets[table] + 1 + counts[table])
+            for table in counts
+        }
+        rng = np.random.default_rng([seed, 0])
+        # Chief officers are the first generated members, one per team
+        teams = counts["LogisticTeam"]
+        self.chiefs = self.keys["TeamMember"][:teams]
+        self.crew = self.keys["TeamMember"][teams:]
+        # Popular customers and teams are spread over the key range, not the lowest keys
+        self.customer_weights = rng.permutation(skewed_weights(counts["Customer"], skew))
+        self.team_weights = rng.permutation(skewed_weights(teams, skew))
+        self.center_weights = rng.permutation(skewed_weights(counts["DistributionCenter"], skew / 2))
+        # Products stocked by each center; batches are only created for stocked products
+        products = self.keys["Product"]
+        self.center_products = [
+            rng.choice(products, size=min(len(products), rng.integers(10, 31)), replace=False)
+            for _ in range(counts["DistributionCenter"])
+        ]
+
+
+# --- Row builders: (rng, keys of the chunk, context) -> (rows, nested rows) ---
+
+def build_products(rng, keys, ctx):
+    n = len(keys)
+    # About 10% of the products are already expired
+    expired = rng.random(n) < 0.10
+    offsets = np.where(expired, rng.integers(1, 366, n), -rng.integers(1, 5 * 365, n))
+    categories = CATEGORIES[rng.integers(0, len(CATEGORIES), n)]
+    expiry = days_ago(offsets)
+    rows = [
+        {'serial_no': int(k), 'category': c, 'expiry_date': e}
+        for k, c, e in zip(keys, categories, expiry)
+    ]
+    return rows, []
+
+
+def build_departments(rng, keys, ctx):
+    rows, nested = [], []
+    for k in keys:
+        k = int(k)
+        rows.append({
+            'department_id': k,
+            'mobile': 3_000_000_000 + k,
+            'office': 4_000_000_000 + k,
+            'email': f"dept{k}@medtech.com",
+            'fax': f"fax{k:04d}",
+        })
+        for serial_no in rng.choice(ctx.keys["Product"], size=rng.integers(5, 16)):
+            nested.append({'department_id': k, 'serial_no': int(serial_no)})
+    return rows, nested
+
+
+def build_customers(rng, keys, ctx):
+    rows, nested = [], []
+    departments = ctx.keys["Department"]
+    for k in keys:
+        k = int(k)
+        code = f"CUST{k:03d}"
+        rows.append({
+            'customer_code': code,
+            'city': f"City {k % 50}",
+            'street': f"Street {k}",
+            'street_no': str(k % 200 + 1),
+            'zip_code': 10000 + k % 89999,
+        })
+        for department_id in rng.choice(departments, size=min(len(departments), rng.integers(1, 4)), replace=False):
+            nested.append({'customer_code': code, 'department_id': int(department_id)})
+    return rows, nested
+
+
+def build_team_members(rng, keys, ctx):
+    n = len(keys)
+    age_days = rng.integers(25 * 365, 60 * 365, n)
+    # Employed for at least a year, and at 20 or older
+    employed_days = np.minimum(rng.integers(365, 30 * 365, n), age_days - 20 * 365)
+    birth = days_ago(age_days)
+    employment = days_ago(employed_days)
+    rows = [
+        {
+            'tax_code': int(k),
+            'name': f"MemberName{int(k):06d}",
+            'surname': f"Surname{int(k):06d}",
+            'birth_date': b,
+            'employment_date': e,
+        }
+        for k, b, e in zip(keys, birth, employment)
+    ]
+    return rows, []
+
+
+def build_teams(rng, keys, ctx):
+    rows, nested = [], []
+    first = ctx.keys["LogisticTeam"][0]
+    for k in keys:
+        k = int(k)
+        rows.append({
+            'team_code': k,
+            'team_name': f"LogTeam {k:02d}",
+            'chief_tax_code': int(ctx.chiefs[k - first]),
+            'chief_days': int(rng.integers(30, 10 * 365)),
+        })
+        for tax_code in rng.choice(ctx.crew, size=rng.integers(3, 8), replace=False):
+            nested.append({'team_code': k, 'tax_code': int(tax_code)})
+    return rows, nested
+
+
+def build_centers(rng, keys, ctx):
+    rows, nested = [], []
+    first = ctx.keys["DistributionCenter"][0]
+    for k in keys:
+        k = int(k)
+        name = f"DC_{k:02d}_HQ"
+        rows.append({
+            'center_name': name,
+            'city': f"City_DC_{k % 20}",
+            'street': f"Street_DC_{k}",
+            'street_no': str(k % 20 + 1),
+            'zip_code': 50000 + k % 49999,
+            'team_code': int(pick(rng, ctx.keys["LogisticTeam"], 1, ctx.team_weights)[0]),
+        })
+        for serial_no in ctx.center_products[k - first]:
+            nested.append({'center_name': name, 'serial_no': int(serial_no)})
+    return rows, nested
+
+
+def build_batches(rng, keys, ctx):
+    n = len(keys)
+    first = ctx.keys["DistributionCenter"][0]
+    centers = pick(rng, ctx.keys["DistributionCenter"], n, ctx.center_weights)
+    quantities = rng.integers(10, 500, n)
+    arrival = days_ago(rng.integers(0, 2 * 365, n))
+    rows = []
+    for k, center, quantity, arrived in zip(keys, centers, quantities, arrival):
+        stocked = ctx.center_products[center - first]
+        rows.append({
+            'batch_id': int(k),
+            'serial_no': int(stocked[rng.integers(0, len(stocked))]),
+            'quantity': int(quantity),
+            'arrival_date': arrived,
+            'center': f"DC_{int(center):02d}_HQ",
+        })
+    return rows, []
+
+
+def build_orders(rng, keys, ctx):
+    n = len(keys)
+    customers = pick(rng, ctx.keys["Customer"], n, ctx.customer_weights)
+    teams = pick(rng, ctx.keys["LogisticTeam"], n, ctx.team_weights)
+    statuses = STATUSES[rng.choice(len(STATUSES), size=n, p=STATUS_WEIGHTS)]
+    # Part of the pending orders are still waiting for a team
+    unassigned = (statuses == "Pending") & (rng.random(n) < 0.4)
+    order_offsets = rng.integers(0, 2 * 365, n)
+    order_dates = days_ago(order_offsets)
+    expected = days_ago(order_offsets - rng.integers(1, 31, n))
+    batch_counts = rng.integers(1, 6, n)
+    batches = pick(rng, ctx.keys["ProductBatch"], int(batch_counts.sum()))
+    rows, nested = [], []
+    position = 0
+    for i, k in enumerate(keys):
+        k = int(k)
+        rows.append({
+            'order_id': k,
+            'order_date': order_dates[i],
+            'expected_delivery': expected[i],
+            'status': statuses[i],
+            'customer': f"CUST{int(customers[i]):03d}",
+            'team_code': None if unassigned[i] else int(teams[i]),
+        })
+        # An order holds distinct batches
+        for batch_id in np.unique(batches[position:position + batch_counts[i]]):
+            nested.append({'order_id': k, 'batch_id': int(batch_id)})
+        position += batch_counts[i]
+    return rows, nested
+
+
+def build_complaints(rng, keys, ctx):
+    n = len(keys)
+    orders = pick(rng, ctx.keys["BatchOrder"], n)
+    types = COMPLAINT_TYPES[rng.integers(0, len(COMPLAINT_TYPES), n)]
+    delays = rng.integers(0, 30, n)
+    # About half of the complaints are resolved
+    resolved = rng.random(n) < 0.5
+    resolve_days = rng.integers(1, 61, n)
+    rows = [
+        {
+            'ticket_id': int(k),
+            'order_id': int(o),
+            'complaint_type': t,
+            'delay_days': int(d),
+            'resolve_days': int(r) if done else None,
+        }
+        for k, o, t, d, r, done in zip(keys, orders, types, delays, resolve_days, resolved)
+    ]
+    return rows, []
+
+
+STEPS = [
+    Step(
+        "Product",
+        "INSERT INTO Product (SerialNo, ProductCategory, ExpiryDate) VALUES (:serial_no, :category, :expiry_date)",
+        None,
+        build_products,
+    ),
+    Step(
+        "Department",
+        """
+        INSERT INTO Department (DepartmentID, DeptContact, SupplyPreferences)
+        VALUES (:department_id, ContactInfo(PhoneList(:mobile, :office), :email, :fax), PreferencesList())
+        """,
+        """
+        INSERT INTO TABLE(SELECT d.SupplyPreferences FROM Department d WHERE d.DepartmentID = :department_id)
+        VALUES ((SELECT REF(p) FROM Product p WHERE p.SerialNo = :serial_no))
+        """,
+        build_departments,
+    ),
+    Step(
+        "Customer",
+        """
+        INSERT INTO Customer (CustomerCode, CustomerLocation, BelongsToDepts)
+        VALUES (:customer_code, Location(:city, :street, :street_no, :zip_code), DepartmentList())
+        """,
+        """
+        INSERT INTO TABLE(SELECT c.BelongsToDepts FROM Customer c WHERE c.CustomerCode = :customer_code)
+        VALUES ((SELECT REF(d) FROM Department d WHERE d.DepartmentID = :department_id))
+        """,
+        build_customers,
+    ),
+    Step(
+        "TeamMember",
+        """
+        INSERT INTO TeamMember (TaxCode, MemberName, MemberSurname, BirthDate, EmploymentDate)
+        VALUES (:tax_code, :name, :surname, :birth_date, :employment_date)
+        """,
+        None,
+        build_team_members,
+    ),
+    Step(
+        "LogisticTeam",
+        # The chief is promoted first, after its employment date and not in the future
+        """
+        BEGIN
+            INSERT INTO ChiefOfficier (TaxCode, StartDate)
+            SELECT tm.TaxCode, LEAST(tm.EmploymentDate + :chief_days, TRUNC(SYSDATE))
+            FROM TeamMember tm
+            WHERE tm.TaxCode = :chief_tax_code;
+
+            INSERT INTO LogisticTeam (TeamCode, TeamName, TeamChief, TeamMembers, CompletedDeliveries)
+            VALUES (
+                :team_code, :team_name,
+                (SELECT REF(co) FROM ChiefOfficier co WHERE co.TaxCode = :chief_tax_code),
+                MemberList(), 0
+            );
+        END;
+        """,
+        """
+        INSERT INTO TABLE(SELECT lt.TeamMembers FROM LogisticTeam lt WHERE lt.TeamCode = :team_code)
+        VALUES ((SELECT REF(tm) FROM TeamMember tm WHERE tm.TaxCode = :tax_code))
+        """,
+        build_teams,
+    ),
+    Step(
+        "DistributionCenter",
+        """
+        INSERT INTO DistributionCenter (CenterName, CenterLocation, ByTeam, ListOfProducts)
+        VALUES (
+            :center_name,
+            Location(:city, :street, :street_no, :zip_code),
+            (SELECT REF(lt) FROM LogisticTeam lt WHERE lt.TeamCode = :team_code),
+            ProductList()
+        )
+        """,
+        """
+        INSERT INTO TABLE(SELECT dc.ListOfProducts FROM DistributionCenter dc WHERE dc.CenterName = :center_name)
+        VALUES ((SELECT REF(p) FROM Product p WHERE p.SerialNo = :serial_no))
+        """,
+        build_centers,
+    ),
+    Step(
+        "ProductBatch",
+        """
+        INSERT INTO ProductBatch (BatchID, BatchProduct, Quantity, ArrivalDate, ByDistCenter)
+        VALUES (
+            :batch_id,
+            (SELECT REF(p) FROM Product p WHERE p.SerialNo = :serial_no),
+            :quantity,
+            :arrival_date,
+            (SELECT REF(dc) FROM DistributionCenter dc WHERE dc.CenterName = :center)
+        )
+        """,
+        None,
+        build_batches,
+    ),
+    Step(
+        "BatchOrder",
+        """
+        INSERT INTO BatchOrder (
+            OrderID, OrderBatches, OrderDate, ExpectedDeliveryDate,
+            DeliveryStatus, ByCustomer, ByLogisticTeam
+        )
+        VALUES (
+            :order_id, BatchList(), :order_date, :expected_delivery, :status,
+            (SELECT REF(c) FROM Customer c WHERE c.CustomerCode = :customer),
+            (SELECT REF(lt) FROM LogisticTeam lt WHERE lt.TeamCode = :team_code)
+        )
+        """,
+        """
+        INSERT INTO TABLE(SELECT bo.OrderBatches FROM BatchOrder bo WHERE bo.OrderID = :order_id)
+        VALUES ((SELECT REF(pb) FROM ProductBatch pb WHERE pb.BatchID = :batch_id))
+        """,
+        build_orders,
+    ),
+    Step(
+        "Complaint",
+        """
+        INSERT INTO Complaint (TicketID, ByCustomer, OnBatchOrder, ComplaintType, StartDate, EndDate)
+        SELECT
+            :ticket_id, bo.ByCustomer, REF(bo), :complaint_type,
+            LEAST(bo.ExpectedDeliveryDate + :delay_days, TRUNC(SYSDATE)),
+            LEAST(bo.ExpectedDeliveryDate + :delay_days + :resolve_days, TRUNC(SYSDATE))
+        FROM BatchOrder bo
+        WHERE bo.OrderID = :order_id
+        """,
+        None,
+        build_complaints,
+    ),
+]
+
+
+# --- Loading ---
+
+def load_chunk(pool, step, step_index, chunk_index, keys, ctx, seed):
+    """Builds and inserts one chunk of a table, with its nested rows, in one transaction."""
+    rows, nested = step.build(chunk_rng(seed, step_index, chunk_index), keys, ctx)
+    with pool.acquire() as connection:
+        with connection.cursor() as cursor:
+            cursor.executemany(step.insert_sql, rows)
+            if nested:
+                cursor.executemany(step.nested_sql, nested)
+        connection.commit()
+    return len(rows), len(nested)
+
+
+def load_step(pool, step, step_index, count, ctx, seed, chunk_size, workers):
+    """Loads every chunk of one table with up to `workers` concurrent connections."""
+    keys = ctx.keys[step.table]
+    chunks = [keys[i:i + chunk_size] for i in range(0, count, chunk_size)]
+    rows = nested_rows = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(load_chunk, pool, step, step_index, i, chunk, ctx, seed)
+            for i, chunk in enumerate(chunks)
+        ]
+        for future in as_completed(futures):
+            chunk_rows, chunk_nested = future.result()
+            rows += chunk_rows
+            nested_rows += chunk_nested
+    return StepResult(step.table, rows, nested_rows, time.perf_counter() - start)
+
+
+def finish_load(connection, ctx, gather_stats):
+    """Brings derived data, quarantined batches, reporting tables, sequences and optimizer statistics in line with the new rows."""
+    with connection.cursor() as cursor:
+        teams = ctx.keys["LogisticTeam"]
+        cursor.execute(
+            """
+            UPDATE LogisticTeam lt
+            SET lt.CompletedDeliveries = (
+                SELECT COUNT(*) FROM BatchOrder bo
+                WHERE bo.ByLogisticTeam = REF(lt) AND bo.DeliveryStatus = 'Delivered'
+            )
+            WHERE lt.TeamCode BETWEEN :first_team AND :last_team
+            """,
+            {'first_team': int(teams[0]), 'last_team': int(teams[-1])}
+        )
+        # Generated batches bypass the batch trigger and include products expired long ago
+        cursor.callproc("SweepExpiredBatches", [1])
+        connection.commit()
+        # The reporting sync triggers were off during the load (and nested order
+        # batches never fire them), so the reporting tables are reloaded in bulk
+        cursor.callproc("RebuildReporting")
+        for table, sequence in SEQUENCES.items():
+            next_key = int(ctx.keys[table][-1]) + 1 if len(ctx.keys[table]) else None
+            if next_key is not None:
+                cursor.execute(f"ALTER SEQUENCE {sequence} RESTART START WITH {next_key}")
+        if gather_stats:
+            for table in [step.table for step in STEPS] + ["BatchFact", "OrderLine", "ComplaintFact"]:
+                cursor.callproc("DBMS_STATS.GATHER_TABLE_STATS", [db_config.DB_USER, table.upper()])
+
+
+def generate(connection, scale, seed=42, skew=1.1, workers=4, chunk_size=5000, gather_stats=True):
+    """
+    Adds `scale` units of synthetic data through `connection` (used for setup)
+    and a pool of `workers` loading connections. Prints and returns the StepResults.
+    """
+    counts = {table: max(1, int(n * scale)) for table, n in BASE_COUNTS.items()}
+    counts["TeamMember"] = max(counts["TeamMember"], counts["LogisticTeam"] + 7)
+
+    with connection.cursor() as cursor:
+        offsets = {}
+        for table, sql in KEY_QUERIES.items():
+            cursor.execute(sql)
+            offsets[table] = int(cursor.fetchone()[0])
+    for table, limit in KEY_LIMITS.items():
+        if offsets[table] + counts[table] > limit:
+            raise SystemExit(f"{table}: at most {limit - offsets[table]} more rows fit the key format.")
+
+    ctx = Context(offsets, counts, seed, skew)
+    pool = oracledb.create_pool(
+        user=db_config.DB_USER,
+        password=db_config.DB_PASSWORD,
+        min=workers,
+        max=workers,
+        **db_config.connect_params()
+    )
+    print(f"{'table':<20} {'rows':>10} {'nested':>10} {'seconds':>9} {'rows/s':>10}")
+    results = []
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        for trigger in LOAD_DISABLED_TRIGGERS:
+            cursor.execute(f"ALTER TRIGGER {trigger} DISABLE")
+    try:
+        for step_index, step in enumerate(STEPS, start=1):
+            result = load_step(pool, step, step_index, counts[step.table], ctx, seed, chunk_size, workers)
+            results.append(result)
+            loaded = result.rows + result.nested_rows
+            print(
+                f"{result.table:<20} {result.rows:>10,} {result.nested_rows:>10,} "
+                f"{result.elapsed:>9.2f} {loaded / result.elapsed:>10,.0f}"
+            )
+    finally:
+        with connection.cursor() as cursor:
+            for trigger in LOAD_DISABLED_TRIGGERS:
+                cursor.execute(f"ALTER TRIGGER {trigger} ENABLE")
+        pool.close()
+
+    elapsed = time.perf_counter() - start
+    total_rows = sum(r.rows + r.nested_rows for r in results)
+    print(f"{'total':<20} {total_rows:>21,} {elapsed:>9.2f} {total_rows / elapsed:>10,.0f}")
+    finish_load(connection, ctx, gather_stats)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier of the base row counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for customers and teams")
+    parser.add_argument("--workers", type=int, default=4, help="parallel loading connections")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per array insert and commit")
+    parser.add_argument("--no-stats", action="store_true", help="skip gathering optimizer statistics")
+    args = parser.parse_args()
+
+    with oracledb.connect(
+        user=db_config.DB_USER,
+        password=db_config.DB_PASSWORD,
+        **db_config.connect_params()
+    ) as connection:
+        generate(
+            connection, args.scale, args.seed, args.skew,
+            args.workers, args.chunk_size, gather_stats=not args.no_stats
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# webapp/tools/load_test.py
+"""
+Load-tests the REST service (api_service.py) with a mix of read endpoints and
+reports throughput and latency percentiles.
+
+Start the service in one shell and the load test in another, from the webapp
+directory:
+    uvicorn api_service:app --port 8000
+    python -m tools.load_test --url http://localhost:8000 --concurrency 32 --duration 30
+
+Each client thread keeps one HTTP/1.1 connection alive and cycles through the
+endpoints, whose parameters (center, chief officer) are read once from the
+database before the run. Exits with code 1 when throughput is below --min-rps or
+more than --max-error-rate of the requests fail.
+"""
+import argparse
+import http.client
+import itertools
+import sys
+import threading
+import time
+from urllib.parse import quote, urlsplit
+import oracledb
+import db_config
+import query_metrics
+import sql_catalogue
+
+
+def endpoint_mix(connection):
+    """GET paths exercised by the clients, parameterised from the current data."""
+    paths = ["/centers", "/customers", "/batches", "/orders/pending", "/batches/expired"]
+    with connection.cursor() as cursor:
+        cursor.execute(sql_catalogue.CENTER_NAMES)
+        center = cursor.fetchone()
+        cursor.execute(sql_catalogue.CHIEFS_WITH_TEAMS)
+        chief = cursor.fetchone()
+    if center:
+        paths.append(f"/centers/{quote(center[0])}/products")
+    if chief:
+        paths.append(f"/chiefs/{chief[0]}/deliveries?limit=50")
+    return paths
+
+
+class Client(threading.Thread):
+    """Issues requests over one keep-alive connection until the deadline."""
+
+    def __init__(self, url, paths, headers, offset, deadline):
+        super().__init__(daemon=True)
+        self.url = url
+        self.paths = paths[offset:] + paths[:offset]
+        self.headers = headers
+        self.deadline = deadline
+        self.latencies = []
+        self.errors = {}
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.url.scheme == "https" else http.client.HTTPConnection
+        return cls(self.url.hostname, self.url.port, timeout=30)
+
+    def run(self):
+        conn = self._connect()
+        for path in itertools.cycle(self.paths):
+            if time.perf_counter() >= self.deadline:
+                break
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=self.headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as e:
+                status = type(e).__name__
+                conn.close()
+                conn = self._connect()
+            self.latencies.append(time.perf_counter() - start)
+            if status != 200:
+                key = f"{path.split('?')[0]} -> {status}"
+                self.errors[key] = self.errors.get(key, 0) + 1
+        conn.close()
+
+
+def run(url, paths, token, concurrency, duration):
+    """Runs the clients and returns (latencies sorted, {error: count}, seconds)."""
+    headers = {"Connection": "keep-alive"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    start = time.perf_counter()
+    clients = [
+        Client(url, paths, headers, i % len(paths), start + duration)
+        for i in range(concurrency)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(itertools.chain.from_iterable(c.latencies for c in clients))
+    errors = {}
+    for client in clients:
+        for key, count in client.errors.items():
+            errors[key] = errors.get(key, 0) + count
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="base URL of the service")
+    parser.add_argument("--token", default=db_config.API_TOKEN, help="bearer token (default: MEDTECH_API_TOKEN)")
+    parser.add_argument("--concurrency", type=int, default=32, help="client threads")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds run first and not measured")
+    parser.add_argument("--min-rps", type=float, default=200.0, help="minimum requests per second")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="maximum failed fraction")
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    with oracledb.connect(user=db_config.DB_USER, password=db_config.DB_PASSWORD, **db_config.connect_params()) as connection:
+        paths = endpoint_mix(connection)
+    print(f"{len(paths)} endpoints, {args.concurrency} clients, {args.duration:.0f}s against {args.url}")
+
+    if args.warmup > 0:
+        run(url, paths, args.token, args.concurrency, args.warmup)
+    latencies, errors, elapsed = run(url, paths, args.token, args.concurrency, args.duration)
+
+    total = len(latencies)
+    failed = sum(errors.values())
+    rps = total / elapsed if elapsed else 0.0
+    print(f"\n{total} requests in {elapsed:.1f}s: {rps:,.0f} req/s")
+    if total:
+        print("latency " + "  ".join(
+            f"p{q * 100:g} {query_metrics.percentile(latencies, q) * 1000:.1f} ms"
+            for q in query_metrics.QUANTILES
+        ))
+    for key, count in sorted(errors.items()):
+        print(f"  {count:6d}  {key}")
+
+    error_rate = failed / total if total else 1.0
+    if rps < args.min_rps or error_rate > args.max_error_rate:
+        print(f"\nFAILED: below {args.min_rps:g} req/s or {error_rate:.1%} errors "
+              f"(allowed {args.max_error_rate:.1%}).")
+        sys.exit(1)
+    print(f"\nOK: {rps:,.0f} req/s, {error_rate:.2%} errors.")
+
+
+if __name__ == "__main__":
+    main()
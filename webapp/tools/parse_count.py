@@ -0,0 +1,71 @@
+# webapp/tools/parse_count.py
+"""
+Shows the hard parses caused by variable-length IN lists, comparing literal
+lists built with f-strings against the padded bind buckets of
+data_access.in_list_binds().
+
+Run from the webapp directory:
+    python -m tools.parse_count --queries 200
+"""
+import argparse
+import random
+import oracledb
+import db_config
+import data_access
+
+DELIVERIES_SQL = """
+    SELECT COUNT(*)
+    FROM BatchOrder bo
+    WHERE DEREF(bo.ByLogisticTeam).TeamCode IN ({in_list})
+"""
+
+
+def run_literal(cursor, id_lists):
+    for ids in id_lists:
+        cursor.execute(DELIVERIES_SQL.format(in_list=",".join(str(i) for i in ids)))
+        cursor.fetchone()
+
+
+def run_bound(cursor, id_lists):
+    for ids in id_lists:
+        in_list, binds = data_access.in_list_binds(ids)
+        cursor.execute(DELIVERIES_SQL.format(in_list=in_list), binds)
+        cursor.fetchone()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200, help="number of queries per variant")
+    parser.add_argument("--max-ids", type=int, default=40, help="largest IN list")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with oracledb.connect(
+        user=db_config.DB_USER,
+        password=db_config.DB_PASSWORD,
+        **db_config.connect_params()
+    ) as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT TeamCode FROM LogisticTeam")
+            team_codes = [row[0] for row in cursor.fetchall()]
+            # Pad the pool of IDs with non-existent codes so literal lists stay distinct
+            candidates = team_codes + list(range(10**6, 10**6 + 10 * args.max_ids))
+            id_lists = [
+                rng.sample(candidates, rng.randint(1, args.max_ids))
+                for _ in range(args.queries)
+            ]
+
+            print(f"{'variant':<10} {'queries':>8} {'parses':>8} {'hard parses':>12}")
+            for name, runner in (("literal", run_literal), ("bound", run_bound)):
+                before = data_access.parse_counts(connection)
+                runner(cursor, id_lists)
+                after = data_access.parse_counts(connection)
+                print(
+                    f"{name:<10} {args.queries:>8} "
+                    f"{after['total'] - before['total']:>8} {after['hard'] - before['hard']:>12}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# webapp/tools/refresh_snapshot.py
+"""
+Refreshes the local DuckDB analytics snapshot (MEDTECH_SNAPSHOT_PATH) from the
+reporting tables, copying only the rows changed since the last refresh.
+
+Run from the webapp directory:
+    python -m tools.refresh_snapshot
+    python -m tools.refresh_snapshot --full
+
+DuckDB allows a single writing process per file: stop the Streamlit app, or
+leave its background refresh off (MEDTECH_SNAPSHOT_REFRESH_SECONDS=0, the
+default) and run this tool from cron.
+"""
+import argparse
+import sys
+import duckdb
+import oracledb
+import snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="reload every table instead of applying changes")
+    args = parser.parse_args()
+
+    try:
+        results = snapshot.refresh_now(full=args.full)
+    except oracledb.Error as e:
+        error_obj, = e.args
+        print(f"Refresh failed: {error_obj.message}")
+        sys.exit(1)
+    except duckdb.Error as e:
+        print(f"Refresh failed: {e}")
+        sys.exit(1)
+
+    for name, result in results.items():
+        print(f"{name:<16} {result.rows:>10,} rows copied, {result.deleted:>8,} deleted in {result.elapsed:.2f}s")
+    print(f"Snapshot written to {snapshot.snapshot.path}")
+
+
+if __name__ == "__main__":
+    main()
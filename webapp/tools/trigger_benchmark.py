@@ -0,0 +1,127 @@
+# webapp/tools/trigger_benchmark.py
+"""
+Measures ProductBatch array-insert throughput with the compound validation
+trigger (TrgProductBatchChecks) and with the former row-level triggers.
+
+Run from the webapp directory:
+    python -m tools.trigger_benchmark --rows 10000 100000
+
+Inserted rows are rolled back; only sequence values are consumed.
+"""
+import argparse
+import time
+from datetime import date
+import oracledb
+import db_config
+import bulk_ingest
+
+# The row-level triggers replaced by TrgProductBatchChecks, recreated for comparison
+LEGACY_TRIGGERS = {
+    "TrgNoExpiredProductBatch": """
+        CREATE OR REPLACE TRIGGER TrgNoExpiredProductBatch
+        BEFORE INSERT OR UPDATE OF BatchProduct ON ProductBatch
+        FOR EACH ROW
+        DECLARE
+            v_expiry_date DATE;
+        BEGIN
+            SELECT p.ExpiryDate INTO v_expiry_date
+            FROM Product p
+            WHERE REF(p) = :NEW.BatchProduct;
+
+            IF v_expiry_date < TRUNC(SYSDATE) THEN
+                RAISE_APPLICATION_ERROR(-20008, 'Cannot assign expired product to a batch.');
+            END IF;
+        END;
+    """,
+    "TrgBatchArrivalDate": """
+        CREATE OR REPLACE TRIGGER TrgBatchArrivalDate
+        BEFORE INSERT OR UPDATE OF ArrivalDate ON ProductBatch
+        FOR EACH ROW
+        BEGIN
+            IF :NEW.ArrivalDate < TRUNC(SYSDATE) THEN
+                RAISE_APPLICATION_ERROR(-20009, 'Batch arrival date cannot be in the past.');
+            END IF;
+        END;
+    """,
+}
+
+
+def use_legacy_triggers(connection, enabled):
+    """Swaps between the compound trigger and the legacy row triggers."""
+    with connection.cursor() as cursor:
+        if enabled:
+            cursor.execute("ALTER TRIGGER TrgProductBatchChecks DISABLE")
+            for ddl in LEGACY_TRIGGERS.values():
+                cursor.execute(ddl)
+        else:
+            for name in LEGACY_TRIGGERS:
+                try:
+                    cursor.execute(f"DROP TRIGGER {name}")
+                except oracledb.DatabaseError:
+                    pass # Not installed
+            cursor.execute("ALTER TRIGGER TrgProductBatchChecks ENABLE")
+
+
+def build_rows(connection, n_rows):
+    """Builds n_rows insert binds cycling over the non-expired products."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT SerialNo FROM Product WHERE ExpiryDate >= TRUNC(SYSDATE)")
+        serials = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT CenterName FROM DistributionCenter FETCH FIRST 1 ROW ONLY")
+        center = cursor.fetchone()[0]
+    if not serials:
+        raise SystemExit("No non-expired products found: populate the database first.")
+    today = date.today()
+    return [
+        {
+            'serial_no': serials[i % len(serials)],
+            'quantity': 1 + i % 500,
+            'arrival_date': today,
+            'center': center,
+        }
+        for i in range(n_rows)
+    ]
+
+
+def timed_insert(connection, rows, chunk_size):
+    """Array-inserts the rows in chunks, rolls back, and returns (seconds, batch errors)."""
+    errors = 0
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        for offset in range(0, len(rows), chunk_size):
+            cursor.executemany(
+                bulk_ingest.INSERT_BATCH_SQL,
+                rows[offset:offset + chunk_size],
+                batcherrors=True,
+            )
+            errors += len(cursor.getbatcherrors())
+    elapsed = time.perf_counter() - start
+    connection.rollback()
+    return elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--chunk-size", type=int, default=bulk_ingest.DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with oracledb.connect(
+        user=db_config.DB_USER,
+        password=db_config.DB_PASSWORD,
+        **db_config.connect_params()
+    ) as connection:
+        print(f"{'triggers':<10} {'rows':>8} {'seconds':>9} {'rows/s':>10} {'errors':>7}")
+        for variant, legacy in (("row", True), ("compound", False)):
+            use_legacy_triggers(connection, legacy)
+            try:
+                for n_rows in args.rows:
+                    rows = build_rows(connection, n_rows)
+                    elapsed, errors = timed_insert(connection, rows, args.chunk_size)
+                    print(f"{variant:<10} {n_rows:>8} {elapsed:>9.2f} {n_rows / elapsed:>10,.0f} {errors:>7}")
+            finally:
+                use_legacy_triggers(connection, False)
+
+
+if __name__ == "__main__":
+    main()